@@ -0,0 +1,270 @@
+"""
+Time the hot functions of sr_fol for combinations of tree depth, variable count and assignment count.
+Save the timings as a baseline and compare later runs against it, failing when a function got slower
+than the baseline by more than the tolerance.
+
+    python -m benchmarks.micro --save baseline.json
+    python -m benchmarks.micro --compare baseline.json --tolerance 0.25
+"""
+from argparse import ArgumentParser
+from itertools import product
+from json import dump, load
+from platform import python_version
+from random import Random
+from sys import exit
+from timeit import Timer
+from typing import Callable
+from sr_fol.__main__ import best_expression
+from sr_fol.Expression import Expression, Var, Not, Or, And, RandomExpression, random_expressions
+from sr_fol.Assignment import Assignment, RandomAssignment, FormulaAssignment
+from sr_fol.Population import Population
+from sr_fol.Memo import SubtreeMemo
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Termination import Termination
+
+
+def full_expression(depth: int, v_n: int) -> Expression:
+    """
+    Build a complete tree of alternating And and Or nodes with a Not above every other leaf.
+
+    :param depth: depth of the tree without the Not nodes
+    :param v_n: number of variables, the leaves cycle through them
+    :return: expression with 2**(depth-1) leaves
+    """
+    leaves = iter(range(2**depth))
+
+    def build(level: int) -> Expression:
+        if level == depth:
+            i = next(leaves)
+            return Var(i % v_n + 1) if i % 2 else Not(Var(i % v_n + 1))
+        node_class = And if level % 2 else Or
+        return node_class(build(level + 1), build(level + 1))
+
+    return build(1)
+
+
+def random_matrix(v_n: int, a_n: int) -> Assignment:
+    """
+    :param v_n: number of variables
+    :param a_n: number of assignments
+    :return: seeded random assignment
+    """
+    return RandomAssignment(v_n, a_n, seed=0)
+
+
+def population(depth: int, v_n: int, seed: int = 0) -> Population:
+    """
+    :param depth: maximum depth of the expressions
+    :param v_n: number of variables
+    :param seed: seed of the random number generator of the population
+    :return: seeded population of 20 expressions
+    """
+    return Population(20, v_n, depth, (Or, And), (Not,), Random(seed))
+
+
+def evaluate_case(depth: int, v_n: int) -> Callable[[], None]:
+    expression = full_expression(depth, v_n)
+    assignment = random_matrix(v_n, 1).matrix['a_1']
+    return lambda: expression.evaluate(assignment)
+
+
+def score_case(depth: int, v_n: int, a_n: int) -> Callable[[], None]:
+    expression = full_expression(depth, v_n)
+    matrix = random_matrix(v_n, a_n).matrix
+    return lambda: expression.score(matrix)
+
+
+def copy_case(depth: int) -> Callable[[], None]:
+    expression = full_expression(depth, 3)
+    return lambda: expression.copy()
+
+
+def nodes_case(depth: int) -> Callable[[], None]:
+    expression = full_expression(depth, 3)
+    return lambda: expression.nodes([And, Not])
+
+
+def depth_case(depth: int) -> Callable[[], None]:
+    expression = full_expression(depth, 3)
+    return lambda: expression.depth()
+
+
+def clean_case(v_n: int, a_n: int) -> Callable[[], None]:
+    matrix = random_matrix(v_n, a_n).matrix
+    return lambda: Assignment(matrix.copy()).clean()
+
+
+def formula_assignment_case(depth: int, v_n: int) -> Callable[[], None]:
+    expression = full_expression(depth, v_n)
+    return lambda: FormulaAssignment(expression, v_n)
+
+
+def random_expression_case(depth: int, v_n: int) -> Callable[[], None]:
+    rng = Random(0)
+    return lambda: RandomExpression(v_n, (Or, And), (Not,), depth, rng)
+
+
+def random_expressions_case(depth: int, v_n: int) -> Callable[[], None]:
+    rng = Random(0)
+    return lambda: random_expressions(100, v_n, (Or, And), (Not,), depth, rng, shape='ramped')
+
+
+def mutation_case(depth: int, v_n: int) -> Callable[[], None]:
+    pop = population(depth, v_n)
+    expressions = list(pop.expressions)
+
+    def mutation() -> None:
+        pop.expressions = expressions[:10]
+        pop.mutation()
+
+    return mutation
+
+
+def crossover_case(depth: int, v_n: int) -> Callable[[], None]:
+    host, guest = population(depth, v_n, seed=0), population(depth, v_n, seed=1)
+    expressions = list(host.expressions)
+
+    def crossover() -> None:
+        host.expressions = expressions[:10]
+        host.crossover(guest)
+
+    return crossover
+
+
+def cull_case(depth: int, v_n: int, a_n: int) -> Callable[[], None]:
+    pop = population(depth, v_n)
+    expressions = list(pop.expressions)
+    packed = PackedAssignment.from_matrix(random_matrix(v_n, a_n).matrix)
+
+    def cull() -> None:
+        pop.expressions = list(expressions)
+        pop.fitness_cache = {}
+        pop.cull(packed)
+
+    return cull
+
+
+def memo_case(depth: int, v_n: int, a_n: int) -> Callable[[], None]:
+    expressions = [expression for seed in range(5) for expression in population(depth, v_n, seed).expressions]
+    packed = PackedAssignment.from_matrix(random_matrix(v_n, a_n).matrix)
+
+    def memo() -> None:
+        subtree_memo = SubtreeMemo()
+        subtree_memo.plan(expressions, packed)
+        for expression in expressions:
+            subtree_memo.truth(expression, packed)
+
+    return memo
+
+
+def best_expression_case(v_n: int, a_n: int) -> Callable[[], None]:
+    matrix = random_matrix(v_n, a_n).matrix
+    return lambda: best_expression(matrix, populations=4, population_size=10, maxdepth=5, niterations=3,
+                                   termination=Termination(target_score=None, stagnation=None), seed=0)
+
+
+# name of the function, parameters the case depends on and the setup returning the timed function
+CASES = [('Expression.evaluate', ('depth', 'v_n'), evaluate_case),
+         ('Expression.score', ('depth', 'v_n', 'a_n'), score_case),
+         ('Expression.copy', ('depth',), copy_case),
+         ('Expression.nodes', ('depth',), nodes_case),
+         ('Expression.depth', ('depth',), depth_case),
+         ('Assignment.clean', ('v_n', 'a_n'), clean_case),
+         ('FormulaAssignment', ('depth', 'v_n'), formula_assignment_case),
+         ('RandomExpression', ('depth', 'v_n'), random_expression_case),
+         ('random_expressions', ('depth', 'v_n'), random_expressions_case),
+         ('Population.mutation', ('depth', 'v_n'), mutation_case),
+         ('Population.crossover', ('depth', 'v_n'), crossover_case),
+         ('Population.cull', ('depth', 'v_n', 'a_n'), cull_case),
+         ('SubtreeMemo.truth', ('depth', 'v_n', 'a_n'), memo_case),
+         ('best_expression', ('v_n', 'a_n'), best_expression_case)]
+
+
+def measure(function: Callable[[], None], repeat: int = 3) -> float:
+    """
+    Time a function with as many calls per repetition as fit into 0.2 seconds.
+
+    :param function: function to time
+    :param repeat: number of repetitions, the fastest is taken
+    :return: seconds per call
+    """
+    timer = Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(depths: list[int], v_ns: list[int], a_ns: list[int], functions: list[str] | None = None,
+        repeat: int = 3) -> dict[str, float]:
+    """
+    Time every case for all combinations of the parameters it depends on.
+
+    :param depths: tree depths
+    :param v_ns: variable counts
+    :param a_ns: assignment counts
+    :param functions: only time these functions
+    :param repeat: number of repetitions per case
+    :return: seconds per call by case name, e.g. 'Expression.score[depth=3,v_n=3,a_n=16]'
+    """
+    grid = {'depth': depths, 'v_n': v_ns, 'a_n': a_ns}
+    timings = {}
+    for name, parameters, setup in CASES:
+        if functions and name not in functions:
+            continue
+        for values in product(*[grid[parameter] for parameter in parameters]):
+            case = name + '[' + ','.join(f'{p}={v}' for p, v in zip(parameters, values)) + ']'
+            timings[case] = measure(setup(*values), repeat)
+    return timings
+
+
+def compare(timings: dict[str, float], baseline: dict[str, float], tolerance: float) -> list[str]:
+    """
+    Find the cases that got slower than the baseline by more than the tolerance.
+
+    :param timings: seconds per call by case name
+    :param baseline: seconds per call by case name of an earlier run
+    :param tolerance: allowed relative slowdown, e.g. 0.25 for 25 %
+    :return: names of the regressed cases
+    """
+    return [case for case in timings if case in baseline and timings[case] > baseline[case] * (1 + tolerance)]
+
+
+if __name__ == '__main__':
+    """ Run from command line. """
+    parser = ArgumentParser()
+    parser.add_argument('--depths', type=int, nargs='+', help='tree depths')
+    parser.add_argument('--v_ns', type=int, nargs='+', help='variable counts')
+    parser.add_argument('--a_ns', type=int, nargs='+', help='assignment counts')
+    parser.add_argument('--functions', type=str, nargs='+', choices=[case[0] for case in CASES],
+                        help='only time these functions')
+    parser.add_argument('--repeat', type=int, help='number of repetitions per case, the fastest is taken')
+    parser.add_argument('--save', type=str, help='file to save the timings to as baseline')
+    parser.add_argument('--compare', type=str, help='baseline file to compare the timings with')
+    parser.add_argument('--tolerance', type=float, help='allowed relative slowdown against the baseline')
+    args = parser.parse_args()
+
+    timings = run(args.depths if args.depths else [3, 6],
+                  args.v_ns if args.v_ns else [3, 6],
+                  args.a_ns if args.a_ns else [16, 64],
+                  args.functions,
+                  args.repeat if args.repeat else 3)
+    tolerance = args.tolerance if args.tolerance is not None else 0.25
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = load(baseline_file)['timings']
+
+    for case, seconds in timings.items():
+        line = f'{case:<55}{seconds * 1e6:>14.1f} us'
+        if case in baseline:
+            line += f'{seconds / baseline[case]:>8.2f}x'
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            dump({'python': python_version(), 'timings': timings}, baseline_file, indent=1)
+    if args.compare:
+        regressions = compare(timings, baseline, tolerance)
+        if regressions:
+            print(f'Slower than the baseline by more than {tolerance:.0%}: ' + ', '.join(regressions))
+            exit(1)
+        print(f'No function slower than the baseline by more than {tolerance:.0%}')
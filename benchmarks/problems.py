@@ -0,0 +1,108 @@
+"""
+Classic Boolean regression problems as uncleaned assignment matrices with rows v_1, ..., v_n and e.
+"""
+from itertools import product
+from random import Random
+from typing import Callable
+from pandas import DataFrame
+from sr_fol.Expression import Not, Or, And, RandomExpression
+from sr_fol.Assignment import FormulaAssignment
+
+
+def truth_table(v_n: int, function: Callable[[tuple[bool, ...]], bool]) -> DataFrame:
+    """
+    Generate the complete assignment matrix of a Boolean function.
+
+    :param v_n: number of variables
+    :param function: evaluation of an assignment given as the values of v_1, ..., v_n
+    :return: DataFrame of all assignments and their evaluations
+    """
+    assignments = list(product([True, False], repeat=v_n))
+    return DataFrame(data=[list(column) for column in zip(*assignments)] + [[function(a) for a in assignments]],
+                     index=['v_' + str(i + 1) for i in range(v_n)] + ['e'],
+                     columns=['a_' + str(i + 1) for i in range(len(assignments))])
+
+
+def number(bits: tuple[bool, ...]) -> int:
+    """
+    Read bits as an unsigned integer, the first bit being the most significant.
+
+    :param bits: values of the bits
+    :return: integer
+    """
+    return sum(1 << i for i, bit in enumerate(reversed(bits)) if bit)
+
+
+def parity(v_n: int, even: bool = True) -> DataFrame:
+    """
+    Even parity is True if an even number of variables is True, odd parity if an odd number is True.
+
+    :param v_n: number of variables
+    :param even: even or odd parity
+    :return: DataFrame of all assignments and their evaluations
+    """
+    return truth_table(v_n, lambda a: (sum(a) % 2 == 0) == even)
+
+
+def multiplexer(address_bits: int) -> DataFrame:
+    """
+    The first address_bits variables select which of the following 2**address_bits data variables is returned,
+    e.g. the 6-multiplexer for 2 address bits and the 11-multiplexer for 3 address bits.
+
+    :param address_bits: number of address variables
+    :return: DataFrame of all assignments and their evaluations
+    """
+    return truth_table(address_bits + 2**address_bits, lambda a: a[address_bits + number(a[:address_bits])])
+
+
+def majority(v_n: int) -> DataFrame:
+    """
+    Majority is True if more than half of the variables are True.
+
+    :param v_n: number of variables
+    :return: DataFrame of all assignments and their evaluations
+    """
+    return truth_table(v_n, lambda a: sum(a) > v_n / 2)
+
+
+def comparator(bits: int) -> DataFrame:
+    """
+    The comparator is True if the number given by the first bits variables is greater than the number given
+    by the following bits variables.
+
+    :param bits: number of bits per number
+    :return: DataFrame of all assignments and their evaluations
+    """
+    return truth_table(2 * bits, lambda a: number(a[:bits]) > number(a[bits:]))
+
+
+def random_formula(v_n: int, maxdepth: int, noise: float, seed: int) -> DataFrame:
+    """
+    The assignments of a random expression of Or, And and Not, in which a fraction of the values is
+    replaced by None.
+
+    :param v_n: number of variables
+    :param maxdepth: maximum depth of the random expression
+    :param noise: probability of a value to be None
+    :param seed: seed of the random expression and the noise
+    :return: DataFrame of all assignments and their evaluations
+    """
+    rng = Random(seed)
+    matrix = FormulaAssignment(RandomExpression(v_n, (Or, And), (Not,), maxdepth, rng), v_n).matrix.astype(object)
+    for row in range(len(matrix.index)):
+        for column in range(len(matrix.columns)):
+            if rng.random() < noise:
+                matrix.iat[row, column] = None
+    return matrix
+
+
+# problems by name, each generates the assignment matrix for a seed
+PROBLEMS = {'parity-3': lambda seed: parity(3),
+            'parity-4': lambda seed: parity(4),
+            'odd-parity-3': lambda seed: parity(3, even=False),
+            'multiplexer-6': lambda seed: multiplexer(2),
+            'multiplexer-11': lambda seed: multiplexer(3),
+            'majority-5': lambda seed: majority(5),
+            'comparator-4': lambda seed: comparator(2),
+            'random-6': lambda seed: random_formula(6, 4, 0.0, seed),
+            'random-6-noise': lambda seed: random_formula(6, 4, 0.05, seed)}
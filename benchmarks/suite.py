@@ -0,0 +1,141 @@
+"""
+Run best_expression on the standard problems with fixed seeds and report the generations to solution,
+the wall time, the evaluations per second and the peak memory of every run.
+
+    python -m benchmarks.suite --problems parity-3 multiplexer-6 --seeds 0 1 2 --output results.jsonl
+"""
+from argparse import ArgumentParser
+from json import dumps
+from statistics import median
+from time import perf_counter
+import tracemalloc
+from pandas import DataFrame
+from sr_fol.__main__ import best_expression
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Termination import Termination
+from sr_fol.Telemetry import Telemetry, MemorySink
+from benchmarks.problems import PROBLEMS
+
+
+def run_problem(name: str,
+                input_df: DataFrame,
+                seed: int,
+                populations: int = 31,
+                population_size: int = 27,
+                maxdepth: int = 10,
+                niterations: int = 100,
+                time_limit: float | None = None,
+                memory: bool = True) -> dict:
+    """
+    Search an expression for one problem and measure the run.
+
+    :param name: name of the problem
+    :param input_df: uncleaned DataFrame of variable assignments and associated evaluations
+    :param seed: seed of the random number generator
+    :param populations: number of populations used in the genetic algorithm
+    :param population_size: number of individual expressions per population
+    :param maxdepth: maximum depth of the expressions in the populations
+    :param niterations: number of generations of mutation and crossover
+    :param time_limit: wall-clock budget of the search in seconds
+    :param memory: trace the peak memory, which slows down the search
+    :return: result of the run
+    """
+    telemetry = Telemetry(MemorySink())
+    termination = Termination(target_score=1.0, time_limit=time_limit, stagnation=None)
+    if memory:
+        tracemalloc.start()
+    start = perf_counter()
+    expression = best_expression(input_df,
+                                 populations=populations,
+                                 population_size=population_size,
+                                 maxdepth=maxdepth,
+                                 niterations=niterations,
+                                 termination=termination,
+                                 telemetry=telemetry,
+                                 seed=seed)
+    wall_time = perf_counter() - start
+    peak_memory = None
+    if memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    records = telemetry.sink.records
+    evaluations = sum(record['counters'].get('evaluations', 0) for record in records)
+    solved = termination.reason == 'target_score'
+    return {'problem': name,
+            'seed': seed,
+            'solved': solved,
+            'generations': len(records),
+            'generations_to_solution': len(records) if solved else None,
+            'score': expression.score(PackedAssignment.from_rows(input_df.values.tolist())),
+            'size': expression.size(),
+            'wall_time': wall_time,
+            'evaluations': evaluations,
+            'evaluations_per_second': evaluations / wall_time if wall_time > 0 else 0.0,
+            'peak_memory': peak_memory,
+            'stop_reason': termination.reason,
+            'expression': str(expression)}
+
+
+def summary(results: list[dict]) -> dict:
+    """
+    Aggregate the runs of one problem.
+
+    :param results: results of run_problem
+    :return: success rate and medians of the runs
+    """
+    solved = [result for result in results if result['solved']]
+    return {'problem': results[0]['problem'],
+            'runs': len(results),
+            'success_rate': len(solved) / len(results),
+            'median_generations_to_solution': median([r['generations_to_solution'] for r in solved]) if solved else None,
+            'median_wall_time': median([result['wall_time'] for result in results]),
+            'median_evaluations_per_second': median([result['evaluations_per_second'] for result in results])}
+
+
+if __name__ == '__main__':
+    """ Run from command line. """
+    parser = ArgumentParser()
+    parser.add_argument('--problems', type=str, nargs='+', choices=sorted(PROBLEMS), help='only run these problems')
+    parser.add_argument('--seeds', type=int, nargs='+', help='seeds of the runs per problem')
+    parser.add_argument('--populations', type=int, help='number of populations used in the genetic algorithm')
+    parser.add_argument('--population_size', type=int, help='number of individual expressions per population')
+    parser.add_argument('--maxdepth', type=int, help='maximum depth of the expressions in the populations')
+    parser.add_argument('--niterations', type=int, help='number of generations of mutation and crossover')
+    parser.add_argument('--time_limit', type=float, help='wall-clock budget per run in seconds')
+    parser.add_argument('--no_memory', action='store_true', help='do not trace the peak memory')
+    parser.add_argument('--output', type=str, help='file to write the results to as JSON lines')
+    args = parser.parse_args()
+
+    problems = args.problems if args.problems else list(PROBLEMS)
+    seeds = args.seeds if args.seeds else [0, 1, 2]
+    output_file = open(args.output, 'w') if args.output else None
+    print(f'{"problem":<16}{"seed":>6}{"solved":>8}{"gens":>6}{"score":>7}{"time s":>9}{"evals/s":>10}{"peak MB":>9}')
+    summaries = []
+    for name in problems:
+        results = []
+        for seed in seeds:
+            result = run_problem(name,
+                                 PROBLEMS[name](seed),
+                                 seed,
+                                 populations=args.populations if args.populations else 31,
+                                 population_size=args.population_size if args.population_size else 27,
+                                 maxdepth=args.maxdepth if args.maxdepth else 10,
+                                 niterations=args.niterations if args.niterations else 100,
+                                 time_limit=args.time_limit,
+                                 memory=not args.no_memory)
+            results.append(result)
+            peak_memory = f'{result["peak_memory"] / 2**20:.1f}' if result['peak_memory'] is not None else '-'
+            print(f'{name:<16}{seed:>6}{str(result["solved"]):>8}{result["generations"]:>6}{result["score"]:>7.3f}'
+                  f'{result["wall_time"]:>9.2f}{result["evaluations_per_second"]:>10.0f}{peak_memory:>9}')
+            if output_file:
+                output_file.write(dumps(result) + '\n')
+        summaries.append(summary(results))
+
+    print()
+    for problem_summary in summaries:
+        print(f'{problem_summary["problem"]:<16} solved {problem_summary["success_rate"]:.0%}, '
+              f'median generations {problem_summary["median_generations_to_solution"]}, '
+              f'median time {problem_summary["median_wall_time"]:.2f} s')
+    if output_file:
+        output_file.close()
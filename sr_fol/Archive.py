@@ -0,0 +1,201 @@
+"""
+Archive of the best expressions of finished searches, so searches over the same variables can start from the
+solutions of similar earlier searches instead of purely random expressions.
+
+Every expression is keyed by the number of variables v_n and its truth table, the evaluation of all 2**v_n
+assignments without None values, and only the smallest expression of every truth table is kept. A new target
+is compared with an entry by the Hamming distance on its observed assignments, the assignments with an
+evaluation and without None values. The entries are found through a bit sampling index: every band of the
+index holds the bits of some fixed assignments, and the entries agreeing with the target on the observed
+assignments of a band are looked up by the key of the band instead of comparing the target with every entry.
+A band with few unobserved assignments is probed with every key they can complete, a band with more is
+matched on the bits of its observed assignments alone, so sparsely observed targets still find their entries.
+"""
+from functools import lru_cache
+from random import Random
+from sqlite3 import connect
+from threading import Lock
+from sr_fol.Expression import Expression
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Serialization import to_text, from_text
+
+
+@lru_cache(maxsize=None)
+def truth_table(v_n: int) -> PackedAssignment:
+    """
+    Pack all 2**v_n assignments without None values. In assignment p the variable v_i is True if bit i-1 of p is set.
+
+    :param v_n: number of variables
+    :return: packed assignments, without evaluations
+    """
+    a_n = 1 << v_n
+    mask = (1 << a_n) - 1
+    variables = {}
+    for subscript in range(1, v_n + 1):
+        half = 1 << (subscript - 1)
+        # half False bits followed by half True bits, repeated over all assignments
+        true_bits = (((1 << half) - 1) << half) * (mask // ((1 << 2 * half) - 1))
+        variables[subscript] = (true_bits, ~true_bits & mask)
+    return PackedAssignment(variables, (0, 0), a_n)
+
+
+class ExpressionArchive:
+    """ Smallest expression per truth table in an SQLite file, with a bit sampling index of the truth tables. """
+
+    def __init__(self,
+                 path: str = ':memory:',
+                 bands: int = 16,
+                 width: int = 8,
+                 free: int = 4,
+                 scan: int = 10000,
+                 max_variables: int = 16) -> None:
+        """
+        The number and width of the bands are stored with a new archive, an existing archive keeps its own.
+
+        :param path: file of the archive, by default an archive in memory
+        :param bands: number of bands of the index
+        :param width: number of assignments per band, at most 62
+        :param free: maximum number of unobserved assignments of a band a lookup tries all values for
+        :param scan: number of candidates after which a lookup stops probing further bands
+        :param max_variables: maximum number of variables of archived expressions, searches with more are ignored
+        """
+        self.connection = connect(path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value INTEGER)')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS expressions '
+                                '(id INTEGER PRIMARY KEY, v_n INTEGER, truth TEXT, size INTEGER, expression TEXT, '
+                                'UNIQUE (v_n, truth))')
+        self.connection.execute('CREATE TABLE IF NOT EXISTS bands (v_n INTEGER, band INTEGER, key INTEGER, id INTEGER)')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS band_keys ON bands (v_n, band, key)')
+        self.connection.executemany('INSERT OR IGNORE INTO settings VALUES (?, ?)',
+                                    [('bands', bands), ('width', width)])
+        self.connection.commit()
+        settings = dict(self.connection.execute('SELECT name, value FROM settings'))
+        self.bands = settings['bands']
+        self.width = min(settings['width'], 62)
+        self.free = free
+        self.scan = scan
+        self.max_variables = max_variables
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute('SELECT COUNT(*) FROM expressions').fetchone()[0]
+
+    def positions(self, v_n: int) -> list[list[int]]:
+        """
+        :param v_n: number of variables
+        :return: assignments sampled by every band, the same for every archive with the same bands and width; a band
+                 holds at most half the assignments, so an entry can still be found if some of them disagree
+        """
+        rng = Random(v_n)
+        return [sorted(rng.sample(range(1 << v_n), min(self.width, max(1, 1 << v_n >> 1)))) for _ in range(self.bands)]
+
+    @staticmethod
+    def observed(packed: PackedAssignment) -> tuple[int, int]:
+        """
+        Map the observed assignments of a target to the assignments of the truth table.
+
+        :param packed: packed variable assignments and associated evaluations
+        :return: bits of the observed assignments and bits of those evaluated to True in the truth table
+        """
+        observed = target = 0
+        for i in range(packed.a_n):
+            if not (packed.e[0] | packed.e[1]) >> i & 1:
+                continue
+            key = packed.key(i)
+            if None in key:
+                continue
+            position = sum(1 << bit for bit, value in enumerate(key) if value)
+            observed |= 1 << position
+            target |= (packed.e[0] >> i & 1) << position
+        return observed, target
+
+    def add(self, expressions: list[Expression], v_n: int) -> int:
+        """
+        Archive expressions unless an expression with the same truth table and at most the same size is archived.
+
+        :param expressions: expressions to archive
+        :param v_n: number of variables of the search the expressions were found in
+        :return: number of archived expressions
+        """
+        if v_n > self.max_variables:
+            return 0
+        table = truth_table(v_n)
+        positions = self.positions(v_n)
+        added = 0
+        with self.lock:
+            for expression in expressions:
+                truth = expression.truth(table)[0]
+                size = expression.size()
+                row = self.connection.execute('SELECT id, size FROM expressions WHERE v_n = ? AND truth = ?',
+                                              (v_n, format(truth, 'x'))).fetchone()
+                if row is None:
+                    entry = self.connection.execute('INSERT INTO expressions (v_n, truth, size, expression) '
+                                                    'VALUES (?, ?, ?, ?)',
+                                                    (v_n, format(truth, 'x'), size, to_text(expression))).lastrowid
+                    self.connection.executemany('INSERT INTO bands VALUES (?, ?, ?, ?)',
+                                                [(v_n, band, self.key(truth, band_positions), entry)
+                                                 for band, band_positions in enumerate(positions)])
+                elif size < row[1]:
+                    self.connection.execute('UPDATE expressions SET size = ?, expression = ? WHERE id = ?',
+                                            (size, to_text(expression), row[0]))
+                else:
+                    continue
+                added += 1
+            self.connection.commit()
+        return added
+
+    @staticmethod
+    def key(bits: int, positions: list[int]) -> int:
+        """
+        :param bits: bits of the truth table
+        :param positions: assignments of a band
+        :return: bits of the assignments of the band
+        """
+        return sum((bits >> position & 1) << j for j, position in enumerate(positions))
+
+    def nearest(self, packed: PackedAssignment, k: int = 10) -> list[Expression]:
+        """
+        Return the archived expressions closest to a target by Hamming distance on its observed assignments,
+        the smaller first among equally close ones. Only the entries agreeing with the target on all observed
+        assignments of at least one band are candidates. The bands are probed from the most observed one on,
+        until scan candidates are found; a band without observed assignments is skipped.
+
+        :param packed: packed variable assignments and associated evaluations of the target
+        :param k: maximum number of expressions
+        :return: closest expressions
+        """
+        v_n = len(packed.variables)
+        if v_n > self.max_variables:
+            return []
+        observed, target = self.observed(packed)
+        candidates = set()
+        bands = sorted(enumerate(self.positions(v_n)), key=lambda band: -self.key(observed, band[1]).bit_count())
+        with self.lock:
+            for band, positions in bands:
+                mask = self.key(observed, positions)
+                if not mask or len(candidates) >= self.scan:
+                    break
+                key = self.key(target, positions)
+                unobserved = [j for j in range(len(positions)) if not mask >> j & 1]
+                if len(unobserved) <= self.free:
+                    keys = [key | sum((values >> m & 1) << j for m, j in enumerate(unobserved))
+                            for values in range(1 << len(unobserved))]
+                    rows = self.connection.execute(f'SELECT id FROM bands WHERE v_n = ? AND band = ? '
+                                                   f'AND key IN ({", ".join("?" * len(keys))})', (v_n, band, *keys))
+                else:
+                    rows = self.connection.execute('SELECT id FROM bands WHERE v_n = ? AND band = ? AND key & ? = ? '
+                                                   'LIMIT ?', (v_n, band, mask, key, self.scan - len(candidates)))
+                candidates.update(entry for entry, in rows)
+            candidates = list(candidates)
+            rows = []
+            for start in range(0, len(candidates), 500):
+                chunk = candidates[start:start + 500]
+                rows += self.connection.execute(f'SELECT truth, size, expression FROM expressions '
+                                                f'WHERE id IN ({", ".join("?" * len(chunk))})', chunk).fetchall()
+        rows.sort(key=lambda row: (((int(row[0], 16) ^ target) & observed).bit_count(), row[1]))
+        return [from_text(expression) for _, _, expression in rows[:k]]
+
+    def close(self) -> None:
+        """ Close the file. """
+        self.connection.close()
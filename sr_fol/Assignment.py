@@ -1,6 +1,6 @@
 from itertools import product, combinations
 from pandas import DataFrame, concat
-from numpy.random import rand
+from numpy.random import default_rng
 from numpy import ndarray
 from sr_fol.Expression import Expression
 
@@ -10,10 +10,24 @@ class Assignment:
     An Assignment is an incomplete truth table realized as a pandas DataFrame containing boolean or None.
     Rows represent the values for variables per assignment, depicted as columns. The output of an evaluation
     of a logical expression given the assignment is concatenated as the last row 'e' in the matrix.
+    With several targets the last rows 'e_1', ..., 'e_k' hold the evaluations of each target.
     """
 
-    def __init__(self, df: DataFrame) -> None:
+    def __init__(self, df: DataFrame, targets: int = 1) -> None:
+        """
+        :param df: matrix of variable rows followed by the evaluation rows
+        :param targets: number of evaluation rows
+        """
         self.matrix = df
+        self.targets = targets
+
+    def target_labels(self) -> list[str]:
+        """
+        :return: index labels of the evaluation rows, 'e' for a single target
+        """
+        if self.targets == 1:
+            return ['e']
+        return ['e_' + str(i + 1) for i in range(self.targets)]
 
     def clean(self) -> None:
         """
@@ -24,8 +38,9 @@ class Assignment:
         # 1. all values are True, False or NaN
         self.matrix = self.matrix.map(lambda x: bool(x), na_action='ignore')
 
-        # 2. index labels are v_1, ..., v_n, e
-        self.matrix.index = ['v_' + str(i + 1) for i in range(len(self.matrix.index) - 1)] + ['e']
+        # 2. index labels are v_1, ..., v_n, e or v_1, ..., v_n, e_1, ..., e_k
+        self.matrix.index = (['v_' + str(i + 1) for i in range(len(self.matrix.index) - self.targets)] +
+                             self.target_labels())
 
         # 3. column are labeled a_1, ..., a_n
         self.matrix.columns = ['a_' + str(i + 1) for i in range(len(self.matrix.columns))]
@@ -33,26 +48,41 @@ class Assignment:
         # 4. columns with the same values are removed
         assignments_to_drop = set()
         for assignment_x, assignment_y in combinations(self.matrix.columns, r=2):
-            if self.matrix[assignment_x][:-1].equals(self.matrix[assignment_y][:-1]):
+            if self.matrix[assignment_x][:-self.targets].equals(self.matrix[assignment_y][:-self.targets]):
                 assignments_to_drop.add(assignment_y)
         for assignment in assignments_to_drop:
             self.matrix = self.matrix.drop(assignment, axis=1)
 
-        # 5. columns with a None-value in the e row are removed
-        self.matrix = self.matrix.drop(self.matrix.loc[:, self.matrix.loc['e'].isna()], axis=1)
+        # 5. columns with a None-value in the e row, or in all e rows of several targets, are removed
+        no_evaluation = self.matrix.loc[self.target_labels()].isna().all()
+        self.matrix = self.matrix.drop(self.matrix.loc[:, no_evaluation], axis=1)
+
+    def target(self, i: int) -> 'Assignment':
+        """
+        Return the assignments of one target as a single target Assignment with evaluation row 'e'.
+        Assignments without evaluation of the target are removed.
+
+        :param i: number of the target, starting at 1
+        :return: Assignment of the target
+        """
+        matrix = concat([self.matrix.iloc[:len(self.matrix.index) - self.targets],
+                         self.matrix.iloc[[len(self.matrix.index) - self.targets + i - 1]]])
+        matrix.index = list(matrix.index[:-1]) + ['e']
+        return Assignment(matrix.drop(matrix.loc[:, matrix.loc['e'].isna()], axis=1))
 
 
 class RandomAssignment(Assignment):
 
-    def __new__(cls, v_n: int = 2, a_n: int = 4) -> Assignment:
+    def __new__(cls, v_n: int = 2, a_n: int = 4, seed: int | None = None) -> Assignment:
         """
         Generate an Assignment filled with random boolean values.
 
         :param v_n: number of variables
         :param a_n: number of assignments
+        :param seed: seed of the random number generator, by default a random seed
         :return: Assignment with random assignments
         """
-        matrix = DataFrame(data=rand(v_n + 1, a_n),
+        matrix = DataFrame(data=default_rng(seed).random((v_n + 1, a_n)),
                            index=['v_' + str(i + 1) for i in range(v_n)] + ['e'],
                            columns=['a_' + str(i + 1) for i in range(a_n)])
         return Assignment(df=matrix.ge(0.5))
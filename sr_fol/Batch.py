@@ -0,0 +1,133 @@
+"""
+Solve many datasets with a pool of worker processes. Datasets are given as a directory of pickled DataFrames,
+a glob pattern or a JSON lines manifest with one job per line, e.g.
+
+    {"path": "xor.pkl", "id": "xor", "timeout": 30, "options": {"maxdepth": 5, "binary_operators": ["Xor"]}}
+
+The results are yielded in the order the jobs complete.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from glob import glob
+from json import loads
+from os.path import isdir, join, dirname
+from pickle import load
+from time import perf_counter
+from typing import Iterator
+from sr_fol.Solver import Solver
+from sr_fol.Termination import Termination
+from sr_fol.Expression import OPERATORS
+
+# options of a job passed to the Solver, the others are criteria of the Termination
+SOLVER_OPTIONS = ('populations', 'population_size', 'maxdepth', 'binary_operators', 'unary_operators',
+                  'local_search', 'semantic_crossover', 'nary', 'maxsize', 'parsimony', 'selection',
+                  'initialization', 'threads', 'adaptive', 'memo', 'seed')
+TERMINATION_OPTIONS = ('target_score', 'time_limit', 'max_evaluations', 'stagnation')
+OPTIONS = SOLVER_OPTIONS + TERMINATION_OPTIONS + ('niterations',)
+
+
+def read_jobs(source: str) -> list[dict]:
+    """
+    List the jobs of a directory of pickled DataFrames, a JSON lines manifest or a glob pattern.
+
+    :param source: directory, manifest ending in .jsonl or glob pattern
+    :return: jobs with path, id (by default the path), timeout and options
+    """
+    if source.endswith('.jsonl'):
+        with open(source) as manifest:
+            jobs = [loads(line) for line in manifest if line.strip()]
+        for job in jobs:  # paths in the manifest are relative to it
+            job['path'] = join(dirname(source), job['path'])
+    elif isdir(source):
+        jobs = [{'path': path} for path in sorted(glob(join(source, '*.pkl')))]
+    else:
+        jobs = [{'path': path} for path in sorted(glob(source))]
+    return [{'path': job['path'],
+             'id': job.get('id', job['path']),
+             'timeout': job.get('timeout'),
+             'options': job.get('options', {})} for job in jobs]
+
+
+def check_options(options: dict) -> None:
+    """
+    :param options: options of a job
+    :raises ValueError: if an option is unknown, e.g. misspelled
+    """
+    unknown = sorted(key for key in options if key not in OPTIONS)
+    if unknown:
+        raise ValueError(f'Unknown options {", ".join(unknown)}, choose from {", ".join(OPTIONS)}')
+
+
+def build_solver(input_df, options: dict, timeout: float | None = None) -> tuple[Solver, Termination, int]:
+    """
+    Build a Solver and its Termination from the options of a job.
+
+    :param input_df: uncleaned DataFrame or PackedAssignment of variable assignments and associated evaluations
+    :param options: options of the Solver and the Termination and niterations, operators may be given by name
+    :param timeout: seconds after which the search stops, at most the time_limit of the options
+    :return: solver, termination and number of generations
+    :raises ValueError: if an option is unknown
+    """
+    check_options(options)
+    options = dict(options)
+    for key in ('binary_operators', 'unary_operators'):
+        if key in options:
+            options[key] = tuple(OPERATORS[name] if isinstance(name, str) else name for name in options[key])
+    if timeout is not None:
+        options['time_limit'] = min(timeout, options.get('time_limit') or timeout)
+    solver = Solver(input_df, **{key: options[key] for key in SOLVER_OPTIONS if key in options})
+    termination = Termination(**{key: options[key] for key in TERMINATION_OPTIONS if key in options})
+    return solver, termination, options.get('niterations', 100)
+
+
+def solve_job(job: dict, defaults: dict) -> dict:
+    """
+    Solve the dataset of a job with its options on top of the default options.
+
+    :param job: job as returned by read_jobs
+    :param defaults: default options of all jobs
+    :return: result of the job
+    """
+    start = perf_counter()
+    with open(job['path'], 'rb') as input_df_file:
+        input_df = load(input_df_file)
+    solver, termination, niterations = build_solver(input_df, {**defaults, **job['options']}, job['timeout'])
+    try:
+        expression = solver.run(niterations, termination)
+    finally:
+        solver.close()
+    return {'id': job['id'],
+            'path': job['path'],
+            'status': 'ok',
+            'expression': str(expression),
+            'score': expression.score(solver.packed),
+            'generations': solver.generation,
+            'stop_reason': termination.reason,
+            'elapsed': perf_counter() - start}
+
+
+def run_batch(source: str,
+              defaults: dict | None = None,
+              workers: int | None = None,
+              timeout: float | None = None) -> Iterator[dict]:
+    """
+    Solve all jobs of source in a pool of worker processes and yield the results as the jobs complete.
+    A job that raises an error yields a result with status 'error' instead of stopping the batch.
+
+    :param source: directory, manifest ending in .jsonl or glob pattern
+    :param defaults: default options of all jobs, e.g. {'maxdepth': 5, 'niterations': 50}
+    :param workers: number of worker processes, by default the number of processors
+    :param timeout: seconds after which a job returns its best expression so far, unless the job sets its own
+    :return: results of the jobs
+    """
+    jobs = read_jobs(source)
+    for job in jobs:
+        if job['timeout'] is None:
+            job['timeout'] = timeout
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(solve_job, job, defaults or {}): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                yield future.result()
+            except Exception as error:
+                yield {'id': job['id'], 'path': job['path'], 'status': 'error', 'error': repr(error)}
@@ -1,5 +1,13 @@
-from random import sample
-from pandas import DataFrame, Series
+import random
+from random import Random
+from typing import Callable, TYPE_CHECKING
+from sr_fol.Semantics import PackedAssignment
+
+if TYPE_CHECKING:
+    from pandas import DataFrame, Series
+
+# operator classes by class name or alias, binary operators are added when they are defined
+OPERATORS: dict[str, type['Expression']] = {}
 
 
 class Expression:
@@ -15,17 +23,28 @@ class Expression:
     def __eq__(self, other) -> bool:
         return str(self) == str(other)
 
-    def score(self, assignment_matrix: DataFrame) -> float:
+    def score(self, assignment_matrix: 'DataFrame | list[list] | PackedAssignment') -> float:
         """
         Calculate the fraction of assignments this expression correctly evaluates.
 
-        :param assignment_matrix: DataFrame of variable assignments and associated evaluations
+        :param assignment_matrix: DataFrame, rows or PackedAssignment of variable assignments and associated evaluations
         :return: fraction of correct assignments
         """
-        score_total = 0
-        for assignment in assignment_matrix.columns:
-            score_total += self.evaluate(assignment_matrix[assignment]) == assignment_matrix[assignment]['e']
-        return score_total / len(assignment_matrix.columns)
+        if not isinstance(assignment_matrix, PackedAssignment):
+            assignment_matrix = PackedAssignment.from_matrix(assignment_matrix)
+        return assignment_matrix.score(self.truth(assignment_matrix))
+
+    def truth(self, packed: PackedAssignment) -> tuple[int, int]:
+        """
+        Evaluate this expression for all assignments at once by recursively combining the truth vectors
+        of its arguments.
+
+        :param packed: packed variable assignments
+        :return: true bits and false bits of the evaluation
+        """
+        if self.arg_2 is None:
+            return self.kleene(self.arg_1.truth(packed))
+        return self.kleene(self.arg_1.truth(packed), self.arg_2.truth(packed))
 
     def size(self) -> int:
         """
@@ -42,20 +61,23 @@ class Expression:
         else:
             return self.arg_1.size() + self.arg_2.size() + 1
 
-    def depth(self) -> int:
+    def depth(self, nary: bool = False) -> int:
         """
         Return the amount of steps between this node and the deepest leaf below it.
 
+        :param nary: count a chain of the same associative operator, e.g. (a and b) and c, as a single n-ary node
         :return: level of depth
         """
         if self.arg_1 is None and self.arg_2 is None:
             return 1
         elif self.arg_1 is None:
-            return self.arg_2.depth() + 1
+            return self.arg_2.depth(nary) + 1
         elif self.arg_2 is None:
-            return self.arg_1.depth() + 1
+            return self.arg_1.depth(nary) + 1
+        elif nary and self.associative:
+            return max(operand.depth(nary) for operand in self.operands()) + 1
         else:
-            return max(self.arg_1.depth(), self.arg_2.depth()) + 1
+            return max(self.arg_1.depth(nary), self.arg_2.depth(nary)) + 1
 
     def nodes(self, node_types: list[type['Expression'], ...]) -> list['Expression']:
         """
@@ -74,32 +96,51 @@ class Expression:
             nodes = nodes + self.arg_1.nodes(node_types)
         return nodes
 
-    def set_child(self, child_expression: 'Expression') -> None:
+    def levels(self, node_types: list[type['Expression'], ...], level: int = 0) -> list[tuple['Expression', int]]:
+        """
+        Get all specified node types in an expression in the order of nodes, together with the number of nodes
+        above them. If no node types are specified return all nodes.
+
+        :param node_types: types of nodes to be returned
+        :param level: number of nodes above this node
+        :return: all nodes of specified type and their levels
+        """
+        levels = [(self, level)] if not node_types or self.__class__ in node_types else []
+        for arg in (self.arg_1, self.arg_2):
+            if arg is not None:
+                levels += arg.levels(node_types, level + 1)
+        return levels
+
+    def set_child(self, child_expression: 'Expression', rng: Random | None = None) -> None:
         """
         Incorporate child_expression as an argument for this expression.
 
         :param child_expression: expression to include
+        :param rng: random number generator, by default the global one of the random module
         """
+        rng = rng if rng is not None else random
         if self.__class__.__name__ == 'Not':
             self.arg_1 = child_expression
         else:
-            if sample([1, 2], k=1).pop() == 1:
+            if rng.random() < 0.5:
                 self.arg_1 = child_expression
             else:
                 self.arg_2 = child_expression
 
     def new_parent(self,
                    sibling_expression: 'Expression',
-                   node_types: list[type['Expression'], ...]) -> 'Expression':
+                   node_types: list[type['Expression'], ...],
+                   rng: Random | None = None) -> 'Expression':
         """
         Expand this expression with a node randomly chosen from node_types above this expression.
         Use sibling_expression as the second argument of the parent node if necessary.
 
         :param sibling_expression: second argument for the new parent node
         :param node_types: allowed types for the parent node
+        :param rng: random number generator, by default the global one of the random module
         :return: parent node
         """
-        node_class = sample(node_types, k=1).pop()
+        node_class = (rng if rng is not None else random).choice(node_types)
         if node_class.arity() == 1:
             return node_class(self)
         elif node_class.arity() == 2:
@@ -127,11 +168,11 @@ class Var(Expression):
         """
         return Var(self.subscript)
 
-    def evaluate(self, assignment: Series) -> bool | None:
+    def evaluate(self, assignment: 'Series | dict[str, bool | None]') -> bool | None:
         """
         Evaluate the logical value of this expression by assigning the variable.
 
-        :param assignment: values for variables
+        :param assignment: values for variables by label v_i, e.g. a column of the assignment matrix
         :return: evaluation of expression
         """
         eval_variable = assignment['v_' + str(self.subscript)]
@@ -139,6 +180,15 @@ class Var(Expression):
             return None
         return assignment['v_' + str(self.subscript)]
 
+    def truth(self, packed: PackedAssignment) -> tuple[int, int]:
+        """
+        Return the truth vector of the variable for all assignments.
+
+        :param packed: packed variable assignments
+        :return: true bits and false bits of the variable
+        """
+        return packed.variables[self.subscript]
+
     @staticmethod
     def arity() -> int:
         """
@@ -153,6 +203,7 @@ class Not(Expression):
     """
     Class to fulfill the role of the 'not' operator in first-order-logic.
     """
+    symbol, code, token = 'not', 1, 'N'
 
     def __str__(self) -> str:
         return 'not (' + str(self.arg_1) + ')'
@@ -166,11 +217,11 @@ class Not(Expression):
         """
         return Not(arg_1=self.arg_1.copy())
 
-    def evaluate(self, assignment: Series) -> bool | None:
+    def evaluate(self, assignment: 'Series | dict[str, bool | None]') -> bool | None:
         """
         Evaluate the logical value of this expression by recursively evaluating its arguments.
 
-        :param assignment: values for variables
+        :param assignment: values for variables by label v_i, e.g. a column of the assignment matrix
         :return: evaluation of expression
         """
         eval_arg_1 = self.arg_1.evaluate(assignment)
@@ -179,45 +230,14 @@ class Not(Expression):
         return not self.arg_1.evaluate(assignment)
 
     @staticmethod
-    def arity() -> int:
+    def kleene(arg_1: tuple[int, int]) -> tuple[int, int]:
         """
-        Return arity of this expression.
+        Negate the truth vector of the argument with three-valued logic.
 
-        :return: number of direct child nodes
+        :param arg_1: truth vector of the argument
+        :return: true bits and false bits of the evaluation
         """
-        return 1
-
-
-class Or(Expression):
-    """ Class to fulfill the role of the 'or' operator in first-order-logic. """
-
-    def __str__(self) -> str:
-        return '(' + str(self.arg_1) + ') or (' + str(self.arg_2) + ')'
-
-    def copy(self) -> 'Or':
-        """
-        Create a copy of this node and recursively copy the expression tree below this node.
-        This generates a logically equivalent expression composed of entirely different instances.
-
-        :return: deep copied expression
-        """
-        return Or(arg_1=self.arg_1.copy(), arg_2=self.arg_2.copy())
-
-    def evaluate(self, assignment: Series) -> bool | None:
-        """
-        Evaluate the logical value of this expression by recursively evaluating its arguments.
-
-        :param assignment: values for variables
-        :return: evaluation of expression
-        """
-        eval_arg_1 = self.arg_1.evaluate(assignment)
-        eval_arg_2 = self.arg_2.evaluate(assignment)
-        if eval_arg_1 is None or eval_arg_2 is None:
-            if eval_arg_1 is True or eval_arg_2 is True:
-                return True
-            else:
-                return None
-        return eval_arg_1 or eval_arg_2
+        return arg_1[1], arg_1[0]
 
     @staticmethod
     def arity() -> int:
@@ -226,118 +246,156 @@ class Or(Expression):
 
         :return: number of direct child nodes
         """
-        return 2
+        return 1
 
 
-class And(Expression):
-    """ Class to fulfill the role of the 'and' operator in first-order-logic. """
+OPERATORS['Not'] = Not
 
-    def __str__(self) -> str:
-        return '(' + str(self.arg_1) + ') and (' + str(self.arg_2) + ')'
 
-    def copy(self) -> 'And':
-        """
-        Create a copy of this node and recursively copy the expression tree below this node.
-        This generates a logically equivalent expression composed of entirely different instances.
+def kleene_operator(true_terms: list[tuple[tuple[int, int], ...]]) -> Callable:
+    """
+    Build the Kleene operator on truth vectors from the terms of the true bits of a binary truth table. A
+    table that is not constant has one of four forms, each with its own closure over the bits it combines:
+    an argument or its negation, e.g. the true bits arg_1[0], a disjunction like Or, arg_1[0] | arg_2[0],
+    a conjunction like And, arg_1[0] & arg_2[0], or a parity like Xor, arg_1[0] & arg_2[1] | arg_1[1] & arg_2[0].
+    The false bits take the complementary form over the other bits of the same arguments.
+
+    :param true_terms: terms of the true bits as returned by BinaryOperator.kleene_terms
+    :return: function of the truth vectors of both arguments returning the true bits and false bits
+    """
+    if len(true_terms) == 1 and len(true_terms[0]) == 1:
+        (i, t), = true_terms[0]
+        f = 1 - t
+        if i == 1:
+            return lambda arg_1, arg_2: (arg_1[t], arg_1[f])
+        return lambda arg_1, arg_2: (arg_2[t], arg_2[f])
+    if len(true_terms) == 1:
+        (_, t_1), (_, t_2) = true_terms[0]
+        f_1, f_2 = 1 - t_1, 1 - t_2
+        return lambda arg_1, arg_2: (arg_1[t_1] & arg_2[t_2], arg_1[f_1] | arg_2[f_2])
+    if all(len(term) == 1 for term in true_terms):
+        t_1, t_2 = (bit for (_, bit), in sorted(true_terms))
+        f_1, f_2 = 1 - t_1, 1 - t_2
+        return lambda arg_1, arg_2: (arg_1[t_1] | arg_2[t_2], arg_1[f_1] & arg_2[f_2])
+    (_, t_1), (_, t_2) = min(true_terms)
+    f_1, f_2 = 1 - t_1, 1 - t_2
+    return lambda arg_1, arg_2: (arg_1[t_1] & arg_2[t_2] | arg_1[f_1] & arg_2[f_2],
+                                 arg_1[t_1] & arg_2[f_2] | arg_1[f_1] & arg_2[t_2])
+
+
+def conjunction_truth(self: Expression, packed: PackedAssignment) -> tuple[int, int]:
+    """
+    Evaluate a node with the truth table of And, combining the truth vectors of its arguments in place
+    instead of calling kleene, so every node of a chain like (a and b) and c takes a single call.
 
-        :return: deep copied expression
-        """
-        return And(arg_1=self.arg_1.copy(), arg_2=self.arg_2.copy())
+    :param packed: packed variable assignments
+    :return: true bits and false bits of the evaluation
+    """
+    true_1, false_1 = self.arg_1.truth(packed)
+    true_2, false_2 = self.arg_2.truth(packed)
+    return true_1 & true_2, false_1 | false_2
 
-    def evaluate(self, assignment: Series) -> bool | None:
-        """
-        Evaluate the logical value of this expression by recursively evaluating its arguments.
 
-        :param assignment: values for variables
-        :return: evaluation of expression
-        """
-        eval_arg_1 = self.arg_1.evaluate(assignment)
-        eval_arg_2 = self.arg_2.evaluate(assignment)
-        if eval_arg_1 is None or eval_arg_2 is None:
-            if eval_arg_1 is False or eval_arg_2 is False:
-                return False
-            else:
-                return None
-        return eval_arg_1 and eval_arg_2
+def disjunction_truth(self: Expression, packed: PackedAssignment) -> tuple[int, int]:
+    """
+    Evaluate a node with the truth table of Or like conjunction_truth.
 
-    @staticmethod
-    def arity() -> int:
-        """
-        Return arity of this expression.
+    :param packed: packed variable assignments
+    :return: true bits and false bits of the evaluation
+    """
+    true_1, false_1 = self.arg_1.truth(packed)
+    true_2, false_2 = self.arg_2.truth(packed)
+    return true_1 | true_2, false_1 & false_2
 
-        :return: number of direct child nodes
-        """
-        return 2
 
+class BinaryOperator(Expression):
+    """
+    Parent class of the binary operators, which are declared by their truth table. The three-valued
+    evaluation and the Kleene operator on truth vectors are derived from the table when a subclass is
+    defined: the result is True or False if it is the same for every value of the None arguments, and
+    None otherwise. Operators with the table of And or Or evaluate their arguments without calling kleene.
+    Every subclass is registered in OPERATORS under its class name.
+    """
 
-class Nand(Expression):
-    """ Class to fulfill the role of the 'nand' operator in first-order-logic. """
+    symbol = ''  # infix symbol used by __str__
+    table = ()  # results for the arguments (True, True), (True, False), (False, True) and (False, False)
+    code = None  # code in the binary form of Serialization
+    token = None  # letter in the text form of Serialization
+    kleene_table = {}
+    associative = False
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        if 'table' not in cls.__dict__:
+            return
+        if len(cls.table) != 4 or len(set(cls.table)) != 2:
+            raise ValueError(f'{cls.__name__} needs a truth table of four values that is not constant')
+        results = dict(zip(((True, True), (True, False), (False, True), (False, False)), cls.table))
+        cls.kleene_table = {}
+        for arg_1 in (True, False, None):
+            for arg_2 in (True, False, None):
+                outcomes = {results[value_1, value_2]
+                            for value_1 in ((True, False) if arg_1 is None else (arg_1,))
+                            for value_2 in ((True, False) if arg_2 is None else (arg_2,))}
+                cls.kleene_table[arg_1, arg_2] = outcomes.pop() if len(outcomes) == 1 else None
+        true_terms = cls.kleene_terms(True)
+        cls.kleene = staticmethod(kleene_operator(true_terms))
+        if 'truth' not in cls.__dict__ and true_terms == [((1, 0), (2, 0))]:
+            cls.truth = conjunction_truth
+        elif 'truth' not in cls.__dict__ and true_terms == [((1, 0),), ((2, 0),)]:
+            cls.truth = disjunction_truth
+        cls.associative = all(results[results[a, b], c] == results[a, results[b, c]]
+                              for a in (True, False) for b in (True, False) for c in (True, False))
+        OPERATORS[cls.__name__] = cls
+
+    @classmethod
+    def kleene_terms(cls, result: bool) -> list[tuple[tuple[int, int], ...]]:
+        """
+        Find the argument combinations that decide the given result with the fewest known arguments, e.g.
+        [((1, 0),), ((2, 0),)] for the true bits of Or: the true bits of arg_1 or the true bits of arg_2.
+
+        :param result: True for the terms of the true bits, False for the false bits
+        :return: terms of the bitwise formula, each a conjunction of (argument, bit) with bit 0 for the
+                 true bits and 1 for the false bits of the argument
+        """
+        deciding = [arguments for arguments, value in cls.kleene_table.items() if value is result]
+        terms = []
+        for arguments in deciding:
+            if any(other != arguments and all(o is None or o == a for o, a in zip(other, arguments))
+                   for other in deciding):
+                continue  # a combination with more None arguments decides the result as well
+            terms.append(tuple((i, 0 if value else 1) for i, value in enumerate(arguments, 1) if value is not None))
+        return terms
 
     def __str__(self) -> str:
-        return '(' + str(self.arg_1) + ') nand (' + str(self.arg_2) + ')'
+        return '(' + str(self.arg_1) + ') ' + self.symbol + ' (' + str(self.arg_2) + ')'
 
-    def copy(self) -> 'Nand':
+    def copy(self) -> 'BinaryOperator':
         """
         Create a copy of this node and recursively copy the expression tree below this node.
         This generates a logically equivalent expression composed of entirely different instances.
 
         :return: deep copied expression
         """
-        return Nand(arg_1=self.arg_1.copy(), arg_2=self.arg_2.copy())
+        return self.__class__(arg_1=self.arg_1.copy(), arg_2=self.arg_2.copy())
 
-    def evaluate(self, assignment: Series) -> bool | None:
+    def evaluate(self, assignment: 'Series | dict[str, bool | None]') -> bool | None:
         """
         Evaluate the logical value of this expression by recursively evaluating its arguments.
 
-        :param assignment: values for variables
+        :param assignment: values for variables by label v_i, e.g. a column of the assignment matrix
         :return: evaluation of expression
         """
-        eval_arg_1 = self.arg_1.evaluate(assignment)
-        eval_arg_2 = self.arg_2.evaluate(assignment)
-        if eval_arg_1 is None or eval_arg_2 is None:
-            if eval_arg_1 is False or eval_arg_2 is False:
-                return True
-            else:
-                return None
-        return not (eval_arg_1 and eval_arg_2)
-
-    @staticmethod
-    def arity() -> int:
-        """
-        Return arity of this expression.
-
-        :return: number of direct child nodes
-        """
-        return 2
-
-
-class Xor(Expression):
-    """ Class to fulfill the role of the 'xor' operator in first-order-logic. """
-
-    def __str__(self) -> str:
-        return '(' + str(self.arg_1) + ') xor (' + str(self.arg_2) + ')'
-
-    def copy(self) -> 'Xor':
-        """
-        Create a copy of this node and recursively copy the expression tree below this node.
-        This generates a logically equivalent expression composed of entirely different instances.
+        return self.kleene_table[self.arg_1.evaluate(assignment), self.arg_2.evaluate(assignment)]
 
-        :return: deep copied expression
+    def operands(self) -> list[Expression]:
         """
-        return Xor(arg_1=self.arg_1.copy(), arg_2=self.arg_2.copy())
+        Return the arguments of the chain of this operator below this node, e.g. a, b and c for (a and b) and c.
 
-    def evaluate(self, assignment: Series) -> bool | None:
+        :return: arguments that are not nodes of this operator
         """
-        Evaluate the logical value of this expression by recursively evaluating its arguments.
-
-        :param assignment: values for variables
-        :return: evaluation of expression
-        """
-        eval_arg_1 = self.arg_1.evaluate(assignment)
-        eval_arg_2 = self.arg_2.evaluate(assignment)
-        if eval_arg_1 is None or eval_arg_2 is None:
-            return None
-        return (eval_arg_1 and not eval_arg_2) or (not eval_arg_1 and eval_arg_2)
+        return [operand for arg in (self.arg_1, self.arg_2)
+                for operand in (arg.operands() if arg.__class__ is self.__class__ else [arg])]
 
     @staticmethod
     def arity() -> int:
@@ -349,86 +407,47 @@ class Xor(Expression):
         return 2
 
 
-class Implies(Expression):
-    """ Class to fulfill the role of the 'implication' operator in first-order-logic. """
+class Or(BinaryOperator):
+    """ Class to fulfill the role of the 'or' operator in first-order-logic. """
+    symbol, table, code, token = 'or', (True, True, True, False), 2, 'O'
 
-    def __str__(self) -> str:
-        return '(' + str(self.arg_1) + ') -> (' + str(self.arg_2) + ')'
 
-    def copy(self) -> 'Implies':
-        """
-        Create a copy of this node and recursively copy the expression tree below this node.
-        This generates a logically equivalent expression composed of entirely different instances.
+class And(BinaryOperator):
+    """ Class to fulfill the role of the 'and' operator in first-order-logic. """
+    symbol, table, code, token = 'and', (True, False, False, False), 3, 'A'
 
-        :return: deep copied expression
-        """
-        return Implies(arg_1=self.arg_1.copy(), arg_2=self.arg_2.copy())
 
-    def evaluate(self, assignment: Series) -> bool | None:
-        """
-        Evaluate the logical value of this expression by recursively evaluating its arguments.
+class Nand(BinaryOperator):
+    """ Class to fulfill the role of the 'nand' operator in first-order-logic. """
+    symbol, table, code, token = 'nand', (False, True, True, True), 4, 'D'
 
-        :param assignment: values for variables
-        :return: evaluation of expression
-        """
-        eval_arg_1 = self.arg_1.evaluate(assignment)
-        eval_arg_2 = self.arg_2.evaluate(assignment)
-        if eval_arg_1 is None or eval_arg_2 is None:
-            if eval_arg_1 is False or eval_arg_2 is True:
-                return True
-            else:
-                return None
-        return not eval_arg_1 or eval_arg_2
 
-    @staticmethod
-    def arity() -> int:
-        """
-        Return arity of this expression.
+class Xor(BinaryOperator):
+    """ Class to fulfill the role of the 'xor' operator in first-order-logic. """
+    symbol, table, code, token = 'xor', (False, True, True, False), 5, 'X'
 
-        :return: number of direct child nodes
-        """
-        return 2
 
+class Implies(BinaryOperator):
+    """ Class to fulfill the role of the 'implication' operator in first-order-logic. """
+    symbol, table, code, token = '->', (True, False, True, True), 6, 'I'
 
-class Converse(Expression):
-    """ Class to fulfill the role of the 'implicational converse' operator in first-order-logic. """
 
-    def __str__(self) -> str:
-        return '(' + str(self.arg_1) + ') <- (' + str(self.arg_2) + ')'
+class Converse(BinaryOperator):
+    """ Class to fulfill the role of the 'implicational converse' operator in first-order-logic. """
+    symbol, table, code, token = '<-', (True, True, False, True), 7, 'C'
 
-    def copy(self) -> 'Converse':
-        """
-        Create a copy of this node and recursively copy the expression tree below this node.
-        This generates a logically equivalent expression composed of entirely different instances.
 
-        :return: deep copied expression
-        """
-        return Converse(arg_1=self.arg_1.copy(), arg_2=self.arg_2.copy())
+class Nor(BinaryOperator):
+    """ Class to fulfill the role of the 'nor' operator in first-order-logic. """
+    symbol, table, code, token = 'nor', (False, False, False, True), 255, 'R'
 
-    def evaluate(self, assignment: Series) -> bool | None:
-        """
-        Evaluate the logical value of this expression by recursively evaluating its arguments.
 
-        :param assignment: values for variables
-        :return: evaluation of expression
-        """
-        eval_arg_1 = self.arg_1.evaluate(assignment)
-        eval_arg_2 = self.arg_2.evaluate(assignment)
-        if eval_arg_1 is None or eval_arg_2 is None:
-            if eval_arg_1 is True or eval_arg_2 is False:
-                return True
-            else:
-                return None
-        return eval_arg_1 or not eval_arg_2
+class Xnor(BinaryOperator):
+    """ Class to fulfill the role of the 'equivalence' operator in first-order-logic. """
+    symbol, table, code, token = '<->', (True, False, False, True), 254, 'E'
 
-    @staticmethod
-    def arity() -> int:
-        """
-        Return arity of this expression.
 
-        :return: number of direct child nodes
-        """
-        return 2
+Equiv = OPERATORS['Equiv'] = Xnor  # alias, e.g. for --binary_operators equiv
 
 
 class RandomExpression(Expression):
@@ -437,7 +456,9 @@ class RandomExpression(Expression):
                 v_n: int,
                 binary_operators: tuple[type[Expression], ...]  = (Or, And),
                 unary_operators: tuple[type[Expression], ...] = (Not,),
-                maxdepth: int = 10) -> Expression:
+                maxdepth: int = 10,
+                rng: Random | None = None,
+                maxsize: int | None = None) -> Expression:
         """
         Generate a random Expression.
 
@@ -445,17 +466,124 @@ class RandomExpression(Expression):
         :param maxdepth: maximum depth of the expression
         :param binary_operators: only use these binary operators
         :param unary_operators: only use these unary operators
+        :param rng: random number generator, by default the global one of the random module
+        :param maxsize: maximum number of nodes of the expression, by default unlimited
         :return: new random expression
         """
+        rng = rng if rng is not None else random
         node_options = [Var]  # increase the probability of a variable
-        if maxdepth > 0:
-            node_options += list(binary_operators) + list(unary_operators)
-        node_type = sample(node_options, k=1).pop()
+        if maxdepth > 1:
+            node_options += [node_class for node_class in list(binary_operators) + list(unary_operators)
+                             if maxsize is None or node_class.arity() < maxsize]
+        node_type = rng.choice(node_options)
 
         if node_type.arity() == 1:
-            return node_type(RandomExpression(v_n, binary_operators, unary_operators, maxdepth-1))
+            return node_type(RandomExpression(v_n, binary_operators, unary_operators, maxdepth-1, rng,
+                                              maxsize - 1 if maxsize is not None else None))
         elif node_type.arity() == 2:
-            return node_type(RandomExpression(v_n, binary_operators, unary_operators, maxdepth-1),
-                             RandomExpression(v_n, binary_operators, unary_operators, maxdepth-1))
+            arg_1 = RandomExpression(v_n, binary_operators, unary_operators, maxdepth-1, rng,
+                                     maxsize - 2 if maxsize is not None else None)
+            return node_type(arg_1, RandomExpression(v_n, binary_operators, unary_operators, maxdepth-1, rng,
+                                                     maxsize - 1 - arg_1.size() if maxsize is not None else None))
+        else:
+            return node_type(rng.randrange(1, v_n+1))
+
+
+# shapes of random_expressions
+SHAPES = ('grow', 'full', 'ramped')
+
+
+class RandomDraws:
+    """
+    Random choices taken from a block of random bytes drawn at once, so the generator is called once per block
+    instead of once per choice.
+    """
+
+    def __init__(self, rng: Random | None = None, block: int = 4096) -> None:
+        """
+        :param rng: random number generator, by default the global one of the random module
+        :param block: number of choices per block
+        """
+        self.rng = rng if rng is not None else random
+        self.block = block
+        self.values = memoryview(b'').cast('I')
+        self.position = 0
+
+    def below(self, n: int) -> int:
+        """
+        :param n: number of options
+        :return: random integer from 0 to n-1
+        """
+        if self.position == len(self.values):
+            self.values = memoryview(self.rng.randbytes(4 * self.block)).cast('I')
+            self.position = 0
+        self.position += 1
+        return self.values[self.position - 1] * n >> 8 * self.values.itemsize
+
+
+def random_expressions(n: int,
+                       v_n: int,
+                       binary_operators: tuple[type[Expression], ...] = (Or, And),
+                       unary_operators: tuple[type[Expression], ...] = (Not,),
+                       maxdepth: int = 10,
+                       rng: Random | None = None,
+                       maxsize: int | None = None,
+                       shape: str = 'grow',
+                       exclude: list[Expression] | None = None,
+                       tries: int | None = None) -> list[Expression]:
+    """
+    Generate n distinct random expressions at once. Duplicates are rejected by looking up their string form in
+    a set, and the choices are taken from blocks of random bytes.
+
+    :param n: number of expressions
+    :param v_n: number of variables
+    :param binary_operators: only use these binary operators
+    :param unary_operators: only use these unary operators
+    :param maxdepth: maximum depth of the expressions
+    :param rng: random number generator, by default the global one of the random module
+    :param maxsize: maximum number of nodes of the expressions, by default unlimited
+    :param shape: 'grow' chooses every node among the variables and the operators like RandomExpression,
+                  'full' chooses operators until maxdepth or maxsize is reached, 'ramped' (ramped half-and-half)
+                  cycles the maximum depth from 2 to maxdepth and builds every other expression of a depth with
+                  'full' and the others with 'grow'
+    :param exclude: expressions not to generate, e.g. those already in a population
+    :param tries: maximum number of generated expressions including the rejected ones, by default 20*n + 500
+    :return: up to n distinct expressions, fewer if the tries ran out
+    :raises ValueError: if shape is unknown
+    """
+    if shape not in SHAPES:
+        raise ValueError(f'Unknown shape {shape!r}, choose from {", ".join(SHAPES)}')
+    draws = RandomDraws(rng)
+    operators = list(binary_operators) + list(unary_operators)
+    unary = list(unary_operators)
+
+    def build(depth: int, size: int | None, full: bool) -> Expression:
+        options = operators if size is None or size > 2 else unary if size == 2 else []
+        options = options if depth > 1 else []
+        if full and options:
+            node_type = options[draws.below(len(options))]
+        else:
+            choice = draws.below(len(options) + 1)  # a variable or any operator, like RandomExpression
+            if choice == 0:
+                return Var(draws.below(v_n) + 1)
+            node_type = options[choice - 1]
+        if node_type.arity() == 1:
+            return node_type(build(depth - 1, size - 1 if size is not None else None, full))
+        arg_1 = build(depth - 1, size - 2 if size is not None else None, full)
+        return node_type(arg_1, build(depth - 1, size - 1 - arg_1.size() if size is not None else None, full))
+
+    depths = list(range(min(2, maxdepth), maxdepth + 1))
+    seen = {str(expression) for expression in exclude or []}
+    expressions = []
+    for attempt in range(tries if tries is not None else 20 * n + 500):
+        if len(expressions) == n:
+            break
+        if shape == 'ramped':
+            expression = build(depths[attempt % len(depths)], maxsize, attempt // len(depths) % 2 == 0)
         else:
-            return node_type(sample(range(1, v_n+1), k=1).pop())
+            expression = build(maxdepth, maxsize, shape == 'full')
+        key = str(expression)
+        if key not in seen:
+            seen.add(key)
+            expressions.append(expression)
+    return expressions
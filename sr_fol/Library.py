@@ -0,0 +1,132 @@
+from bisect import bisect_right
+from sr_fol.Expression import Expression
+from sr_fol.Semantics import PackedAssignment
+
+
+class SubtreeTruths:
+    """
+    Truth vectors of the subtrees indexed by libraries, shared by the libraries of all populations and, for
+    several targets, of all solvers over the same variables. A subtree is identified by its operator class and
+    the identities of its arguments, so a subtree indexed before is looked up instead of evaluated again. The
+    truth vectors are as large as the assignments, so only those of the current and the previous generation
+    are kept.
+    """
+
+    def __init__(self) -> None:
+        self.current = {}
+        self.previous = {}
+        self.variables = None
+        self.a_n = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.current)
+
+    def age(self) -> None:
+        """ Start a new generation, the truth vectors not used since the previous one are forgotten. """
+        self.previous, self.current = self.current, {}
+
+    def bind(self, packed: PackedAssignment) -> None:
+        """
+        Forget the truth vectors if other variables are evaluated or assignments were added.
+
+        :param packed: packed variable assignments
+        """
+        if self.variables is not packed.variables or self.a_n != packed.a_n:
+            self.current, self.previous = {}, {}
+            self.variables, self.a_n = packed.variables, packed.a_n
+
+    def get(self, key: tuple) -> tuple[int, int] | None:
+        """
+        :param key: identity of a subtree
+        :return: truth vector of the subtree or None if it is not kept
+        """
+        truth = self.current.get(key)
+        if truth is None:
+            truth = self.previous.get(key)
+            if truth is None:
+                self.misses += 1
+                return None
+            self.current[key] = truth
+        self.hits += 1
+        return truth
+
+    def put(self, key: tuple, truth: tuple[int, int]) -> None:
+        """
+        :param key: identity of a subtree
+        :param truth: truth vector of the subtree
+        """
+        self.current[key] = truth
+
+
+class SubtreeLibrary:
+    """
+    Index of the semantically distinct subtrees of a population. For every truth vector only the shallowest,
+    then smallest subtree producing it is kept, together with its depth and size. The entries are ordered
+    by depth, so the donors fitting a depth budget are a prefix of the index and no tree has to be walked.
+    """
+
+    def __init__(self, truths: SubtreeTruths | None = None) -> None:
+        """
+        :param truths: truth vectors of subtrees shared with other libraries, by default every subtree is evaluated
+        """
+        self.entries = {}
+        self.donor_list = []
+        self.donor_depths = []
+        self.truths = truths
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def update(self, expressions: list[Expression], packed: PackedAssignment) -> None:
+        """
+        Rebuild the index from all subtrees of the given expressions.
+
+        :param expressions: expressions to index
+        :param packed: packed variable assignments
+        """
+        self.entries = {}
+        if self.truths is not None:
+            self.truths.bind(packed)
+        for expression in expressions:
+            self.add(expression, packed)
+        self.donor_list = sorted(((value, node, depth, size) for value, (node, depth, size) in self.entries.items()),
+                                 key=lambda x: (x[2], x[3]))
+        self.donor_depths = [donor[2] for donor in self.donor_list]
+
+    def add(self, node: Expression, packed: PackedAssignment) -> tuple[tuple, tuple[int, int], int, int]:
+        """
+        Index a subtree and all of its subtrees.
+
+        :param node: root of the subtree
+        :param packed: packed variable assignments
+        :return: identity, truth vector, depth and size of the subtree
+        """
+        arguments = [self.add(arg, packed) for arg in (node.arg_1, node.arg_2) if arg is not None]
+        if arguments:
+            key = (node.__class__,) + tuple(argument[0] for argument in arguments)
+            depth = max(argument[2] for argument in arguments) + 1
+            size = sum(argument[3] for argument in arguments) + 1
+        else:
+            key = (node.__class__, node.subscript)
+            depth, size = 1, 1
+        value = self.truths.get(key) if self.truths is not None else None
+        if value is None:
+            value = packed.variables[node.subscript] if not arguments else \
+                node.kleene(*(argument[1] for argument in arguments))
+            if self.truths is not None:
+                self.truths.put(key, value)
+        entry = self.entries.get(value)
+        if entry is None or (depth, size) < (entry[1], entry[2]):
+            self.entries[value] = (node, depth, size)
+        return key, value, depth, size
+
+    def donors(self, maxdepth: int) -> list[tuple[tuple[int, int], Expression, int, int]]:
+        """
+        Return all indexed subtrees with a depth of at most maxdepth.
+
+        :param maxdepth: maximum depth of the subtrees
+        :return: truth vectors, subtrees, depths and sizes
+        """
+        return self.donor_list[:bisect_right(self.donor_depths, maxdepth)]
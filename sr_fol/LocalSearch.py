@@ -0,0 +1,155 @@
+from sr_fol.Expression import Expression, Var
+from sr_fol.Semantics import PackedAssignment
+
+
+class NodeSemantics:
+    """
+    Flattened view of an expression tree that caches the truth vector of every node. The effect of changing
+    a single node is calculated by recombining the cached truth vectors along the path to the root, so a
+    candidate change costs as many operator applications as the node is deep instead of a full evaluation.
+    """
+
+    def __init__(self, expression: Expression, packed: PackedAssignment) -> None:
+        """
+        :param expression: expression to analyze
+        :param packed: packed variable assignments
+        """
+        self.packed = packed
+        self.nodes = [expression]
+        self.parents = [-1]
+        self.positions = [0]
+        self.depths = [1]
+        self.children = []
+        i = 0
+        while i < len(self.nodes):
+            node = self.nodes[i]
+            self.children.append([])
+            for position, child in ((1, node.arg_1), (2, node.arg_2)):
+                if child is not None:
+                    self.children[i].append(len(self.nodes))
+                    self.nodes.append(child)
+                    self.parents.append(i)
+                    self.positions.append(position)
+                    self.depths.append(self.depths[i] + 1)
+            i += 1
+
+        # children are always listed after their parents, so a reversed pass sees them first
+        self.values = [(0, 0)] * len(self.nodes)
+        self.heights = [1] * len(self.nodes)
+        self.sizes = [1] * len(self.nodes)
+        for i in reversed(range(len(self.nodes))):
+            node = self.nodes[i]
+            if isinstance(node, Var):
+                self.values[i] = packed.variables[node.subscript]
+            else:
+                self.values[i] = node.kleene(*[self.values[child] for child in self.children[i]])
+                self.heights[i] = max(self.heights[child] for child in self.children[i]) + 1
+                self.sizes[i] = sum(self.sizes[child] for child in self.children[i]) + 1
+
+    def propagate(self, i: int, value: tuple[int, int]) -> tuple[int, int]:
+        """
+        Return the truth vector of the whole expression if node i evaluated to value.
+
+        :param i: index of the changed node
+        :param value: new truth vector of the changed node
+        :return: true bits and false bits of the expression
+        """
+        while self.parents[i] >= 0:
+            parent = self.parents[i]
+            arguments = [self.values[child] for child in self.children[parent]]
+            arguments[self.positions[i] - 1] = value
+            value = self.nodes[parent].kleene(*arguments)
+            i = parent
+        return value
+
+    def correct(self, i: int, value: tuple[int, int]) -> int:
+        """
+        Return the number of correctly evaluated assignments if node i evaluated to value.
+
+        :param i: index of the changed node
+        :param value: new truth vector of the changed node
+        :return: amount of correct assignments
+        """
+        return self.packed.correct(self.propagate(i, value)).bit_count()
+
+    def replace(self, i: int, new_node: Expression) -> Expression:
+        """
+        Put new_node in place of node i and return the root of the changed expression.
+
+        :param i: index of the replaced node
+        :param new_node: replacement
+        :return: root of the expression
+        """
+        if self.parents[i] < 0:
+            return new_node
+        parent = self.nodes[self.parents[i]]
+        if self.positions[i] == 1:
+            parent.arg_1 = new_node
+        else:
+            parent.arg_2 = new_node
+        return self.nodes[0]
+
+
+def hill_climb(expression: Expression,
+               packed: PackedAssignment,
+               binary_operators: tuple[type[Expression], ...],
+               unary_operators: tuple[type[Expression], ...],
+               maxdepth: int,
+               steps: int = 10,
+               maxsize: int | None = None) -> Expression:
+    """
+    Refine an expression by repeatedly applying the best single-node change: swapping an operator for
+    another allowed operator, swapping the variable of a leaf, inserting a unary operator above a node or
+    removing a unary operator. A change is kept if it evaluates more assignments correctly, or equally many
+    with fewer nodes. The search stops in a local optimum or after the given number of steps.
+
+    :param expression: expression to refine, it is not changed
+    :param packed: packed variable assignments and associated evaluations
+    :param binary_operators: only use these binary operators
+    :param unary_operators: only use these unary operators
+    :param maxdepth: maximum depth of the refined expression
+    :param steps: maximum number of changes applied
+    :param maxsize: maximum number of nodes of the refined expression, by default unlimited
+    :return: refined copy of the expression
+    """
+    expression = expression.copy()
+    for _ in range(steps):
+        semantics = NodeSemantics(expression, packed)
+        best_change = (semantics.packed.correct(semantics.values[0]).bit_count(), 0)
+        best_move = None
+        for i, node in enumerate(semantics.nodes):
+            candidates = []
+            arguments = [semantics.values[child] for child in semantics.children[i]]
+            if isinstance(node, Var):
+                candidates += [(packed.variables[subscript], 0, ('var', subscript))
+                               for subscript in packed.variables if subscript != node.subscript]
+            elif node.arity() == 2:
+                candidates += [(node_class.kleene(*arguments), 0, ('swap', node_class))
+                               for node_class in binary_operators if node_class is not node.__class__]
+            elif node.arity() == 1:
+                candidates += [(node_class.kleene(*arguments), 0, ('swap', node_class))
+                               for node_class in unary_operators if node_class is not node.__class__]
+                candidates.append((arguments[0], -1, ('remove', None)))
+            if (semantics.depths[i] + semantics.heights[i] <= maxdepth
+                    and (maxsize is None or semantics.sizes[0] < maxsize)):
+                candidates += [(node_class.kleene(semantics.values[i]), 1, ('insert', node_class))
+                               for node_class in unary_operators]
+
+            for value, size_change, move in candidates:
+                change = (semantics.correct(i, value), -size_change)
+                if change > best_change:
+                    best_change, best_move = change, (i, move)
+
+        if best_move is None:
+            break
+        i, (kind, option) = best_move
+        node = semantics.nodes[i]
+        if kind == 'var':
+            node.subscript = option
+        elif kind == 'swap':
+            expression = semantics.replace(i, option(node.arg_1, node.arg_2))
+        elif kind == 'insert':
+            expression = semantics.replace(i, option(node))
+        else:
+            expression = semantics.replace(i, node.arg_1)
+    return expression
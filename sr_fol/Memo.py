@@ -0,0 +1,136 @@
+from sr_fol.Expression import Expression
+from sr_fol.Semantics import PackedAssignment
+
+
+class SubtreeMemo:
+    """
+    Evaluation memo of the subtrees of all expressions scored in a generation, shared by the populations of a
+    Solver. Crossover spreads the same subtrees over many expressions of all populations; with the memo every
+    structurally distinct subtree is evaluated once per generation and packed assignment. A subtree is identified
+    by its operator class and the ids of its arguments, assigned bottom-up, so looking up a node takes constant
+    time however large its subtree is.
+
+    The truth vectors are as large as the assignments, so only those of the subtrees planned to be used again
+    are kept, each until its last planned use. Expressions evaluated without plan share the ids but keep nothing.
+    """
+
+    def __init__(self) -> None:
+        self.ids = {}
+        self.keys = []
+        self.sizes = []
+        self.uses = {}
+        self.truths = {}
+        self.roots = {}
+        self.packed = None
+        self.a_n = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def clear(self) -> None:
+        """ Forget the subtrees and the plan, e.g. at the start of a generation. The counts of nodes are kept. """
+        self.ids = {}
+        self.keys = []
+        self.sizes = []
+        self.uses = {}
+        self.truths = {}
+        self.roots = {}
+
+    def node(self, expression: Expression) -> int:
+        """
+        :param expression: node of an expression
+        :return: id of the subtree of the node
+        """
+        arity = expression.arity()
+        if arity == 0:
+            key = (expression.__class__, expression.subscript)
+        elif arity == 1:
+            key = (expression.__class__, self.node(expression.arg_1))
+        else:
+            key = (expression.__class__, self.node(expression.arg_1), self.node(expression.arg_2))
+        entry = self.ids.get(key)
+        if entry is None:
+            entry = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+            self.sizes.append(1 if arity == 0 else 1 + sum(self.sizes[argument] for argument in key[1:]))
+        return entry
+
+    def bind(self, packed: PackedAssignment) -> None:
+        """
+        Clear the memo if other variables are evaluated or assignments were added. The truth vectors only depend
+        on the variables, so the packed assignments of several targets over the same variables share the memo.
+
+        :param packed: packed variable assignments
+        """
+        if self.packed is None or self.packed.variables is not packed.variables or self.a_n != packed.a_n:
+            self.clear()
+            self.packed, self.a_n = packed, packed.a_n
+
+    def plan(self, expressions: list[Expression], packed: PackedAssignment) -> None:
+        """
+        Count the uses of the subtrees of expressions about to be evaluated. A subtree is used once per
+        occurrence in a subtree evaluated anew; its own arguments are only used by its first evaluation.
+
+        :param expressions: expressions to evaluate
+        :param packed: packed variable assignments they are evaluated on
+        """
+        self.bind(packed)
+        for expression in expressions:
+            self.roots[id(expression)] = (expression, self.node(expression))
+            pending = [self.roots[id(expression)][1]]
+            while pending:
+                entry = pending.pop()
+                self.uses[entry] = self.uses.get(entry, 0) + 1
+                if self.uses[entry] == 1 and self.sizes[entry] > 1:
+                    pending.extend(self.keys[entry][1:])
+
+    def truth(self, expression: Expression, packed: PackedAssignment) -> tuple[int, int]:
+        """
+        Return the truth vector of an expression, evaluating only the subtrees not kept from earlier evaluations.
+        The memo is cleared when other variables are evaluated or assignments were added. The id of a
+        planned expression is taken from the plan, so it must not be changed until it is evaluated.
+
+        :param expression: expression to evaluate
+        :param packed: packed variable assignments
+        :return: true bits and false bits of the expression
+        """
+        self.bind(packed)
+        root = self.roots.pop(id(expression), None)
+        return self.evaluate(root[1] if root is not None and root[0] is expression else self.node(expression))
+
+    def evaluate(self, entry: int) -> tuple[int, int]:
+        """
+        :param entry: id of a subtree
+        :return: truth vector of the subtree, kept if the plan uses it again
+        """
+        uses = self.uses.get(entry, 0)
+        if uses > 0:
+            self.uses[entry] = uses - 1
+        truth = self.truths.get(entry)
+        if truth is not None:
+            self.hits += self.sizes[entry]
+            if uses <= 1:
+                del self.truths[entry]
+            return truth
+        key = self.keys[entry]
+        if self.sizes[entry] == 1:
+            truth = self.packed.variables[key[1]]
+        else:
+            truth = key[0].kleene(*(self.evaluate(argument) for argument in key[1:]))
+        self.misses += 1
+        if uses > 1:
+            self.truths[entry] = truth
+        return truth
+
+    def stats(self) -> dict:
+        """
+        :return: number of distinct subtrees since the last clear, evaluated (misses) and reused (hits) nodes so
+                 far and the fraction of node evaluations removed by the memo
+        """
+        nodes = self.hits + self.misses
+        return {'subtrees': len(self.keys),
+                'hits': self.hits,
+                'misses': self.misses,
+                'duplication': self.hits / nodes if nodes else 0.0}
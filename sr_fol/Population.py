@@ -1,6 +1,19 @@
-from random import sample
-from pandas import DataFrame
-from sr_fol.Expression import Expression, RandomExpression
+import random
+from random import Random
+from typing import TYPE_CHECKING
+from sr_fol.Expression import Expression, RandomExpression, random_expressions
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.LocalSearch import NodeSemantics, hill_climb
+from sr_fol.Library import SubtreeLibrary, SubtreeTruths
+from sr_fol.Selection import SELECTIONS, truncation, tournament, lexicase
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from sr_fol.Scoring import ThreadScorer
+    from sr_fol.Memo import SubtreeMemo
+
+# rankings of cull, None ranks by score only
+PARSIMONY = (None, 'lexicographic', 'pareto')
 
 
 class Population:
@@ -14,119 +27,506 @@ class Population:
                  v_n: int,
                  maxdepth: int,
                  binary_operators: tuple[type[Expression], ...],
-                 unary_operators: tuple[type[Expression], ...]) -> None:
+                 unary_operators: tuple[type[Expression], ...],
+                 rng: Random | None = None,
+                 nary: bool = False,
+                 maxsize: int | None = None,
+                 parsimony: str | None = None,
+                 seeds: list[Expression] | None = None,
+                 scorer: 'ThreadScorer | None' = None,
+                 initialization: str = 'grow',
+                 selection: str = 'truncation',
+                 memo: 'SubtreeMemo | None' = None,
+                 truths: SubtreeTruths | None = None) -> None:
         """
-        Initialize a Population with population_size of random expressions.
+        Initialize a Population with population_size of random expressions, after copies of the seeds.
 
         :param population_size: target amount of expressions in a population
         :param v_n: number of variables
         :param maxdepth: maximum depth of the expressions in the population
         :param binary_operators: only use these binary operators
         :param unary_operators: only use these unary operators
+        :param rng: random number generator of the population, by default the global one of the random module
+        :param nary: count chains of the same associative operator as single n-ary nodes against maxdepth
+        :param maxsize: maximum number of nodes of the expressions in the population, by default unlimited
+        :param parsimony: rank expressions of equal score by size when culling, 'lexicographic' removes the larger
+                          of equally scored expressions first, 'pareto' removes the expressions dominated in score
+                          and size by the most others first, by default only the score counts
+        :param seeds: expressions to start with, e.g. solutions of similar searches from an ExpressionArchive, those
+                      beyond maxdepth or maxsize or with other operators are left out
+        :param scorer: score the expressions without cached score at once in chunks of the assignments on a
+                       pool of threads, by default one after the other
+        :param initialization: shape of the random expressions, 'grow', 'full' or 'ramped' for ramped half-and-half,
+                               see random_expressions
+        :param selection: selection of the survivors when culling, 'truncation' keeps the best ranked expressions,
+                          'tournament' the winners of tournaments of two and 'lexicase' those selected by lexicase
+                          selection on the correctly evaluated assignments
+        :param memo: evaluate the expressions scored without scorer with a memo of their subtrees, usually shared
+                     by all populations of a Solver, by default every expression is evaluated node by node
+        :param truths: truth vectors of subtrees the library shares with the libraries of other populations, by
+                       default the library evaluates every subtree it indexes
+        :raises ValueError: if parsimony, initialization or selection is unknown
         """
+        if parsimony not in PARSIMONY:
+            raise ValueError(f'Unknown parsimony {parsimony!r}, choose from {", ".join(map(str, PARSIMONY))}')
+        if selection not in SELECTIONS:
+            raise ValueError(f'Unknown selection {selection!r}, choose from {", ".join(SELECTIONS)}')
         self.population_size = population_size
         self.v_n = v_n
         self.maxdepth = maxdepth
         self.binary_operators = binary_operators
         self.unary_operators = unary_operators
+        self.nary = nary
+        self.maxsize = maxsize
+        self.parsimony = parsimony
+        self.selection = selection
         self.expressions = []
-        populating_tries = 500
-        while len(self.expressions) < population_size and populating_tries > 0:
-            populating_tries -= 1
-            expression = RandomExpression(v_n, binary_operators, unary_operators, maxdepth)
-            if expression not in self.expressions:
-                self.expressions.append(expression)
+        self.library = SubtreeLibrary(truths)
+        self.evaluations = 0
+        self.fitness_cache = {}
+        self.counters = None
+        self.scorer = scorer
+        self.memo = memo
+        self.rng = rng if rng is not None else random
+        for seed in seeds or []:
+            if (len(self.expressions) < population_size and self.fits(seed) and self.allows(seed)
+                    and seed not in self.expressions):
+                self.expressions.append(seed.copy())
+        self.expressions += random_expressions(population_size - len(self.expressions), v_n, binary_operators,
+                                               unary_operators, maxdepth, self.rng, maxsize, initialization,
+                                               exclude=self.expressions)
 
     def __contains__(self, item: Expression) -> bool:
         return item in self.expressions
 
-    def scores(self, assignment_matrix: DataFrame) -> list[tuple[Expression, float]]:
+    def fitness(self, expression: Expression, packed: PackedAssignment) -> float:
+        """
+        Return the score of an expression, using the cached amount of correct assignments if the expression
+        was scored before. If assignments were appended to packed since then, only those are evaluated. With
+        lexicase selection the bits of the correct assignments are cached as well.
+
+        :param expression: expression of the population
+        :param packed: packed variable assignments and associated evaluations
+        :return: fraction of correct assignments
+        """
+        if self.is_cached(expression, packed):
+            _, _, a_n, correct, bits = self.fitness_cache[id(expression)]
+            if a_n < packed.a_n:
+                new_assignments = packed.tail(a_n)
+                new_bits = new_assignments.correct(expression.truth(new_assignments))
+                correct += new_bits.bit_count()
+                if bits is not None:
+                    bits |= new_bits << a_n
+                self.evaluations += 1
+                if self.counters is not None:
+                    self.counters.update(evaluations=1, partial_evaluations=1, nodes_evaluated=expression.size())
+            elif self.counters is not None:
+                self.counters['cache_hits'] += 1
+        else:
+            bits = packed.correct(self.truth(expression, packed))
+            correct = bits.bit_count()
+            self.evaluations += 1
+            if self.counters is not None:
+                self.counters['evaluations'] += 1
+        self.fitness_cache[id(expression)] = (expression, packed, packed.a_n, correct,
+                                              bits if self.selection == 'lexicase' else None)
+        return packed.fraction(correct)
+
+    def correct_bits(self, expression: Expression, packed: PackedAssignment) -> int:
+        """
+        Return the bits of the assignments a scored expression evaluates correctly, as cached by fitness. An
+        expression scored by the scorer of the population, which only counts them, is evaluated once more.
+
+        :param expression: expression of the population, scored on packed
+        :param packed: packed variable assignments and associated evaluations
+        :return: bits of correctly evaluated assignments
+        """
+        cached = self.fitness_cache[id(expression)]
+        if cached[4] is not None:
+            return cached[4]
+        bits = packed.correct(self.truth(expression, packed))
+        self.evaluations += 1
+        if self.counters is not None:
+            self.counters['evaluations'] += 1
+        self.fitness_cache[id(expression)] = cached[:4] + (bits,)
+        return bits
+
+    def truth(self, expression: Expression, packed: PackedAssignment) -> tuple[int, int]:
+        """
+        Evaluate an expression, with the memo of the population if it has one, and count the evaluated nodes.
+
+        :param expression: expression to evaluate
+        :param packed: packed variable assignments
+        :return: true bits and false bits of the expression
+        """
+        if self.memo is None:
+            if self.counters is not None:
+                self.counters['nodes_evaluated'] += expression.size()
+            return expression.truth(packed)
+        hits, misses = self.memo.hits, self.memo.misses
+        truth = self.memo.truth(expression, packed)
+        if self.counters is not None:
+            self.counters.update(nodes_evaluated=self.memo.misses - misses, memo_hits=self.memo.hits - hits)
+        return truth
+
+    def is_cached(self, expression: Expression, packed: PackedAssignment) -> bool:
+        """
+        :param expression: expression of the population
+        :param packed: packed variable assignments and associated evaluations
+        :return: whether the amount of correct assignments of the expression is cached for packed or a prefix of it
+        """
+        cached = self.fitness_cache.get(id(expression))
+        return cached is not None and cached[0] is expression and cached[1] is packed and cached[2] <= packed.a_n
+
+    def batch_fitness(self, packed: PackedAssignment) -> list[tuple[Expression, float]]:
+        """
+        Return the scores of all expressions like fitness, but evaluate the expressions without cached score
+        at once with the scorer of the population.
+
+        :param packed: packed variable assignments and associated evaluations
+        :return: the expressions and scores in the order of the population
+        """
+        unscored = [expression for expression in self.expressions if not self.is_cached(expression, packed)]
+        for expression, correct in zip(unscored, self.scorer.correct(unscored, packed)):
+            self.fitness_cache[id(expression)] = (expression, packed, packed.a_n, correct, None)
+        self.evaluations += len(unscored)
+        if self.counters is not None:
+            self.counters.update(evaluations=len(unscored),
+                                 nodes_evaluated=sum(expression.size() for expression in unscored))
+        batch = {id(expression) for expression in unscored}
+        return [(expr, packed.fraction(self.fitness_cache[id(expr)][3])) if id(expr) in batch
+                else (expr, self.fitness(expr, packed)) for expr in self.expressions]
+
+    def scores(self, assignment_matrix: 'DataFrame | list[list] | PackedAssignment') -> list[tuple[Expression, float]]:
         """
-        Calculate the fitness of all expressions in the population.
+        Calculate the fitness of all expressions in the population, with the scorer of the population if it has one.
 
-        :param assignment_matrix: DataFrame of variable assignments and associated evaluations
+        :param assignment_matrix: DataFrame, rows or PackedAssignment of variable assignments and associated evaluations
         :return: the expressions and scores
         """
-        fitness = [(expr, expr.score(assignment_matrix)) for expr in self.expressions]
+        if not isinstance(assignment_matrix, PackedAssignment):
+            assignment_matrix = PackedAssignment.from_matrix(assignment_matrix)
+        if self.scorer is not None:
+            fitness = self.batch_fitness(assignment_matrix)
+        else:
+            fitness = [(expr, self.fitness(expr, assignment_matrix)) for expr in self.expressions]
         fitness.sort(key=lambda x: x[1])
         return fitness
 
-    def cull(self, assignment_matrix: DataFrame, percent: float = 0.5) -> None:
+    def cull(self,
+             assignment_matrix: 'DataFrame | list[list] | PackedAssignment',
+             percent: float = 0.5) -> list[tuple[Expression, float]]:
         """
-        Remove the percentage of worst performing expression from the population.
+        Remove the percentage of worst performing expression from the population. The survivors are chosen by the
+        selection of the population among the expressions ranked by score and, depending on the parsimony of the
+        population, by size, and the population is rebuilt from them in one pass.
 
-        :param assignment_matrix:
+        :param assignment_matrix: DataFrame, rows or PackedAssignment of variable assignments and associated evaluations
         :param percent: percentage of expressions to be removed
+        :return: Pareto front of score and size of the remaining expressions
         """
-        fitness = [(expr, expr.score(assignment_matrix)) for expr in self.expressions]
-        fitness.sort(key=lambda x: x[1])
-        for i in range(round(len(fitness) * percent)):
-            self.expressions.remove(fitness[i][0])
+        if not isinstance(assignment_matrix, PackedAssignment):
+            assignment_matrix = PackedAssignment.from_matrix(assignment_matrix)
+        fitness = self.scores(assignment_matrix)
+        k = len(fitness) - round(len(fitness) * percent)
+        if self.selection == 'lexicase':
+            if self.memo is not None:
+                self.memo.plan([expr for expr, _ in fitness if self.fitness_cache[id(expr)][4] is None],
+                               assignment_matrix)
+            correct = [self.correct_bits(expr, assignment_matrix) for expr, _ in fitness]
+            survivors = lexicase(correct, assignment_matrix.e[0] | assignment_matrix.e[1], k, self.rng)
+        elif self.selection == 'tournament':
+            survivors = tournament(self.ranks(fitness), k, self.rng)
+        else:
+            survivors = truncation(self.ranks(fitness), k)
+        kept = {id(fitness[i][0]) for i in survivors}
+        self.expressions = [expr for expr in self.expressions if id(expr) in kept]
+        self.fitness_cache = {id(expr): self.fitness_cache[id(expr)]
+                              for expr in self.expressions if id(expr) in self.fitness_cache}
+        return self.pareto_front([fitness[i] for i in sorted(survivors)])
+
+    def ranks(self, fitness: list[tuple[Expression, float]]) -> list[tuple]:
+        """
+        Rank expressions by score and, depending on the parsimony of the population, by size. 'pareto' ranks
+        by the Pareto front of score and size an expression belongs to after peeling off the better fronts.
+
+        :param fitness: expressions and scores as returned by scores
+        :return: key per expression, greater for better ones, equal expressions rank by position, later first
+        """
+        if self.parsimony == 'lexicographic':
+            return [(score, -expr.size(), i) for i, (expr, score) in enumerate(fitness)]
+        if self.parsimony == 'pareto':
+            fronts, remaining, number = {}, fitness, 0
+            while remaining:
+                front = {id(expr) for expr, _ in self.pareto_front(remaining)}
+                fronts.update(dict.fromkeys(front, number))
+                remaining = [score for score in remaining if id(score[0]) not in front]
+                number += 1
+            return [(-fronts[id(expr)], score, -expr.size(), i) for i, (expr, score) in enumerate(fitness)]
+        return [(score, i) for i, (_, score) in enumerate(fitness)]
+
+    @staticmethod
+    def pareto_front(scores: list[tuple[Expression, float]]) -> list[tuple[Expression, float]]:
+        """
+        Return the expressions no other expression beats in score without being larger, of equal expressions
+        in score and size the first one.
+
+        :param scores: expressions and scores
+        :return: expressions and scores of the front ordered by size
+        """
+        front = []
+        for expression, score in sorted(scores, key=lambda x: (x[0].size(), -x[1])):
+            if not front or score > front[-1][1]:
+                front.append((expression, score))
+        return front
+
+    def index(self, assignment_matrix: 'DataFrame | list[list] | PackedAssignment') -> None:
+        """
+        Rebuild the library of distinct subtrees of the population with their truth vectors, depths and sizes.
+
+        :param assignment_matrix: DataFrame, rows or PackedAssignment of variable assignments and associated evaluations
+        """
+        if not isinstance(assignment_matrix, PackedAssignment):
+            assignment_matrix = PackedAssignment.from_matrix(assignment_matrix)
+        self.library.update(self.expressions, assignment_matrix)
+
+    def local_search(self, assignment_matrix: 'DataFrame | list[list] | PackedAssignment', n_best: int = 1) -> None:
+        """
+        Replace the best performing expressions of the population with their refinements
+        by hill climbing over single-node changes.
+
+        :param assignment_matrix: DataFrame, rows or PackedAssignment of variable assignments and associated evaluations
+        :param n_best: number of best performing expressions to refine
+        """
+        if n_best < 1:
+            return
+        if not isinstance(assignment_matrix, PackedAssignment):
+            assignment_matrix = PackedAssignment.from_matrix(assignment_matrix)
+        for expression, _ in self.scores(assignment_matrix)[-n_best:]:
+            refined_expression = hill_climb(expression,
+                                            assignment_matrix,
+                                            self.binary_operators,
+                                            self.unary_operators,
+                                            self.maxdepth,
+                                            maxsize=self.maxsize)
+            if refined_expression not in self.expressions:
+                position = next(i for i, expr in enumerate(self.expressions) if expr is expression)
+                self.expressions[position] = refined_expression
 
     def mutation(self) -> None:
         """
         Fill the population back up to population_size by choosing a random expression from the population,
-        introducing random changes and adding it to the population.
+        introducing random changes and adding it to the population. The random changes are generated within
+        the depth and size left by the rest of the expression, so no offspring exceeds maxdepth or maxsize.
         """
         populating_tries = 500
         while len(self.expressions) < self.population_size and populating_tries > 0:
             populating_tries -= 1
-            mutant_expression = sample(self.expressions, k=1).pop().copy()
-            mutation_maxdepth = self.maxdepth - mutant_expression.depth()
+            parent_expression = self.rng.choice(self.expressions)
 
             # for small expression containing only a single variable, nodes above are added
-            if mutant_expression.size() < 2:
+            if parent_expression.size() < 2:
+                node_types = [node_class for node_class in list(self.binary_operators) + list(self.unary_operators)
+                              if self.maxsize is None or node_class.arity() < self.maxsize]
+                if self.maxdepth < 2 or not node_types:
+                    continue
                 random_expression = RandomExpression(self.v_n,
                                                      self.binary_operators,
                                                      self.unary_operators,
-                                                     mutation_maxdepth)
-                mutant_expression = mutant_expression.new_parent(random_expression,
-                                                                 list(self.binary_operators) + list(self.unary_operators))
+                                                     self.maxdepth - 1,
+                                                     self.rng,
+                                                     self.maxsize - 2 if self.maxsize is not None else None)
+                mutant_expression = parent_expression.copy().new_parent(random_expression, node_types, self.rng)
 
             # for larger expressions randomize an argument in the expression
             else:
-                branch_node = sample(mutant_expression.nodes(list(self.binary_operators) + list(self.unary_operators)),
-                                     k=1).pop()
-                branch_node.set_child(RandomExpression(self.v_n,
-                                                       self.binary_operators,
-                                                       self.unary_operators,
-                                                       mutation_maxdepth))
+                branch_nodes = parent_expression.levels(list(self.binary_operators) + list(self.unary_operators))
+                if not branch_nodes:
+                    continue
+                position = self.rng.randrange(len(branch_nodes))
+                branch_node, level = branch_nodes[position]
+                first = branch_node.arity() == 1 or self.rng.random() < 0.5
+                child = branch_node.arg_1 if first else branch_node.arg_2
+                random_expression = RandomExpression(self.v_n,
+                                                     self.binary_operators,
+                                                     self.unary_operators,
+                                                     self.maxdepth - level - 1,
+                                                     self.rng,
+                                                     self.size_left(parent_expression, child))
+                mutant_expression = parent_expression.copy()
+                self.replace_child(mutant_expression, position, first, random_expression)
 
             if mutant_expression not in self.expressions:
                 self.expressions.append(mutant_expression)
+            elif self.counters is not None:
+                self.counters['mutation_rejected_duplicate'] += 1
+        if self.counters is not None and len(self.expressions) < self.population_size:
+            self.counters['mutation_tries_exhausted'] += 1
 
     def crossover(self, guest_population: 'Population') -> None:
         """
         Fill the population back up to population_size by choosing a random expression from the population
-        and splicing part of a random expression from a different population into it.
+        and splicing part of a random expression from a different population into it. Splices that would
+        exceed maxdepth or maxsize are rejected before the offspring is built.
 
         :param guest_population: population to take expression splices from
         """
         populating_tries = 500
         while len(self.expressions) < self.population_size and populating_tries > 0:
             populating_tries -= 1
-            crossover_expression = sample(self.expressions, k=1).pop().copy()
+            parent_expression = self.rng.choice(self.expressions)
 
             # for small expression containing only a single variable, nodes above are added
-            if crossover_expression.size() < 2:
-                guest_expression = sample(guest_population.expressions, k=1).pop().copy()
+            if parent_expression.size() < 2:
+                guest_expression = self.rng.choice(guest_population.expressions)
                 if guest_expression.size() < 2:
-                    crossover_expression.new_parent(guest_expression,
-                                                    list(self.binary_operators) + list(self.unary_operators))
+                    node_types = [node_class for node_class in list(self.binary_operators) + list(self.unary_operators)
+                                  if self.maxsize is None or node_class.arity() < self.maxsize]
+                    if self.maxdepth < 2 or not node_types:
+                        continue
+                    crossover_expression = parent_expression.copy().new_parent(guest_expression.copy(),
+                                                                               node_types,
+                                                                               self.rng)
                 else:
-                    guest_branch_nodes = guest_expression.nodes(list(self.binary_operators) + list(self.unary_operators))
-                    guest_branch_node = sample(guest_branch_nodes, k=1).pop()
-                    guest_branch_node.set_child(crossover_expression)
-                    crossover_expression = guest_branch_node
+                    guest_branch_nodes = guest_expression.nodes(list(self.binary_operators) +
+                                                                list(self.unary_operators))
+                    if not guest_branch_nodes:
+                        continue
+                    guest_branch_node = self.rng.choice(guest_branch_nodes)
+                    if not self.fits(guest_branch_node):
+                        continue
+                    crossover_expression = guest_branch_node.copy()
+                    crossover_expression.set_child(parent_expression.copy(), self.rng)
 
             # for larger expressions take a random node from the guest expression and place it as a random branch
             else:
-                guest_expression = sample(guest_population.expressions, k=1).pop()
-                guest_subexpression = sample(guest_expression.nodes([]), k=1).pop().copy()
+                guest_expression = self.rng.choice(guest_population.expressions)
+                guest_subexpression = self.rng.choice(guest_expression.nodes([]))
+
+                branch_nodes = parent_expression.levels(list(self.binary_operators) + list(self.unary_operators))
+                if not branch_nodes:
+                    continue
+                position = self.rng.randrange(len(branch_nodes))
+                branch_node, level = branch_nodes[position]
+                first = branch_node.arity() == 1 or self.rng.random() < 0.5
+                child = branch_node.arg_1 if first else branch_node.arg_2
+                if not self.nary and level + 1 + guest_subexpression.depth() > self.maxdepth:
+                    if self.counters is not None:
+                        self.counters['crossover_rejected_depth'] += 1
+                    continue
+                size_left = self.size_left(parent_expression, child)
+                if size_left is not None and guest_subexpression.size() > size_left:
+                    if self.counters is not None:
+                        self.counters['crossover_rejected_size'] += 1
+                    continue
+                crossover_expression = parent_expression.copy()
+                self.replace_child(crossover_expression, position, first, guest_subexpression.copy())
+                if self.nary and crossover_expression.depth(self.nary) > self.maxdepth:
+                    if self.counters is not None:
+                        self.counters['crossover_rejected_depth'] += 1
+                    continue
+
+            if crossover_expression not in self.expressions:
+                self.expressions.append(crossover_expression)
+            elif self.counters is not None:
+                self.counters['crossover_rejected_duplicate'] += 1
+        if self.counters is not None and len(self.expressions) < self.population_size:
+            self.counters['crossover_tries_exhausted'] += 1
+
+    def fits(self, expression: Expression) -> bool:
+        """
+        :param expression: expression to check
+        :return: whether the expression is within maxdepth and maxsize
+        """
+        return (expression.depth(self.nary) <= self.maxdepth
+                and (self.maxsize is None or expression.size() <= self.maxsize))
+
+    def allows(self, expression: Expression) -> bool:
+        """
+        :param expression: expression to check
+        :return: whether all operators of the expression are among the operators of the population
+        """
+        operators = set(self.binary_operators) | set(self.unary_operators)
+        return all(node.arity() == 0 or node.__class__ in operators for node in expression.nodes([]))
+
+    def size_left(self, expression: Expression, child: Expression) -> int | None:
+        """
+        :param expression: expression a child of which is replaced
+        :param child: replaced child
+        :return: maximum size of the replacement, None without maxsize
+        """
+        return self.maxsize - expression.size() + child.size() if self.maxsize is not None else None
+
+    def replace_child(self, expression: Expression, position: int, first: bool, child: Expression) -> None:
+        """
+        Replace an argument of a branch node of an expression.
+
+        :param expression: expression to change
+        :param position: position of the branch node in the nodes of the operators of the population
+        :param first: replace the first argument, otherwise the second one
+        :param child: new argument
+        """
+        branch_node = expression.nodes(list(self.binary_operators) + list(self.unary_operators))[position]
+        if first:
+            branch_node.arg_1 = child
+        else:
+            branch_node.arg_2 = child
+
+    def semantic_crossover(self,
+                           guest_population: 'Population',
+                           assignment_matrix: 'DataFrame | list[list] | PackedAssignment',
+                           donor_candidates: int = 8) -> None:
+        """
+        Fill the population back up to population_size by choosing a random expression from the population
+        and splicing a subtree from the library of a different population into it. Only subtrees fitting the
+        depth and size budget of the replaced branch are considered and of a sample of donor_candidates the one that
+        corrects the most assignments of the expression is taken.
 
-                branch_nodes = crossover_expression.nodes(list(self.binary_operators) + list(self.unary_operators))
-                branch_node = sample(branch_nodes, k=1).pop()
-                branch_node.set_child(guest_subexpression)
+        :param guest_population: population to take expression splices from
+        :param assignment_matrix: DataFrame, rows or PackedAssignment of variable assignments and associated evaluations
+        :param donor_candidates: number of donor subtrees compared per offspring
+        """
+        if not isinstance(assignment_matrix, PackedAssignment):
+            assignment_matrix = PackedAssignment.from_matrix(assignment_matrix)
+        if not guest_population.library:
+            guest_population.index(assignment_matrix)
+        populating_tries = 500
+        while len(self.expressions) < self.population_size and populating_tries > 0:
+            populating_tries -= 1
+            crossover_expression = self.rng.choice(self.expressions).copy()
+            semantics = NodeSemantics(crossover_expression, assignment_matrix)
+
+            # for small expression containing only a single variable, a new parent with a donor sibling is added
+            if crossover_expression.size() < 2:
+                node_class = self.rng.choice(list(self.binary_operators) + list(self.unary_operators))
+                donors = [donor for donor in guest_population.library.donors(self.maxdepth - 1)
+                          if self.maxsize is None or donor[3] <= self.maxsize - 2]
+                if node_class.arity() == 1:
+                    crossover_expression = node_class(crossover_expression)
+                elif donors:
+                    donors = self.rng.sample(donors, k=min(donor_candidates, len(donors)))
+                    donor = max(donors, key=lambda x: assignment_matrix.correct(
+                        node_class.kleene(semantics.values[0], x[0])).bit_count())
+                    crossover_expression = node_class(crossover_expression, donor[1].copy())
+
+            # for larger expressions replace a random branch with the best fitting donor subtree
+            else:
+                slot = self.rng.randrange(1, len(semantics.nodes))
+                donors = [donor for donor in guest_population.library.donors(self.maxdepth - semantics.depths[slot] + 1)
+                          if donor[0] != semantics.values[slot]
+                          and (self.maxsize is None
+                               or semantics.sizes[0] - semantics.sizes[slot] + donor[3] <= self.maxsize)]
+                if not donors:
+                    if self.counters is not None:
+                        self.counters['semantic_crossover_no_donor'] += 1
+                    continue
+                donors = self.rng.sample(donors, k=min(donor_candidates, len(donors)))
+                donor = max(donors, key=lambda x: semantics.correct(slot, x[0]))
+                crossover_expression = semantics.replace(slot, donor[1].copy())
 
-            if crossover_expression not in self.expressions and crossover_expression.depth() <= self.maxdepth:
+            if crossover_expression not in self.expressions:
                 self.expressions.append(crossover_expression)
+            elif self.counters is not None:
+                self.counters['semantic_crossover_rejected_duplicate'] += 1
+        if self.counters is not None and len(self.expressions) < self.population_size:
+            self.counters['semantic_crossover_tries_exhausted'] += 1
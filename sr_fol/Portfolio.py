@@ -0,0 +1,321 @@
+"""
+Race several strategies on the same input in worker processes under a shared deadline. The strategies are
+the genetic algorithm of the Solver, an exhaustive enumeration of the expressions by size and a direct
+two-level cover, a disjunction of conjunctions of literals. As soon as one strategy reaches the target score
+the others are cancelled, they stop after their current generation or batch of candidates; otherwise the
+best result by score and size is taken when all strategies finished or the deadline passed.
+"""
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import Event
+from time import perf_counter, time
+from sr_fol.Expression import Expression, Var, Not, Or, And, OPERATORS
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Batch import build_solver
+
+# strategies of race
+STRATEGIES = ('genetic', 'enumeration', 'cover')
+
+# maximum number of distinct truth vectors kept by the enumeration
+ENUMERATION_LIMIT = 1 << 20
+
+# event set by race to cancel the strategies of the worker processes
+stop_event = None
+
+
+def initialize_worker(stop) -> None:
+    """
+    Keep the cancel event of the race in a worker process.
+
+    :param stop: event set when the strategies should stop
+    """
+    global stop_event
+    stop_event = stop
+
+
+def operators(options: dict) -> tuple[tuple[type[Expression], ...], tuple[type[Expression], ...]]:
+    """
+    :param options: options of a strategy, operators may be given by name
+    :return: binary and unary operator classes, by default Or, And and Not
+    """
+    return tuple(tuple(OPERATORS[name] if isinstance(name, str) else name for name in options.get(key, default))
+                 for key, default in (('binary_operators', (Or, And)), ('unary_operators', (Not,))))
+
+
+def enumeration(packed: PackedAssignment,
+                binary_operators: tuple[type[Expression], ...] = (Or, And),
+                unary_operators: tuple[type[Expression], ...] = (Not,),
+                maxdepth: int = 10,
+                maxsize: int | None = None,
+                target_score: float | None = 1.0,
+                stopped=lambda: False,
+                limit: int = ENUMERATION_LIMIT) -> tuple[Expression | None, str]:
+    """
+    Enumerate the expressions bottom-up by size and keep only the smallest expression of every truth vector,
+    as larger expressions with the same truth vector have the same subtrees to offer. Commutative operators
+    are combined with every pair of arguments once.
+
+    :param packed: packed variable assignments and associated evaluations
+    :param binary_operators: only use these binary operators
+    :param unary_operators: only use these unary operators
+    :param maxdepth: maximum depth of the expressions
+    :param maxsize: maximum number of nodes of the expressions, by default until the limit is reached
+    :param target_score: stop at the first expression with at least this score
+    :param stopped: called every 4096 candidates, the enumeration stops if it returns True
+    :param limit: maximum number of distinct truth vectors
+    :return: best expression, the smaller among equally scored ones, and the reason the enumeration stopped
+    """
+    target = None if target_score is None else target_score * packed.evaluated
+    levels = [[], [(Var(subscript), packed.variables[subscript], 1) for subscript in sorted(packed.variables)]]
+    seen = {truth for _, truth, _ in levels[1]}
+    best, best_correct = None, -1
+    for expression, truth, _ in levels[1]:
+        correct = packed.correct(truth).bit_count()
+        if correct > best_correct:
+            best, best_correct = expression, correct
+
+    def combinations(size):
+        for unary in unary_operators:
+            for operand in levels[size - 1]:
+                yield unary, (operand,)
+        for binary in binary_operators:
+            commutative = binary.table[1] == binary.table[2]
+            for left_size in range(1, size - 1):
+                right_size = size - 1 - left_size
+                if commutative and left_size > right_size:
+                    continue
+                for i, left in enumerate(levels[left_size]):
+                    for right in levels[right_size][i + 1:] if commutative and left_size == right_size else \
+                            levels[right_size]:
+                        yield binary, (left, right)
+
+    candidates = 0
+    size = last = 1
+    reason = 'exhausted'
+    while target is None or best_correct < target:
+        size += 1
+        if maxsize is not None and size > maxsize:
+            reason = 'maxsize'
+            break
+        level = []
+        levels.append(level)
+        for node_class, arguments in combinations(size):
+            candidates += 1
+            if candidates % 4096 == 0 and stopped():
+                reason = 'cancelled'
+                break
+            depth = 1 + max(argument[2] for argument in arguments)
+            if depth > maxdepth:
+                continue
+            truth = node_class.kleene(*(argument[1] for argument in arguments))
+            if truth in seen:
+                continue
+            seen.add(truth)
+            expression = node_class(*(argument[0] for argument in arguments))
+            level.append((expression, truth, depth))
+            correct = packed.correct(truth).bit_count()
+            if correct > best_correct:
+                best, best_correct = expression, correct
+                if target is not None and correct >= target:
+                    break
+        if reason == 'cancelled':
+            break
+        if len(seen) > limit:
+            reason = 'limit'
+            break
+        last = size if level else last
+        if size > 2 * last:
+            break  # every larger expression has an argument of an empty size, no truth vector is left
+    else:
+        reason = 'target_score'
+    return (best.copy() if best is not None else None), reason
+
+
+def balanced(node_class: type[Expression], operands: list[Expression]) -> Expression:
+    """
+    :param node_class: associative binary operator
+    :param operands: operands of the chain
+    :return: chain of the operands as a balanced tree of the smallest depth
+    """
+    if len(operands) == 1:
+        return operands[0]
+    middle = len(operands) // 2
+    return node_class(balanced(node_class, operands[:middle]), balanced(node_class, operands[middle:]))
+
+
+def cover_terms(packed: PackedAssignment, positives: int, negatives: int) -> list[list[tuple[int, bool]]]:
+    """
+    Cover the positive assignments with conjunctions of literals that are False on the negative assignments.
+    Every uncovered positive assignment starts a term with the literals of its known variables, which are
+    dropped one by one as long as the term stays False on the negative assignments it was False on. Terms
+    whose positive assignments are covered by the other terms are removed.
+
+    :param packed: packed variable assignments
+    :param positives: bits of the assignments the cover should be True on
+    :param negatives: bits of the assignments the cover should be False on
+    :return: literals (subscript, value) of every term
+    """
+    def truth(literals: list[tuple[int, bool]]) -> tuple[int, int]:
+        true_bits, false_bits = positives | negatives, 0
+        for subscript, value in literals:
+            literal = packed.variables[subscript] if value else packed.variables[subscript][::-1]
+            true_bits, false_bits = true_bits & literal[0], false_bits | literal[1]
+        return true_bits, false_bits
+
+    terms = []
+    uncovered = positives
+    while uncovered:
+        position = (uncovered & -uncovered).bit_length() - 1
+        uncovered &= ~(1 << position)
+        literals = [(subscript, bool(true_bits >> position & 1))
+                    for subscript, (true_bits, false_bits) in sorted(packed.variables.items())
+                    if (true_bits | false_bits) >> position & 1]
+        if not literals:
+            continue  # all variables are None, no term is True here
+        required = truth(literals)[1] & negatives
+        for literal in list(literals):
+            reduced = [other for other in literals if other != literal]
+            if reduced and truth(reduced)[1] & negatives == required:
+                literals = reduced
+        terms.append((literals, truth(literals)[0] & positives))
+        uncovered &= ~terms[-1][1]
+    for i in range(len(terms) - 1, -1, -1):
+        others = 0
+        for j, (_, covered) in enumerate(terms):
+            if j != i:
+                others |= covered
+        if terms[i][1] & ~others == 0:
+            del terms[i]
+    return [literals for literals, _ in terms]
+
+
+def cover(packed: PackedAssignment,
+          binary_operators: tuple[type[Expression], ...] = (Or, And),
+          unary_operators: tuple[type[Expression], ...] = (Not,)) -> tuple[Expression | None, str]:
+    """
+    Build a disjunction of conjunctions of literals directly from the assignments, once for the assignments
+    evaluated to True and once, negated, for those evaluated to False, and keep the better of the two. The
+    terms are balanced trees, the cover is not bound by maxdepth and maxsize.
+
+    :param packed: packed variable assignments and associated evaluations
+    :param binary_operators: the cover needs Or and And
+    :param unary_operators: the cover needs Not
+    :return: best cover and 'complete', or None and 'unsupported' without the operators
+    """
+    if Or not in binary_operators or And not in binary_operators or Not not in unary_operators:
+        return None, 'unsupported'
+    best = None
+    for positives, negatives, negated in ((packed.e[0], packed.e[1], False), (packed.e[1], packed.e[0], True)):
+        terms = cover_terms(packed, positives, negatives)
+        if not terms:
+            continue
+        expression = balanced(Or, [balanced(And, [Var(subscript) if value else Not(Var(subscript))
+                                                  for subscript, value in literals]) for literals in terms])
+        expression = Not(expression) if negated else expression
+        rank = (packed.correct(expression.truth(packed)).bit_count(), -expression.size())
+        if best is None or rank > best[0]:
+            best = (rank, expression)
+    return (best[1] if best is not None else None), 'complete'
+
+
+def run_strategy(strategy: str, packed: PackedAssignment, options: dict, deadline: float | None) -> dict:
+    """
+    Run one strategy until it reaches the target score, the deadline passes or the race cancels it.
+
+    :param strategy: name of the strategy, one of STRATEGIES
+    :param packed: packed variable assignments and associated evaluations
+    :param options: options of the Solver and the Termination and niterations, operators may be given by name
+    :param deadline: time in seconds since the epoch the strategy stops at
+    :return: result with the strategy, status, expression, score, size, stop reason and elapsed seconds; the status
+             is 'ok', or 'unsupported' or 'empty' if the strategy found no expression
+    """
+    start = perf_counter()
+
+    def stopped() -> bool:
+        return (stop_event is not None and stop_event.is_set()) or (deadline is not None and time() > deadline)
+
+    binary_operators, unary_operators = operators(options)
+    if strategy == 'genetic':
+        solver, termination, niterations = build_solver(packed, options,
+                                                        deadline - time() if deadline is not None else None)
+        try:
+            for _ in solver.generations(niterations, termination):
+                if stop_event is not None and stop_event.is_set():
+                    solver.cancel()
+            expression, reason = solver.best(), termination.reason
+        finally:
+            solver.close()
+    elif strategy == 'enumeration':
+        expression, reason = enumeration(packed, binary_operators, unary_operators,
+                                         maxdepth=options.get('maxdepth', 10),
+                                         maxsize=options.get('maxsize'),
+                                         target_score=options.get('target_score', 1.0),
+                                         stopped=stopped)
+    elif strategy == 'cover':
+        expression, reason = cover(packed, binary_operators, unary_operators)
+    else:
+        raise ValueError(f'Unknown strategy {strategy}, choose from {", ".join(STRATEGIES)}')
+    return {'strategy': strategy,
+            # a cover without the operators it needs or without terms has no expression to offer
+            'status': 'ok' if expression is not None else 'unsupported' if reason == 'unsupported' else 'empty',
+            'expression': expression,
+            'score': expression.score(packed) if expression is not None else 0.0,
+            'size': expression.size() if expression is not None else 0,
+            'stop_reason': reason,
+            'elapsed': perf_counter() - start}
+
+
+def race(input_df,
+         strategies: tuple[str | dict, ...] = STRATEGIES,
+         options: dict | None = None,
+         time_limit: float | None = None,
+         workers: int | None = None) -> list[dict]:
+    """
+    Run the strategies concurrently in worker processes. A strategy is given by name or as a dict with the
+    name under 'strategy' and options on top of the shared options, so several configurations of the same
+    strategy can race, e.g. {'strategy': 'genetic', 'selection': 'lexicase'}. The first result reaching the
+    target_score of the options, by default 1.0, cancels the other strategies.
+
+    :param input_df: uncleaned DataFrame, rows or PackedAssignment of variable assignments and associated evaluations
+    :param strategies: strategies or configurations to race
+    :param options: options of the Solver and the Termination and niterations shared by all strategies
+    :param time_limit: seconds after which all strategies stop and return their best expression so far
+    :param workers: number of worker processes, by default one per strategy
+    :return: results of the strategies, the best by score and then size first; strategies that raised an error or
+             were cancelled before they started or found no expression come last with status 'error', 'cancelled',
+             'unsupported' or 'empty'
+    """
+    packed = input_df if isinstance(input_df, PackedAssignment) else PackedAssignment.from_rows(input_df)
+    options = options or {}
+    target_score = options.get('target_score', 1.0)
+    configurations = [{**options, **strategy} if isinstance(strategy, dict) else {**options, 'strategy': strategy}
+                      for strategy in strategies]
+    names = [configuration.pop('strategy') for configuration in configurations]
+    deadline = time() + time_limit if time_limit is not None else None
+    stop = Event()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or len(configurations),
+                             initializer=initialize_worker, initargs=(stop,)) as executor:
+        futures = {executor.submit(run_strategy, name, packed, configuration, deadline): i
+                   for i, (name, configuration) in enumerate(zip(names, configurations))}
+        pending = set(futures)
+        while pending:
+            timeout = max(0.0, deadline - time()) + 1 if deadline is not None and not stop.is_set() else None
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                stop.set()  # the deadline passed, every strategy returns after its current step
+                continue
+            for future in done:
+                if future.cancelled():
+                    result = {'strategy': names[futures[future]], 'status': 'cancelled'}
+                else:
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        result = {'strategy': names[futures[future]], 'status': 'error', 'error': repr(error)}
+                results.append((futures[future], result))
+                if target_score is not None and result.get('score', 0.0) >= target_score:
+                    stop.set()
+                    executor.shutdown(wait=False, cancel_futures=True)
+    results.sort(key=lambda item: (item[1]['status'] != 'ok', -item[1].get('score', 0.0), item[1].get('size', 0),
+                                   item[0]))
+    return [result for _, result in results]
@@ -0,0 +1,98 @@
+"""
+Apply a found expression to many new assignments at once. The variables are given as columns, e.g. a 2D
+NumPy array or memory-mapped .npy file with one column per variable, or a mapping like a DataFrame from
+the labels v_1, ..., v_n to 1D arrays. The columns are read in chunks and every chunk is evaluated with the
+same three-valued operators as the packed assignments of the search, on boolean NumPy arrays instead of
+integer bitsets.
+
+The results are written as int8 codes, 1 for True, 0 for False and -1 for None.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import numpy
+from sr_fol.Expression import Expression, Var
+from sr_fol.Semantics import PackedAssignment
+
+TRUE, FALSE, NONE = 1, 0, -1
+
+
+def columns(data, subscripts: list[int]) -> dict[int, numpy.ndarray]:
+    """
+    Select the columns of the variables an expression uses without copying them.
+
+    :param data: 2D array with the column i-1 for v_i, or mapping from labels v_i or subscripts i to 1D arrays
+    :param subscripts: subscripts of the used variables
+    :return: column by subscript
+    :raises ValueError: if a variable is missing or the columns differ in length
+    """
+    selected = {}
+    for subscript in subscripts:
+        if isinstance(data, numpy.ndarray):
+            if subscript > data.shape[1]:
+                raise ValueError(f'Missing column of variable v_{subscript}')
+            selected[subscript] = data[:, subscript - 1]
+        elif 'v_' + str(subscript) in data:
+            selected[subscript] = numpy.asarray(data['v_' + str(subscript)])
+        elif subscript in data:
+            selected[subscript] = numpy.asarray(data[subscript])
+        else:
+            raise ValueError(f'Missing column of variable v_{subscript}')
+    if len({len(column) for column in selected.values()}) > 1:
+        raise ValueError('Columns differ in length')
+    return selected
+
+
+def truth(expression: Expression, chunk: dict[int, numpy.ndarray]) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """
+    Evaluate an expression for a chunk of assignments. Values equal to True or False count as such, any
+    other value like None or NaN is unknown.
+
+    :param expression: expression to evaluate
+    :param chunk: values of the used variables by subscript
+    :return: boolean arrays of the true and the false evaluations
+    """
+    a_n = len(next(iter(chunk.values())))
+    variables = {subscript: (values == True, values == False) for subscript, values in chunk.items()}
+    return expression.truth(PackedAssignment(variables, (0, 0), a_n))
+
+
+def predict(expression: Expression,
+            data,
+            out: numpy.ndarray | str | None = None,
+            chunk_size: int = 1 << 20,
+            workers: int = 1) -> numpy.ndarray:
+    """
+    Evaluate an expression for every row of columnar data in chunks.
+
+    :param expression: expression to evaluate
+    :param data: 2D array or memory-mapped file with the column i-1 for v_i, or mapping like a DataFrame
+                 from labels v_i or subscripts i to 1D arrays
+    :param out: array to write the results to, or path of a .npy file created for them, by default a new array
+    :param chunk_size: number of rows evaluated at once
+    :param workers: number of threads evaluating chunks, NumPy releases the interpreter lock for the operators
+    :return: results as int8 codes, 1 for True, 0 for False and -1 for None
+    :raises ValueError: if a variable is missing, the columns differ in length or out has another length
+    """
+    subscripts = sorted({node.subscript for node in expression.nodes([Var])})
+    selected = columns(data, subscripts)
+    n = len(next(iter(selected.values())))
+    if isinstance(out, str):
+        out = numpy.lib.format.open_memmap(out, mode='w+', dtype=numpy.int8, shape=(n,))
+    elif out is None:
+        out = numpy.empty(n, dtype=numpy.int8)
+    elif len(out) != n:
+        raise ValueError(f'Output of length {len(out)} for {n} rows')
+
+    def apply(start: int) -> None:
+        stop = min(start + chunk_size, n)
+        true, false = truth(expression, {subscript: column[start:stop] for subscript, column in selected.items()})
+        out[start:stop] = numpy.where(true, TRUE, numpy.where(false, FALSE, NONE))
+
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(apply, range(0, n, chunk_size)))
+    else:
+        for start in range(0, n, chunk_size):
+            apply(start)
+    if isinstance(out, numpy.memmap):
+        out.flush()
+    return out
@@ -0,0 +1,117 @@
+import tracemalloc
+from cProfile import Profile
+from io import StringIO
+from pstats import Stats
+
+
+class Profiler:
+    """
+    Profiler capturing a CPU profile with cProfile and an allocation snapshot with tracemalloc for a window
+    of generations. When the window ends, the profile is written to path.prof, the snapshot to
+    path.tracemalloc and a summary of the hottest functions and allocation sites in the sr_fol code
+    to path.txt.
+    """
+
+    enabled = True
+
+    def __init__(self,
+                 path: str,
+                 start: int = 1,
+                 stop: int | None = None,
+                 cpu: bool = True,
+                 memory: bool = True,
+                 top: int = 15) -> None:
+        """
+        :param path: path of the output files without extension
+        :param start: first profiled generation
+        :param stop: last profiled generation, by default the last generation of the run
+        :param cpu: capture a CPU profile
+        :param memory: capture an allocation snapshot, which slows down the profiled generations
+        :param top: number of functions and allocation sites in the summary
+        """
+        self.path = path
+        self.start = start
+        self.stop = stop
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.profile = None
+        self.started_tracing = False
+        self.active = False
+        self.summary = None
+
+    def start_generation(self, generation: int) -> None:
+        """
+        Start capturing if generation is the first one of the window.
+
+        :param generation: number of the generation about to run
+        """
+        if self.active or self.summary is not None or generation < self.start:
+            return
+        if self.stop is not None and generation > self.stop:
+            return
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        if self.cpu:
+            self.profile = Profile()
+            self.profile.enable()
+        self.active = True
+
+    def end_generation(self, generation: int) -> None:
+        """
+        Finish capturing if generation is the last one of the window.
+
+        :param generation: number of the generation that just ran
+        """
+        if self.active and self.stop is not None and generation >= self.stop:
+            self.finish()
+
+    def finish(self) -> str | None:
+        """
+        Stop capturing, write the output files and return the summary.
+
+        :return: summary of the hottest functions and allocation sites, None if nothing was captured
+        """
+        if not self.active:
+            return self.summary
+        summary = StringIO()
+        if self.cpu:
+            self.profile.disable()
+            self.profile.dump_stats(self.path + '.prof')
+            summary.write('Hottest functions in sr_fol by own time\n')
+            Stats(self.profile, stream=summary).sort_stats('tottime').print_stats('sr_fol', self.top)
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            if self.started_tracing:
+                tracemalloc.stop()
+                self.started_tracing = False
+            snapshot.dump(self.path + '.tracemalloc')
+            summary.write('Largest allocation sites in sr_fol\n')
+            statistics = snapshot.filter_traces([tracemalloc.Filter(True, '*sr_fol*'),
+                                                 tracemalloc.Filter(False, __file__)]).statistics('lineno')
+            for statistic in statistics[:self.top]:
+                summary.write(f'{statistic}\n')
+        self.summary = summary.getvalue()
+        with open(self.path + '.txt', 'w') as summary_file:
+            summary_file.write(self.summary)
+        self.active = False
+        return self.summary
+
+
+class NullProfiler(Profiler):
+    """ Profiler that captures nothing, used when profiling is disabled. """
+
+    enabled = False
+
+    def __init__(self) -> None:
+        super().__init__(path='', cpu=False, memory=False)
+
+    def start_generation(self, generation: int) -> None:
+        pass
+
+    def end_generation(self, generation: int) -> None:
+        pass
+
+    def finish(self) -> str | None:
+        return None
@@ -0,0 +1,99 @@
+class IslandScheduler:
+    """
+    Allocation of the steps of cull, crossover, mutation and local search of a Solver to its populations (islands).
+    Every generation the islands share as many steps as there are islands, in proportion to their progress rate,
+    the improvement of their best score per step over their last window generations. Islands that stagnate keep
+    a share of min_share relative to the fastest improving island, so they still run every few generations, and
+    an island without improvement for patience of its own steps is restarted unless it holds the best score.
+    """
+
+    def __init__(self,
+                 islands: int,
+                 window: int = 5,
+                 min_share: float = 0.25,
+                 max_steps: int = 3,
+                 patience: int = 20) -> None:
+        """
+        :param islands: number of islands
+        :param window: number of generations an island ran the progress rate is measured over
+        :param min_share: weight of an island without progress relative to the fastest improving island
+        :param max_steps: maximum number of steps of an island per generation
+        :param patience: number of steps without improvement after which an island is restarted
+        """
+        self.window = window
+        self.min_share = min_share
+        self.max_steps = max_steps
+        self.patience = patience
+        self.history = [[] for _ in range(islands)]
+        self.credit = [0.0] * islands
+        self.runs = [0] * islands
+        self.best = [None] * islands
+        self.improved = [0] * islands
+        self.steps = [0] * islands
+        self.restarts = 0
+
+    def rate(self, island: int) -> float | None:
+        """
+        :param island: position of the island
+        :return: improvement of the best score per step over the last window generations the island ran,
+                 None if it did not run twice yet
+        """
+        history = self.history[island][-self.window - 1:]
+        if len(history) < 2:
+            return None
+        return (history[-1][1] - history[0][1]) / (history[-1][0] - history[0][0])
+
+    def allocate(self) -> list[int]:
+        """
+        Distribute the steps of the next generation. Islands without a progress rate yet count as the fastest.
+
+        :return: number of steps per island
+        """
+        rates = [self.rate(island) for island in range(len(self.history))]
+        top = max((rate for rate in rates if rate is not None), default=0.0)
+        weights = [1.0 if top <= 0 else self.min_share + (1 - self.min_share) * (top if rate is None else rate) / top
+                   for rate in rates]
+        total = sum(weights)
+        for island, weight in enumerate(weights):
+            self.credit[island] = min(self.credit[island] + len(weights) * weight / total, self.max_steps)
+        self.steps = [int(credit + 1e-9) for credit in self.credit]
+        self.credit = [credit - steps for credit, steps in zip(self.credit, self.steps)]
+        return self.steps
+
+    def update(self, best_scores: list[float]) -> list[int]:
+        """
+        Record the best scores after the allocated steps.
+
+        :param best_scores: best score per island
+        :return: positions of the islands to restart
+        """
+        for island, (steps, best_score) in enumerate(zip(self.steps, best_scores)):
+            if steps == 0:
+                continue
+            self.runs[island] += steps
+            self.history[island].append((self.runs[island], best_score))
+            if self.best[island] is None or best_score > self.best[island]:
+                self.best[island] = best_score
+                self.improved[island] = self.runs[island]
+        return [island for island, best_score in enumerate(best_scores)
+                if self.runs[island] - self.improved[island] >= self.patience and best_score < max(best_scores)]
+
+    def restart(self, island: int) -> None:
+        """
+        Forget the progress of a restarted island, it counts as the fastest improving one again.
+
+        :param island: position of the island
+        """
+        self.history[island] = []
+        self.runs[island] = 0
+        self.best[island] = None
+        self.improved[island] = 0
+        self.restarts += 1
+
+    def report(self) -> dict:
+        """
+        :return: steps per island of the last generation, progress rates and number of restarts for telemetry
+        """
+        return {'allocation': list(self.steps),
+                'progress': [self.rate(island) for island in range(len(self.history))],
+                'restarts': self.restarts}
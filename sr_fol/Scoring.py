@@ -0,0 +1,119 @@
+"""
+Score many expressions at once with a pool of threads. The integer bitsets of the packed assignments are
+converted once into NumPy arrays of 64 bit words and split into chunks, and every thread counts the correct
+assignments of a batch of expressions on a chunk with the same three-valued operators as the integer bitsets.
+NumPy releases the interpreter lock while it combines the arrays, so the chunks are evaluated in parallel; on
+free-threaded builds the walks of the expression trees run in parallel as well. Small inputs are scored on the
+integer bitsets without threads, where the overhead of the arrays and the threads would outweigh the gain.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from os import cpu_count
+import numpy
+from sr_fol.Expression import Expression
+from sr_fol.Semantics import PackedAssignment
+
+
+def words(bits: int, a_n: int) -> numpy.ndarray:
+    """
+    :param bits: bits of a truth vector
+    :param a_n: number of assignments
+    :return: array of 64 bit words with bit i of the truth vector as bit i % 64 of word i // 64
+    """
+    return numpy.frombuffer((bits & (1 << a_n) - 1).to_bytes((a_n + 63) // 64 * 8, 'little'), dtype='<u8')
+
+
+class ThreadScorer:
+    """
+    Thread pool scoring the expressions of populations in chunks of the assignments. The converted assignments
+    of the last packed assignment are kept until it is extended or another one is scored.
+    """
+
+    def __init__(self,
+                 threads: int | None = None,
+                 chunk_size: int | None = None,
+                 min_chunk: int = 1 << 16) -> None:
+        """
+        :param threads: number of threads, by default the number of processors
+        :param chunk_size: number of assignments per chunk, rounded up to whole words, by default the assignments
+                           are split evenly across the threads in chunks of at least min_chunk
+        :param min_chunk: minimum number of assignments per chunk, fewer assignments are scored on the bitsets
+        """
+        self.threads = threads if threads else cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_chunk = min_chunk
+        self.executor = None
+        self.converted = (None, 0, [])
+
+    def tune(self, a_n: int) -> int:
+        """
+        :param a_n: number of assignments
+        :return: number of assignments per chunk, a multiple of 64
+        """
+        chunk_size = self.chunk_size if self.chunk_size else max(self.min_chunk, -(-a_n // self.threads))
+        return -(-chunk_size // 64) * 64
+
+    def chunks(self, packed: PackedAssignment) -> list[PackedAssignment]:
+        """
+        Convert the assignments into arrays of words and split them into chunks, reusing those of the last call
+        for the same and unchanged packed assignment.
+
+        :param packed: packed variable assignments and associated evaluations
+        :return: chunks with arrays of words as truth vectors
+        """
+        if self.converted[0] is packed and self.converted[1] == packed.a_n:
+            return self.converted[2]
+        a_n = packed.a_n
+        variables = {subscript: (words(true_bits, a_n), words(false_bits, a_n))
+                     for subscript, (true_bits, false_bits) in packed.variables.items()}
+        e = (words(packed.e[0], a_n), words(packed.e[1], a_n))
+        chunk_size = self.tune(a_n)
+        step = chunk_size // 64
+        chunks = [PackedAssignment({subscript: (true[start:start + step], false[start:start + step])
+                                    for subscript, (true, false) in variables.items()},
+                                   (e[0][start:start + step], e[1][start:start + step]),
+                                   min(chunk_size, a_n - start * 64))
+                  for start in range(0, len(e[0]), step)]
+        self.converted = (packed, a_n, chunks)
+        return chunks
+
+    @staticmethod
+    def count(expressions: list[Expression], chunk: PackedAssignment) -> list[int]:
+        """
+        :param expressions: expressions to evaluate
+        :param chunk: chunk with arrays of words as truth vectors
+        :return: number of correctly evaluated assignments of the chunk per expression
+        """
+        counts = []
+        for expression in expressions:
+            true, false = expression.truth(chunk)
+            counts.append(int(numpy.bitwise_count((true & chunk.e[0]) | (false & chunk.e[1])).sum()))
+        return counts
+
+    def correct(self, expressions: list[Expression], packed: PackedAssignment) -> list[int]:
+        """
+        Count the correctly evaluated assignments of every expression. The expressions are split into as
+        many batches as there are threads per chunk, and every batch is evaluated on every chunk.
+
+        :param expressions: expressions to evaluate
+        :param packed: packed variable assignments and associated evaluations
+        :return: number of correctly evaluated assignments per expression
+        """
+        if packed.a_n < self.min_chunk or self.threads < 2 or not expressions:
+            return [packed.correct(expression.truth(packed)).bit_count() for expression in expressions]
+        chunks = self.chunks(packed)
+        batch_size = -(-len(expressions) // max(1, self.threads // len(chunks)))
+        tasks = [(start, chunk) for start in range(0, len(expressions), batch_size) for chunk in chunks]
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.threads)
+        counts = [0] * len(expressions)
+        results = self.executor.map(lambda task: self.count(expressions[task[0]:task[0] + batch_size], task[1]), tasks)
+        for (start, _), batch_counts in zip(tasks, results):
+            for i, correct in enumerate(batch_counts, start):
+                counts[i] += correct
+        return counts
+
+    def close(self) -> None:
+        """ Stop the threads. """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
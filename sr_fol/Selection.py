@@ -0,0 +1,75 @@
+"""
+Selection of the survivors of a population. Every function returns the positions of the k selected individuals
+of a population of n, ranked by keys that compare greater for better individuals, or by the bits of their
+correctly evaluated assignments.
+"""
+from heapq import nlargest
+from random import Random
+
+# selections of cull
+SELECTIONS = ('truncation', 'tournament', 'lexicase')
+
+
+def truncation(keys: list, k: int) -> list[int]:
+    """
+    Select the k best individuals without sorting the others, in O(n log k).
+
+    :param keys: rank key per individual
+    :param k: number of survivors
+    :return: positions of the survivors
+    """
+    return nlargest(k, range(len(keys)), key=keys.__getitem__)
+
+
+def tournament(keys: list, k: int, rng: Random, size: int = 2) -> list[int]:
+    """
+    Select k distinct individuals, each the best of size individuals drawn from those not yet selected.
+
+    :param keys: rank key per individual
+    :param k: number of survivors
+    :param rng: random number generator
+    :param size: number of individuals per tournament
+    :return: positions of the survivors
+    """
+    pool = list(range(len(keys)))
+    selected = []
+    for _ in range(min(k, len(pool))):
+        entrants = rng.sample(range(len(pool)), min(size, len(pool)))
+        winner = max(entrants, key=lambda entrant: keys[pool[entrant]])
+        selected.append(pool[winner])
+        pool[winner] = pool[-1]
+        pool.pop()
+    return selected
+
+
+def lexicase(correct: list[int], evaluated: int, k: int, rng: Random) -> list[int]:
+    """
+    Select k distinct individuals by lexicase selection. For every selection the evaluated assignments are
+    visited in random order and only the candidates evaluating the assignment correctly are kept, unless none
+    does, until one candidate is left or all assignments were visited; of the remaining candidates a random one
+    is selected. The assignments are drawn one by one, so a selection only shuffles as many as it visits.
+
+    :param correct: bits of the correctly evaluated assignments per individual
+    :param evaluated: bits of the assignments with an evaluation
+    :param k: number of survivors
+    :param rng: random number generator
+    :return: positions of the survivors
+    """
+    cases = [i for i in range(evaluated.bit_length()) if evaluated >> i & 1]
+    pool = set(range(len(correct)))
+    selected = []
+    for _ in range(min(k, len(pool))):
+        candidates = list(pool)
+        for visited in range(len(cases)):
+            if len(candidates) == 1:
+                break
+            drawn = rng.randrange(visited, len(cases))
+            cases[visited], cases[drawn] = cases[drawn], cases[visited]
+            case = cases[visited]
+            passed = [candidate for candidate in candidates if correct[candidate] >> case & 1]
+            if passed:
+                candidates = passed
+        winner = rng.choice(candidates)
+        selected.append(winner)
+        pool.remove(winner)
+    return selected
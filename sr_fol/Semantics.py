@@ -0,0 +1,217 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+
+class PackedAssignment:
+    """
+    Bitset form of an assignment matrix. Every row is stored as a pair of integers (true bits, false bits)
+    in which bit i stands for assignment a_(i+1). A None value sets neither bit, so the operators can apply
+    the same three-valued logic as Expression.evaluate to all assignments at once.
+    """
+
+    def __init__(self,
+                 variables: dict[int, tuple[int, int]],
+                 e: tuple[int, int],
+                 a_n: int,
+                 evaluated: int | None = None) -> None:
+        """
+        :param variables: truth vectors of the variables by subscript
+        :param e: truth vector of the evaluation row
+        :param a_n: number of assignments
+        :param evaluated: number of assignments with an evaluation the score is relative to, by default a_n
+        """
+        self.variables = variables
+        self.e = e
+        self.a_n = a_n
+        self.evaluated = evaluated if evaluated is not None else a_n
+        self.mask = (1 << a_n) - 1
+        self.keys = None
+
+    @staticmethod
+    def value(value) -> bool | None:
+        """
+        Sanitize a value of the assignment matrix the same way as Assignment.clean.
+
+        :param value: any value
+        :return: True, False or None for None and NaN
+        """
+        if value is None or value != value:  # None or NaN
+            return None
+        return bool(value)
+
+    @classmethod
+    def pack(cls, values: list) -> tuple[int, int]:
+        """
+        Convert a row of bool or None values into a truth vector.
+
+        :param values: row of the assignment matrix
+        :return: true bits and false bits
+        """
+        values = [cls.value(value) for value in reversed(values)]
+        true_bits = int(''.join(['1' if value is True else '0' for value in values]) or '0', 2)
+        false_bits = int(''.join(['1' if value is False else '0' for value in values]) or '0', 2)
+        return true_bits, false_bits
+
+    @staticmethod
+    def rows(matrix: 'DataFrame | list[list]') -> list[list]:
+        """
+        Return the rows of a DataFrame, a NumPy array or a sequence of rows as lists of values.
+
+        :param matrix: assignment matrix
+        :return: rows of the assignment matrix
+        """
+        if hasattr(matrix, 'columns'):
+            matrix = matrix.values
+        if hasattr(matrix, 'tolist'):
+            return matrix.tolist()
+        return [list(row) for row in matrix]
+
+    @classmethod
+    def from_rows(cls, rows: 'DataFrame | list[list]') -> 'PackedAssignment':
+        """
+        Pack an uncleaned matrix given as rows of the variables v_1, ..., v_n followed by the evaluation row.
+        Values are sanitized and assignments are deduplicated like in Assignment.clean.
+
+        :param rows: rows of the assignment matrix, or a DataFrame or NumPy array of them
+        :return: packed assignment
+        """
+        rows = cls.rows(rows)
+        packed = cls({i + 1: (0, 0) for i in range(len(rows) - 1)}, (0, 0), 0)
+        packed.extend(rows)
+        return packed
+
+    @classmethod
+    def from_targets(cls, rows: 'DataFrame | list[list]', targets: int) -> list['PackedAssignment']:
+        """
+        Pack an uncleaned matrix with several evaluation rows, given as rows of the variables v_1, ..., v_n
+        followed by the evaluation rows e_1, ..., e_targets. The assignments are deduplicated once and kept
+        if any target has an evaluation. All targets share the truth vectors of the variables, an assignment
+        without evaluation of a target sets neither bit of its e and is not counted in its score.
+
+        :param rows: rows of the assignment matrix, or a DataFrame or NumPy array of them
+        :param targets: number of evaluation rows
+        :return: packed assignment per target
+        """
+        rows = cls.rows(rows)
+        variable_rows = rows[:-targets]
+        target_rows = [[cls.value(value) for value in row] for row in rows[-targets:]]
+        any_evaluation = [True if any(value is not None for value in column) else None
+                          for column in zip(*target_rows)]
+        packed = cls({i + 1: (0, 0) for i in range(len(variable_rows))}, (0, 0), 0)
+        kept = packed.extend(variable_rows + [any_evaluation], kept_positions=True)
+        packed_targets = []
+        for row in target_rows:
+            e = cls.pack([row[i] for i in kept])
+            packed_targets.append(cls(packed.variables, e, packed.a_n, (e[0] | e[1]).bit_count()))
+        return packed_targets
+
+    @classmethod
+    def from_matrix(cls, assignment_matrix: 'DataFrame | list[list]') -> 'PackedAssignment':
+        """
+        Pack a cleaned assignment matrix, given as DataFrame with the rows v_1, ..., v_n and e or as rows
+        of plain values in this order.
+
+        :param assignment_matrix: DataFrame or rows of variable assignments and associated evaluations
+        :return: packed assignment
+        """
+        if not hasattr(assignment_matrix, 'columns'):
+            rows = cls.rows(assignment_matrix)
+            return cls({i + 1: cls.pack(row) for i, row in enumerate(rows[:-1])}, cls.pack(rows[-1]), len(rows[-1]))
+        variables = {}
+        e = (0, 0)
+        for label, row in zip(assignment_matrix.index, assignment_matrix.values.tolist()):
+            if label == 'e':
+                e = cls.pack(row)
+            else:
+                variables[int(str(label)[2:])] = cls.pack(row)
+        return cls(variables, e, len(assignment_matrix.columns))
+
+    def key(self, i: int) -> tuple[bool | None, ...]:
+        """
+        Return the values of the variables in assignment i.
+
+        :param i: position of the assignment
+        :return: values of v_1, ..., v_n
+        """
+        return tuple(True if true_bits >> i & 1 else False if false_bits >> i & 1 else None
+                     for true_bits, false_bits in (self.variables[subscript] for subscript in sorted(self.variables)))
+
+    def extend(self, rows: list[list], kept_positions: bool = False) -> int | list[int]:
+        """
+        Append the assignments of an uncleaned matrix, given as rows of the variables v_1, ..., v_n followed by the
+        evaluation row. Like in Assignment.clean, assignments whose variable values were seen before and
+        assignments without evaluation are left out, but duplicates are found by hashing instead of comparing
+        all pairs of assignments. The bits of the existing assignments are not changed.
+
+        :param rows: rows of the assignment matrix
+        :param kept_positions: return the positions of the appended assignments in rows instead of their number
+        :return: number of appended assignments
+        :raises ValueError: if the number of rows does not match the variables or the rows differ in length
+        """
+        if len(rows) - 1 != len(self.variables):
+            raise ValueError(f'expected {len(self.variables) + 1} rows, got {len(rows)}')
+        if len({len(row) for row in rows}) > 1:
+            raise ValueError(f'expected rows of the same length, got lengths {", ".join(str(len(row)) for row in rows)}')
+        if self.keys is None:
+            self.keys = {self.key(i) for i in range(self.a_n)}
+        variable_rows = [[self.value(value) for value in row] for row in rows[:-1]]
+        e_row = [self.value(value) for value in rows[-1]]
+        kept = []
+        for i, key in enumerate(zip(*variable_rows)):
+            if key not in self.keys:
+                self.keys.add(key)
+                if e_row[i] is not None:
+                    kept.append(i)
+
+        for subscript, row in zip(sorted(self.variables), variable_rows):
+            true_bits, false_bits = self.pack([row[i] for i in kept])
+            self.variables[subscript] = (self.variables[subscript][0] | true_bits << self.a_n,
+                                         self.variables[subscript][1] | false_bits << self.a_n)
+        true_bits, false_bits = self.pack([e_row[i] for i in kept])
+        self.e = (self.e[0] | true_bits << self.a_n, self.e[1] | false_bits << self.a_n)
+        self.a_n += len(kept)
+        self.evaluated += len(kept)
+        self.mask = (1 << self.a_n) - 1
+        return kept if kept_positions else len(kept)
+
+    def tail(self, start: int) -> 'PackedAssignment':
+        """
+        Return the assignments from position start onwards as a new packed assignment.
+
+        :param start: position of the first assignment
+        :return: packed assignment
+        """
+        return PackedAssignment({subscript: (true_bits >> start, false_bits >> start)
+                                 for subscript, (true_bits, false_bits) in self.variables.items()},
+                                (self.e[0] >> start, self.e[1] >> start),
+                                self.a_n - start)
+
+    def correct(self, truth: tuple[int, int]) -> int:
+        """
+        Return the bits of the assignments a truth vector evaluates correctly.
+
+        :param truth: truth vector of an expression
+        :return: bits of correctly evaluated assignments
+        """
+        return (truth[0] & self.e[0]) | (truth[1] & self.e[1])
+
+    def score(self, truth: tuple[int, int]) -> float:
+        """
+        Calculate the fraction of evaluated assignments a truth vector evaluates correctly.
+
+        :param truth: truth vector of an expression
+        :return: fraction of correct assignments
+        """
+        return self.fraction(self.correct(truth).bit_count())
+
+    def fraction(self, correct: int) -> float:
+        """
+        Calculate the fraction of evaluated assignments from the number of correct ones. Without evaluated
+        assignments, e.g. for a target that is None throughout, the fraction is 0.0.
+
+        :param correct: number of correctly evaluated assignments
+        :return: fraction of correct assignments
+        """
+        return correct / self.evaluated if self.evaluated else 0.0
@@ -0,0 +1,227 @@
+from random import Random
+from sr_fol.Expression import Expression, Var, Not, OPERATORS
+from sr_fol.Population import Population
+
+# the node classes declare their codes, 0 is reserved for variables with large subscripts,
+# codes 1, ..., 7 and 248, ..., 255 for operators
+SMALL_VAR_OFFSET = 7  # codes 8, ..., 247 are the variables v_1, ..., v_240
+SMALL_VAR_LIMIT = 247
+
+
+def code_nodes() -> dict[int, type[Expression]]:
+    """ :return: registered operator classes by their code in the binary form, operators without code are left out """
+    return {node_class.code: node_class for node_class in OPERATORS.values() if node_class.code is not None}
+
+
+def token_nodes() -> dict[str, type[Expression]]:
+    """ :return: registered operator classes by their letter in the text form, operators without letter are left out """
+    return {node_class.token: node_class for node_class in OPERATORS.values() if node_class.token is not None}
+
+
+def infix_operators() -> dict[str, type[Expression]]:
+    """ :return: registered binary operator classes by their infix symbol """
+    return {node_class.symbol: node_class for node_class in OPERATORS.values() if node_class.arity() == 2}
+
+
+def to_bytes(expression: Expression) -> bytes:
+    """
+    Encode an expression in prefix order with one byte per node. Variables up to v_240 take a single byte,
+    larger subscripts follow the code 0 as a little-endian base-128 number.
+
+    :param expression: expression to encode
+    :return: binary form of the expression
+    :raises ValueError: if the expression has an operator without code
+    """
+    data = bytearray()
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Var):
+            if node.subscript + SMALL_VAR_OFFSET <= SMALL_VAR_LIMIT:
+                data.append(node.subscript + SMALL_VAR_OFFSET)
+            else:
+                data.append(0)
+                subscript = node.subscript
+                while subscript >= 128:
+                    data.append(subscript & 127 | 128)
+                    subscript >>= 7
+                data.append(subscript)
+        elif node.code is None:
+            raise ValueError(f'{node.__class__.__name__} has no code in the binary form')
+        else:
+            data.append(node.code)
+            stack += [arg for arg in (node.arg_2, node.arg_1) if arg is not None]
+    return bytes(data)
+
+
+def from_bytes(data: bytes) -> Expression:
+    """
+    Decode an expression encoded by to_bytes.
+
+    :param data: binary form of the expression
+    :return: decoded expression
+    """
+    position = 0
+    nodes = code_nodes()
+
+    def decode() -> Expression:
+        nonlocal position
+        code = data[position]
+        position += 1
+        if SMALL_VAR_OFFSET < code <= SMALL_VAR_LIMIT:
+            return Var(code - SMALL_VAR_OFFSET)
+        if code == 0:
+            subscript, shift = 0, 0
+            while True:
+                byte = data[position]
+                position += 1
+                subscript |= (byte & 127) << shift
+                shift += 7
+                if byte < 128:
+                    return Var(subscript)
+        node_class = nodes[code]
+        if node_class.arity() == 1:
+            return node_class(decode())
+        arg_1 = decode()
+        return node_class(arg_1, decode())
+
+    return decode()
+
+
+def to_text(expression: Expression) -> str:
+    """
+    Encode an expression as space separated tokens in prefix order, variables as their subscripts
+    and operators as single letters.
+
+    :param expression: expression to encode
+    :return: text form of the expression
+    :raises ValueError: if the expression has an operator without letter
+    """
+    tokens = []
+    stack = [expression]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Var):
+            tokens.append(str(node.subscript))
+        elif node.token is None:
+            raise ValueError(f'{node.__class__.__name__} has no letter in the text form')
+        else:
+            tokens.append(node.token)
+            stack += [arg for arg in (node.arg_2, node.arg_1) if arg is not None]
+    return ' '.join(tokens)
+
+
+def from_text(text: str) -> Expression:
+    """
+    Decode an expression encoded by to_text.
+
+    :param text: text form of the expression
+    :return: decoded expression
+    """
+    tokens = iter(text.split())
+    nodes = token_nodes()
+
+    def decode() -> Expression:
+        token = next(tokens)
+        if token.isdigit():
+            return Var(int(token))
+        node_class = nodes[token]
+        if node_class.arity() == 1:
+            return node_class(decode())
+        arg_1 = decode()
+        return node_class(arg_1, decode())
+
+    return decode()
+
+
+def parse(text: str) -> Expression:
+    """
+    Parse an expression from the infix form produced by str(expression), e.g. '(v_1) and (not (v_2))'.
+
+    :param text: infix form of the expression
+    :return: parsed expression
+    """
+    position = 0
+    operators = infix_operators()
+
+    def expect(token: str) -> None:
+        nonlocal position
+        if not text.startswith(token, position):
+            raise ValueError(f'expected {token!r} at position {position} in {text!r}')
+        position += len(token)
+
+    def operand() -> Expression:
+        expect('(')
+        expression = parse_expression()
+        expect(')')
+        return expression
+
+    def parse_expression() -> Expression:
+        nonlocal position
+        if text.startswith('v_', position):
+            end = position + 2
+            while end < len(text) and text[end].isdigit():
+                end += 1
+            if end == position + 2:
+                raise ValueError(f'expected a subscript at position {end} in {text!r}')
+            subscript, position = int(text[position + 2:end]), end
+            return Var(subscript)
+        if text.startswith('not ', position):
+            expect('not ')
+            return Not(operand())
+        arg_1 = operand()
+        for symbol, node_class in operators.items():
+            if text.startswith(' ' + symbol + ' ', position):
+                position += len(symbol) + 2
+                return node_class(arg_1, operand())
+        raise ValueError(f'expected an operator at position {position} in {text!r}')
+
+    expression = parse_expression()
+    if position != len(text):
+        raise ValueError(f'unexpected {text[position:]!r} at position {position} in {text!r}')
+    return expression
+
+
+def dump_population(population: Population) -> dict:
+    """
+    Convert a population into a dictionary of plain values with the expressions in binary form.
+
+    :param population: population to convert
+    :return: dictionary of the population
+    """
+    return {'population_size': population.population_size,
+            'v_n': population.v_n,
+            'maxdepth': population.maxdepth,
+            'binary_operators': [node_class.__name__ for node_class in population.binary_operators],
+            'unary_operators': [node_class.__name__ for node_class in population.unary_operators],
+            'nary': population.nary,
+            'maxsize': population.maxsize,
+            'parsimony': population.parsimony,
+            'selection': population.selection,
+            'evaluations': population.evaluations,
+            'random_state': population.rng.getstate(),
+            'expressions': [to_bytes(expression) for expression in population.expressions]}
+
+
+def load_population(state: dict) -> Population:
+    """
+    Restore a population converted by dump_population.
+
+    :param state: dictionary of the population
+    :return: restored population
+    """
+    population = Population(0,
+                            state['v_n'],
+                            state['maxdepth'],
+                            tuple(OPERATORS[name] for name in state['binary_operators']),
+                            tuple(OPERATORS[name] for name in state['unary_operators']),
+                            Random(),
+                            state.get('nary', False),
+                            state.get('maxsize'),
+                            state.get('parsimony'),
+                            selection=state.get('selection', 'truncation'))
+    population.rng.setstate(state['random_state'])
+    population.population_size = state['population_size']
+    population.evaluations = state['evaluations']
+    population.expressions = [from_bytes(data) for data in state['expressions']]
+    return population
@@ -0,0 +1,320 @@
+"""
+Local HTTP/JSON solver service with a bounded job queue, a pool of worker threads and a persistent result cache.
+
+    POST   /jobs            {"rows": [[...], ..., [...]], "options": {"maxdepth": 5}, "timeout": 30}
+    GET    /jobs/<id>       status of the job and its result when done, ?wait=<seconds> blocks until done,
+                            for at most an hour
+    DELETE /jobs/<id>       cancel the job, a running search stops after the current generation
+
+The rows are the uncleaned assignment matrix, the variables v_1, ..., v_n followed by the evaluation row.
+Results are cached by a hash of the cleaned, packed assignments and the options, so repeated or equivalent
+requests are answered without running the search again.
+"""
+from hashlib import sha256
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from json import dumps, loads
+from math import isfinite
+from queue import Queue, Full
+from sqlite3 import connect
+from threading import Thread, Lock, Event
+from time import perf_counter
+from urllib.parse import urlparse, parse_qs
+from uuid import uuid4
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Batch import build_solver, check_options
+
+# longest wait of a status request in seconds, longer waits overflow the timeout of Event.wait
+MAX_WAIT = 3600.0
+
+
+class ResultCache:
+    """ Results of finished searches in an SQLite file, keyed by the hash of the packed assignments and options. """
+
+    def __init__(self, path: str = ':memory:') -> None:
+        """
+        :param path: file of the cache, by default a cache in memory
+        """
+        self.connection = connect(path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT)')
+        self.connection.commit()
+        self.lock = Lock()
+
+    @staticmethod
+    def key(packed: PackedAssignment, options: dict, timeout: float | None) -> str:
+        """
+        Hash the cleaned assignments and the options of a request.
+
+        :param packed: packed variable assignments and associated evaluations
+        :param options: options of the search
+        :param timeout: seconds after which the search stops
+        :return: hexadecimal hash
+        """
+        data = dumps([sorted(packed.variables.items()), packed.e, packed.a_n, options, timeout], sort_keys=True)
+        return sha256(data.encode()).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        with self.lock:
+            row = self.connection.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+        return loads(row[0]) if row else None
+
+    def put(self, key: str, result: dict) -> None:
+        with self.lock:
+            self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?)', (key, dumps(result)))
+            self.connection.commit()
+
+    def close(self) -> None:
+        """ Close the file. """
+        self.connection.close()
+
+
+class SolverService:
+    """
+    Queue of search jobs worked off by a pool of threads. The threads share the interpreter, so the pool
+    serves several clients at once rather than speeding up a single search; use the batch mode to spread
+    many datasets over processors.
+    """
+
+    def __init__(self,
+                 workers: int = 2,
+                 queue_size: int = 16,
+                 cache: ResultCache | None = None,
+                 defaults: dict | None = None,
+                 timeout: float | None = None,
+                 job_ttl: float | None = 3600.0) -> None:
+        """
+        :param workers: number of worker threads
+        :param queue_size: maximum number of waiting jobs, further jobs are rejected
+        :param cache: cache of the results, by default a cache in memory
+        :param defaults: default options of all jobs
+        :param timeout: seconds after which a search stops, unless the job sets its own
+        :param job_ttl: seconds a finished job can still be queried, None to keep all jobs
+        """
+        self.queue = Queue(maxsize=queue_size)
+        self.cache = cache if cache is not None else ResultCache()
+        self.defaults = defaults or {}
+        self.timeout = timeout
+        self.job_ttl = job_ttl
+        self.jobs = {}
+        self.lock = Lock()
+        self.workers = [Thread(target=self.work, daemon=True) for _ in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, rows: list[list], options: dict | None = None, timeout: float | None = None) -> dict:
+        """
+        Queue a search, or answer it from the cache.
+
+        :param rows: rows of the uncleaned assignment matrix
+        :param options: options of the search on top of the default options
+        :param timeout: seconds after which the search stops
+        :return: view of the job
+        :raises queue.Full: if the queue is full
+        :raises ValueError: if an option is unknown
+        """
+        options = {**self.defaults, **(options or {})}
+        check_options(options)
+        for key in ('binary_operators', 'unary_operators'):
+            if key in options:
+                options[key] = [name if isinstance(name, str) else name.__name__ for name in options[key]]
+        timeout = timeout if timeout is not None else self.timeout
+        packed = PackedAssignment.from_rows(rows)
+        job = {'id': uuid4().hex, 'status': 'queued', 'cached': False, 'result': None, 'error': None,
+               'packed': packed, 'options': options, 'timeout': timeout, 'solver': None, 'done': Event(),
+               'finished': None, 'key': ResultCache.key(packed, options, timeout)}
+        result = self.cache.get(job['key'])
+        if result is not None:
+            job.update(status='done', cached=True, result=result)
+            self.finish(job)
+        self.prune()
+        with self.lock:
+            self.jobs[job['id']] = job
+        if result is None:
+            try:
+                self.queue.put_nowait(job)
+            except Full:
+                with self.lock:
+                    del self.jobs[job['id']]
+                raise
+        return self.view(job)
+
+    def work(self) -> None:
+        """ Run the queued jobs until a None job is received. """
+        while True:
+            job = self.queue.get()
+            if job is None:
+                return
+            with self.lock:
+                if job['status'] == 'cancelled':
+                    continue
+                job['status'] = 'running'
+            try:
+                start = perf_counter()
+                solver, termination, niterations = build_solver(job['packed'], job['options'], job['timeout'])
+                with self.lock:
+                    job['solver'] = solver
+                    if job['status'] == 'cancelled':
+                        solver.cancel()
+                expression = solver.run(niterations, termination)
+                result = {'expression': str(expression),
+                          'score': expression.score(solver.packed),
+                          'generations': solver.generation,
+                          'stop_reason': termination.reason,
+                          'elapsed': perf_counter() - start}
+                # a job cancelled after its search returned stays cancelled and is not cached
+                with self.lock:
+                    job['result'] = result
+                    done = termination.reason != 'cancelled' and job['status'] != 'cancelled'
+                    if done:
+                        job['status'] = 'done'
+                if done:
+                    self.cache.put(job['key'], result)
+            except Exception as error:
+                with self.lock:
+                    job.update(status='error', error=repr(error))
+            if job['solver'] is not None:
+                job['solver'].close()
+            job['solver'] = None
+            self.finish(job)
+
+    @staticmethod
+    def finish(job: dict) -> None:
+        """
+        Mark a job as finished and wake up the clients waiting for it.
+
+        :param job: job of the service
+        """
+        job['finished'] = perf_counter()
+        job['done'].set()
+
+    def prune(self) -> None:
+        """ Forget the jobs finished more than job_ttl seconds ago. """
+        if self.job_ttl is None:
+            return
+        now = perf_counter()
+        with self.lock:
+            expired = [job_id for job_id, job in self.jobs.items()
+                       if job['finished'] is not None and now - job['finished'] > self.job_ttl]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+    def status(self, job_id: str, wait: float = 0.0) -> dict | None:
+        """
+        Return the view of a job.
+
+        :param job_id: id of the job
+        :param wait: seconds to wait for the job to finish
+        :return: view of the job, None if the job is unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        if wait > 0:
+            job['done'].wait(wait)
+        return self.view(job)
+
+    def cancel(self, job_id: str) -> dict | None:
+        """
+        Cancel a job. A queued job is not started, a running search stops after the current generation.
+
+        :param job_id: id of the job
+        :return: view of the job, None if the job is unknown
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        with self.lock:
+            if job['status'] in ('queued', 'running'):
+                if job['status'] == 'queued':
+                    self.finish(job)
+                job['status'] = 'cancelled'
+                solver = job['solver']
+                if solver is not None:
+                    solver.cancel()
+        return self.view(job)
+
+    @staticmethod
+    def view(job: dict) -> dict:
+        """
+        :param job: job of the service
+        :return: the fields of the job that are sent to clients
+        """
+        return {key: job[key] for key in ('id', 'status', 'cached', 'result', 'error')}
+
+    def close(self) -> None:
+        """ Stop the workers after the running jobs and close the cache. """
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.cache.close()
+
+
+def make_handler(service: SolverService) -> type[BaseHTTPRequestHandler]:
+    """
+    Create the HTTP request handler of a service.
+
+    :param service: service handling the jobs
+    :return: request handler class
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def send_json(self, code: int, body: dict) -> None:
+            data = dumps(body).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def job_id(self) -> str | None:
+            parts = urlparse(self.path).path.strip('/').split('/')
+            return parts[1] if len(parts) == 2 and parts[0] == 'jobs' else None
+
+        def do_POST(self) -> None:
+            if urlparse(self.path).path.rstrip('/') != '/jobs':
+                return self.send_json(404, {'error': 'not found'})
+            try:
+                request = loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                job = service.submit(request['rows'], request.get('options'), request.get('timeout'))
+            except Full:
+                return self.send_json(503, {'error': 'queue full'})
+            except (ValueError, KeyError, TypeError) as error:
+                return self.send_json(400, {'error': repr(error)})
+            self.send_json(200 if job['status'] == 'done' else 202, job)
+
+        def do_GET(self) -> None:
+            try:
+                wait = float(parse_qs(urlparse(self.path).query).get('wait', ['0'])[0])
+                if not isfinite(wait):
+                    raise ValueError(f'wait must be a finite number of seconds, got {wait}')
+                wait = min(wait, MAX_WAIT)
+            except ValueError as error:
+                return self.send_json(400, {'error': repr(error)})
+            job = service.status(self.job_id(), wait) if self.job_id() else None
+            if job is None:
+                return self.send_json(404, {'error': 'not found'})
+            self.send_json(200, job)
+
+        def do_DELETE(self) -> None:
+            job = service.cancel(self.job_id()) if self.job_id() else None
+            if job is None:
+                return self.send_json(404, {'error': 'not found'})
+            self.send_json(200, job)
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    return Handler
+
+
+def serve(service: SolverService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server of a service. Call serve_forever on it to handle requests.
+
+    :param service: service handling the jobs
+    :param host: address to listen on
+    :param port: port to listen on, 0 for any free port
+    :return: HTTP server
+    """
+    return ThreadingHTTPServer((host, port), make_handler(service))
@@ -0,0 +1,532 @@
+from asyncio import sleep, CancelledError
+from os import replace
+from pickle import dump, load
+from random import Random
+from typing import Iterator, AsyncIterator, TYPE_CHECKING
+from sr_fol.Expression import Expression, Not, Or, And, OPERATORS
+from sr_fol.Population import Population
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Termination import Termination
+from sr_fol.Serialization import dump_population, load_population
+from sr_fol.Telemetry import Telemetry, NullTelemetry
+from sr_fol.Profiling import Profiler, NullProfiler
+from sr_fol.Scheduler import IslandScheduler
+from sr_fol.Memo import SubtreeMemo
+from sr_fol.Library import SubtreeTruths
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from sr_fol.Scoring import ThreadScorer
+
+
+class Solver:
+    """
+    The Solver class keeps the populations of the genetic algorithm together with the packed assignments,
+    so the evolution can be continued generation by generation and after new assignments were added.
+    """
+
+    def __init__(self,
+                 input_df: 'DataFrame | list[list] | PackedAssignment',
+                 populations: int = 31,
+                 population_size: int = 27,
+                 maxdepth: int = 10,
+                 binary_operators: tuple[type[Expression], ...] = (Or, And),
+                 unary_operators: tuple[type[Expression], ...] = (Not,),
+                 local_search: int = 0,
+                 semantic_crossover: bool = False,
+                 nary: bool = False,
+                 maxsize: int | None = None,
+                 parsimony: str | None = None,
+                 selection: str = 'truncation',
+                 initialization: str = 'grow',
+                 seeds: list[Expression] | None = None,
+                 threads: int = 1,
+                 adaptive: bool = False,
+                 memo: bool | SubtreeMemo = False,
+                 truths: SubtreeTruths | None = None,
+                 telemetry: Telemetry | None = None,
+                 seed: int | None = None,
+                 profiler: Profiler | None = None,
+                 verbose: bool = False) -> None:
+        """
+        Clean and pack the input and initialize the populations with random expressions. Every population
+        draws from its own random number generator, seeded from the generator of the solver.
+
+        :param input_df: uncleaned DataFrame or rows of variable assignments and associated evaluations, or the
+                         packed assignments of a target from PackedAssignment.from_targets
+        :param populations: number of populations used in the genetic algorithm
+        :param population_size: number of individual expressions per population
+        :param maxdepth: maximum depth of the expressions in the populations
+        :param binary_operators: only use these binary operators
+        :param unary_operators: only use these unary operators
+        :param local_search: number of best expressions per population refined by hill climbing each generation
+        :param semantic_crossover: splice library subtrees that fit the depth budget and correct the most assignments
+        :param nary: count chains of the same associative operator, e.g. (a and b) and c, as single n-ary nodes
+                     against maxdepth, so long conjunctions and disjunctions fit the depth budget
+        :param maxsize: maximum number of nodes of the expressions in the populations, by default unlimited
+        :param parsimony: rank equally scored expressions by size when culling, 'lexicographic' or 'pareto'
+        :param selection: selection of the survivors when culling, 'truncation', 'tournament' or 'lexicase'
+        :param initialization: shape of the random expressions the populations start with, 'grow', 'full' or
+                               'ramped' for ramped half-and-half
+        :param seeds: expressions every population starts with before the random ones, e.g. from an ExpressionArchive
+        :param threads: number of threads scoring the expressions in chunks of the assignments, see ThreadScorer
+        :param adaptive: allocate the steps of every generation to the populations by their progress and restart
+                         stagnated populations, see IslandScheduler
+        :param memo: evaluate every distinct subtree of the expressions scored in a generation once for all
+                     populations, see SubtreeMemo; the scorer of threads evaluates whole expressions. A SubtreeMemo
+                     is used instead of a new one, e.g. to share it with the solvers of other targets
+        :param truths: truth vectors of the subtrees indexed for semantic crossover, e.g. shared with the solvers of
+                       other targets, by default a new one if semantic_crossover is set
+        :param telemetry: receiver of timers and counters per generation
+        :param seed: seed of the random number generator to reproduce a search, by default a random seed
+        :param profiler: capture CPU profiles and allocation snapshots of a window of generations
+        :param verbose: output more info to sdtout
+        """
+        if isinstance(input_df, PackedAssignment):
+            self.packed = input_df
+        else:
+            self.packed = PackedAssignment.from_rows(input_df)
+            if verbose:
+                print('Input cleaned')
+        self.v_n = len(self.packed.variables)
+        self.maxdepth = maxdepth
+        self.binary_operators = binary_operators
+        self.unary_operators = unary_operators
+        self.local_search = local_search
+        self.semantic_crossover = semantic_crossover
+        self.nary = nary
+        self.maxsize = maxsize
+        self.parsimony = parsimony
+        self.selection = selection
+        self.initialization = initialization
+        self.verbose = verbose
+        self.threads = threads
+        self.scorer = self.thread_scorer(threads)
+        self.memo = memo if isinstance(memo, SubtreeMemo) else SubtreeMemo() if memo else None
+        self.truths = truths if truths is not None else SubtreeTruths() if semantic_crossover else None
+        self.rng = Random(seed)
+        self.pops = [Population(population_size, self.v_n, maxdepth, binary_operators, unary_operators,
+                                Random(self.rng.getrandbits(64)), nary, maxsize, parsimony, seeds, self.scorer,
+                                initialization, selection, self.memo, self.truths)
+                     for _ in range(populations)]
+        self.generation = 0
+        self.best_per_generation = []
+        self.termination = None
+        self.stop_reason = None
+        self.cancelled = False
+        self.best_of_generation = (Expression(), 0.0)
+        self.front = None
+        self.scheduler = IslandScheduler(populations) if adaptive else None
+        self.telemetry = telemetry if telemetry is not None else NullTelemetry()
+        self.telemetry.attach(self.pops)
+        self.profiler = profiler if profiler is not None else NullProfiler()
+
+    @staticmethod
+    def thread_scorer(threads: int) -> 'ThreadScorer | None':
+        """
+        :param threads: number of threads scoring the expressions
+        :return: scorer shared by the populations, None for a single thread
+        """
+        if threads < 2:
+            return None
+        from sr_fol.Scoring import ThreadScorer  # NumPy is only imported when threads are used
+        return ThreadScorer(threads)
+
+    def add_assignments(self, input_df: 'DataFrame | list[list]') -> int:
+        """
+        Append new assignments, given as an uncleaned DataFrame or rows with the same variables. Assignments already
+        known are left out and the cached fitness of the expressions is updated only for the new assignments.
+
+        :param input_df: uncleaned DataFrame or rows of variable assignments and associated evaluations
+        :return: number of appended assignments
+        """
+        self.front = None
+        return self.packed.extend(PackedAssignment.rows(input_df))
+
+    def add_expressions(self, expressions: list[Expression]) -> None:
+        """
+        Add copies of expressions, e.g. the solutions of a related target, to every population if they are
+        within maxdepth and maxsize and use only the operators of the solver. They take part in the next culling
+        like any other expression.
+
+        :param expressions: expressions to add
+        """
+        self.front = None
+        for pop in self.pops:
+            for expression in expressions:
+                if pop.fits(expression) and pop.allows(expression) and expression not in pop:
+                    pop.expressions.append(expression.copy())
+
+    def options(self) -> dict:
+        """
+        Return the options the solver was built with, e.g. to check that a restored checkpoint matches a new search.
+
+        :return: options of the constructor except the input, seeds, seed, telemetry, profiler and verbose,
+                 operators by name
+        """
+        return {'populations': len(self.pops),
+                'population_size': self.pops[0].population_size if self.pops else 0,
+                'maxdepth': self.maxdepth,
+                'binary_operators': [node_class.__name__ for node_class in self.binary_operators],
+                'unary_operators': [node_class.__name__ for node_class in self.unary_operators],
+                'local_search': self.local_search,
+                'semantic_crossover': self.semantic_crossover,
+                'nary': self.nary,
+                'maxsize': self.maxsize,
+                'parsimony': self.parsimony,
+                'selection': self.selection,
+                'initialization': self.initialization,
+                'threads': self.threads,
+                'adaptive': self.scheduler is not None,
+                'memo': self.memo is not None}
+
+    def evaluations(self) -> int:
+        """
+        Return the number of fitness evaluations of all populations.
+
+        :return: amount of evaluations
+        """
+        return sum(pop.evaluations for pop in self.pops)
+
+    def evolve(self, pops: list[Population]) -> None:
+        """
+        Run one step of culling, crossover, mutation and local search on some of the populations.
+
+        :param pops: populations to change
+        """
+        # remove the worst expressions in the population
+        for pop in pops:
+            with self.telemetry.phase('cull'):
+                pop.cull(self.packed)
+            if self.semantic_crossover:
+                with self.telemetry.phase('index'):
+                    pop.index(self.packed)
+
+        # crossover half the populations back up to population_size
+        with self.telemetry.phase('crossover'):
+            for crossover in range(len(pops)//2):
+                host, guest = self.rng.sample(pops, k=2)
+                if self.semantic_crossover:
+                    host.semantic_crossover(guest_population=guest, assignment_matrix=self.packed)
+                else:
+                    host.crossover(guest_population=guest)
+
+        # mutate the remaining populations back up to population_size
+        for pop in pops:
+            with self.telemetry.phase('mutation'):
+                pop.mutation()
+            with self.telemetry.phase('local_search'):
+                pop.local_search(self.packed, n_best=self.local_search)
+
+    def step(self) -> float:
+        """
+        Run one generation of culling, crossover, mutation and local search on all populations, or with the
+        scheduler of an adaptive solver as many steps per population as it allocates.
+
+        :return: best score of the generation
+        """
+        if self.verbose:
+            print(f'{self.generation + 1}. Generation')
+        self.profiler.start_generation(self.generation + 1)
+        best_per_population = []
+        front = []
+        if self.memo is not None:
+            self.memo.clear()
+        if self.truths is not None:
+            self.truths.age()
+
+        if self.scheduler is None:
+            self.evolve(self.pops)
+        else:
+            steps = self.scheduler.allocate()
+            for round_ in range(max(steps)):
+                self.evolve([pop for pop, pop_steps in zip(self.pops, steps) if pop_steps > round_])
+
+        if self.memo is not None and self.scorer is None:
+            self.memo.plan([expression for pop in self.pops for expression in pop.expressions
+                            if not pop.is_cached(expression, self.packed)], self.packed)
+
+        for pop in self.pops:
+            with self.telemetry.phase('scores'):
+                scores = pop.scores(self.packed)
+            best_per_population.append(scores[-1][1])
+            front = Population.pareto_front(front + scores)
+            if scores[-1][1] > self.best_of_generation[1] or len(best_per_population) == 1:
+                self.best_of_generation = scores[-1]
+        self.front = front
+        fields = {}
+        if self.scheduler is not None:
+            for island in self.scheduler.update(best_per_population):
+                self.restart(island)
+            fields = self.scheduler.report()
+        if self.memo is not None:
+            fields['memo'] = self.memo.stats()
+        if self.verbose:
+            print('Best Score of Generation: ', round(max(best_per_population), 2))
+        self.generation += 1
+        self.telemetry.record(self.generation, max(best_per_population), self.pops, **fields)
+        self.profiler.end_generation(self.generation)
+        return max(best_per_population)
+
+    def restart(self, island: int) -> None:
+        """
+        Replace a stagnated population with new random expressions, seeded with the Pareto front of all populations.
+
+        :param island: position of the population
+        """
+        old = self.pops[island]
+        self.pops[island] = Population(old.population_size, self.v_n, self.maxdepth, self.binary_operators,
+                                       self.unary_operators, Random(self.rng.getrandbits(64)), self.nary, self.maxsize,
+                                       self.parsimony, [expression for expression, _ in self.front or []], self.scorer,
+                                       self.initialization, self.selection, self.memo, self.truths)
+        self.pops[island].evaluations = old.evaluations
+        self.telemetry.attach([self.pops[island]])
+        self.scheduler.restart(island)
+
+    def generations(self,
+                    niterations: int = 100,
+                    termination: Termination | None = None,
+                    resume: bool = False,
+                    checkpoint_path: str | None = None,
+                    checkpoint_every: int = 10) -> Iterator[tuple[Expression, dict]]:
+        """
+        Continue the evolution for up to niterations generations and yield the best expression of every
+        generation with its statistics. The evolution stops after the current generation when cancel is called
+        or the generator is closed. If cancel was called before, the evolution stops before the first generation.
+
+        :param niterations: number of generations of mutation and crossover
+        :param termination: criteria to stop before niterations, by default when a perfect score is reached or the
+                            best score stagnates for 10 generations; the reason for stopping is set on this object
+        :param resume: continue the interrupted run of a restored checkpoint instead of starting a new run
+        :param checkpoint_path: file to save a checkpoint of the solver to during the run
+        :param checkpoint_every: number of generations between checkpoints
+        :return: best expression of the generation and generation, best_score, evaluations and elapsed seconds
+        """
+        if not resume:
+            self.best_per_generation = []
+        self.termination = termination if termination is not None else Termination()
+        self.termination.start()
+        for gen in range(len(self.best_per_generation), niterations):
+            if self.cancelled:
+                self.termination.reason = 'cancelled'
+                break
+            self.best_per_generation.append(self.step())
+            if checkpoint_path is not None and (gen + 1) % checkpoint_every == 0:
+                self.checkpoint(checkpoint_path)
+
+            # stop if the target score, a budget or the stagnation limit is reached
+            stop = self.termination.check(self.best_per_generation, self.evaluations())
+            try:
+                yield self.best_of_generation[0], {'generation': self.generation,
+                                                   'best_score': self.best_per_generation[-1],
+                                                   'evaluations': self.evaluations(),
+                                                   'elapsed': self.termination.elapsed()}
+            except GeneratorExit:
+                self.termination.reason = self.termination.reason or 'cancelled'
+                self.cancelled = False
+                self.profiler.finish()
+                raise
+            if stop:
+                break
+        else:
+            self.termination.reason = 'niterations'
+        self.cancelled = False
+        self.stop_reason = self.termination.reason
+        if checkpoint_path is not None:
+            self.checkpoint(checkpoint_path)
+        self.profiler.finish()
+        if self.verbose:
+            print('Stopped by: ', self.termination.reason)
+
+    async def agenerations(self,
+                           niterations: int = 100,
+                           termination: Termination | None = None,
+                           resume: bool = False,
+                           checkpoint_path: str | None = None,
+                           checkpoint_every: int = 10) -> AsyncIterator[tuple[Expression, dict]]:
+        """
+        Asynchronous variant of generations that hands control back to the event loop after every generation,
+        so the search can be interleaved with other work and cancelled like any other task.
+
+        :param niterations: number of generations of mutation and crossover
+        :param termination: criteria to stop before niterations, by default when a perfect score is reached or the
+                            best score stagnates for 10 generations; the reason for stopping is set on this object
+        :param resume: continue the interrupted run of a restored checkpoint instead of starting a new run
+        :param checkpoint_path: file to save a checkpoint of the solver to during the run
+        :param checkpoint_every: number of generations between checkpoints
+        :return: best expression of the generation and generation, best_score, evaluations and elapsed seconds
+        """
+        generations = self.generations(niterations, termination, resume, checkpoint_path, checkpoint_every)
+        try:
+            for best_of_generation in generations:
+                yield best_of_generation
+                await sleep(0)
+        except CancelledError:
+            self.termination.reason = 'cancelled'
+            raise
+        finally:
+            generations.close()
+
+    def close(self) -> None:
+        """ Stop the threads of the scorer, if the solver has one. The solver can still be used afterwards. """
+        if self.scorer is not None:
+            self.scorer.close()
+
+    def cancel(self) -> None:
+        """ Stop the running evolution after the current generation, or the next one before it starts. """
+        self.cancelled = True
+
+    def run(self,
+            niterations: int = 100,
+            termination: Termination | None = None,
+            resume: bool = False,
+            checkpoint_path: str | None = None,
+            checkpoint_every: int = 10) -> Expression:
+        """
+        Continue the evolution for up to niterations generations.
+
+        :param niterations: number of generations of mutation and crossover
+        :param termination: criteria to stop before niterations, by default when a perfect score is reached or the
+                            best score stagnates for 10 generations; the reason for stopping is set on this object
+        :param resume: continue the interrupted run of a restored checkpoint instead of starting a new run
+        :param checkpoint_path: file to save a checkpoint of the solver to during the run
+        :param checkpoint_every: number of generations between checkpoints
+        :return: best performing expression
+        """
+        for _ in self.generations(niterations, termination, resume, checkpoint_path, checkpoint_every):
+            pass
+        return self.best()
+
+    async def arun(self,
+                   niterations: int = 100,
+                   termination: Termination | None = None,
+                   resume: bool = False,
+                   checkpoint_path: str | None = None,
+                   checkpoint_every: int = 10) -> Expression:
+        """
+        Asynchronous variant of run that hands control back to the event loop after every generation.
+
+        :param niterations: number of generations of mutation and crossover
+        :param termination: criteria to stop before niterations, by default when a perfect score is reached or the
+                            best score stagnates for 10 generations; the reason for stopping is set on this object
+        :param resume: continue the interrupted run of a restored checkpoint instead of starting a new run
+        :param checkpoint_path: file to save a checkpoint of the solver to during the run
+        :param checkpoint_every: number of generations between checkpoints
+        :return: best performing expression
+        """
+        async for _ in self.agenerations(niterations, termination, resume, checkpoint_path, checkpoint_every):
+            pass
+        return self.best()
+
+    def best(self) -> Expression:
+        """
+        Retrieve the best expression from the current populations. When multiple expressions show
+        the best performance return the shorter. The candidates are the Pareto front of score and size kept
+        by the last generation, the populations are only scored again if they changed since.
+
+        :return: best performing expression
+        """
+        if self.front is None:
+            front = []
+            for pop in self.pops:
+                with self.telemetry.phase('best'):
+                    front = Population.pareto_front(front + pop.scores(self.packed))
+            self.front = front
+        best_expr_score_size = (Expression(), 0.0, 0)
+        for score in self.front:
+            if round(score[1], 2) > best_expr_score_size[1]:
+                best_expr_score_size = (score[0], round(score[1], 2), score[0].size())
+            elif round(score[1], 2) == best_expr_score_size[1] and score[0].size() < best_expr_score_size[2]:
+                best_expr_score_size = (score[0], round(score[1], 2), score[0].size())
+        if self.verbose:
+            print('Best Expression: ', best_expr_score_size[0])
+        return best_expr_score_size[0]
+
+    def checkpoint(self, path: str) -> None:
+        """
+        Save the populations, the packed assignments, the settings, the generation counters and the state of the
+        random number generators, so the search can be resumed exactly where it left off. The file is replaced
+        atomically, an interrupted write leaves the previous checkpoint intact.
+
+        :param path: file to save the checkpoint to
+        """
+        state = {'packed': (self.packed.variables, self.packed.e, self.packed.a_n, self.packed.evaluated),
+                 'maxdepth': self.maxdepth,
+                 'binary_operators': [node_class.__name__ for node_class in self.binary_operators],
+                 'unary_operators': [node_class.__name__ for node_class in self.unary_operators],
+                 'local_search': self.local_search,
+                 'semantic_crossover': self.semantic_crossover,
+                 'nary': self.nary,
+                 'maxsize': self.maxsize,
+                 'parsimony': self.parsimony,
+                 'selection': self.selection,
+                 'threads': self.threads,
+                 'memo': self.memo is not None,
+                 'initialization': self.initialization,
+                 'scheduler': vars(self.scheduler) if self.scheduler is not None else None,
+                 'pops': [dump_population(pop) for pop in self.pops],
+                 'generation': self.generation,
+                 'stop_reason': self.stop_reason,
+                 'best_per_generation': self.best_per_generation,
+                 'random_state': self.rng.getstate()}
+        with open(path + '.tmp', 'wb') as checkpoint_file:
+            dump(state, checkpoint_file)
+        replace(path + '.tmp', path)
+
+    @classmethod
+    def resume(cls,
+               path: str,
+               telemetry: Telemetry | None = None,
+               profiler: Profiler | None = None,
+               verbose: bool = False) -> 'Solver':
+        """
+        Restore a solver from a checkpoint. Continue the interrupted run with run(..., resume=True).
+
+        :param path: file the checkpoint was saved to
+        :param telemetry: receiver of timers and counters per generation
+        :param profiler: capture CPU profiles and allocation snapshots of a window of generations
+        :param verbose: output more info to sdtout
+        :return: restored solver
+        """
+        with open(path, 'rb') as checkpoint_file:
+            state = load(checkpoint_file)
+        solver = cls.__new__(cls)
+        solver.packed = PackedAssignment(*state['packed'])
+        solver.v_n = len(solver.packed.variables)
+        solver.maxdepth = state['maxdepth']
+        solver.binary_operators = tuple(OPERATORS[name] for name in state['binary_operators'])
+        solver.unary_operators = tuple(OPERATORS[name] for name in state['unary_operators'])
+        solver.local_search = state['local_search']
+        solver.semantic_crossover = state['semantic_crossover']
+        solver.nary = state.get('nary', False)
+        solver.maxsize = state.get('maxsize')
+        solver.parsimony = state.get('parsimony')
+        solver.selection = state.get('selection', 'truncation')
+        solver.initialization = state.get('initialization', 'grow')
+        solver.front = None
+        solver.scheduler = None
+        if state.get('scheduler') is not None:
+            solver.scheduler = IslandScheduler(len(state['pops']))
+            vars(solver.scheduler).update(state['scheduler'])
+        solver.verbose = verbose
+        solver.threads = state.get('threads', 1)
+        solver.scorer = cls.thread_scorer(solver.threads)
+        solver.memo = SubtreeMemo() if state.get('memo', False) else None
+        solver.truths = SubtreeTruths() if solver.semantic_crossover else None
+        solver.pops = [load_population(pop) for pop in state['pops']]
+        for pop in solver.pops:
+            pop.scorer = solver.scorer
+            pop.memo = solver.memo
+            pop.library.truths = solver.truths
+        solver.generation = state['generation']
+        solver.stop_reason = state.get('stop_reason')
+        solver.best_per_generation = state['best_per_generation']
+        solver.termination = None
+        solver.cancelled = False
+        solver.best_of_generation = (Expression(), 0.0)
+        solver.telemetry = telemetry if telemetry is not None else NullTelemetry()
+        solver.telemetry.attach(solver.pops)
+        solver.profiler = profiler if profiler is not None else NullProfiler()
+        solver.rng = Random()
+        solver.rng.setstate(state['random_state'])
+        return solver
@@ -0,0 +1,129 @@
+from collections import Counter
+from contextlib import nullcontext
+from json import dumps
+from time import perf_counter
+from typing import Callable
+
+
+class MemorySink:
+    """ Sink that keeps all telemetry records in the list records. """
+
+    def __init__(self) -> None:
+        self.records = []
+
+    def __call__(self, record: dict) -> None:
+        self.records.append(record)
+
+
+class JsonLinesSink:
+    """ Sink that appends every telemetry record as a line of JSON to a file. """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: file to append the records to
+        """
+        self.file = open(path, 'a')
+
+    def __call__(self, record: dict) -> None:
+        self.file.write(dumps(record) + '\n')
+        self.file.flush()
+
+    def close(self) -> None:
+        """ Close the file. """
+        self.file.close()
+
+
+class PhaseTimer:
+    """ Context manager adding the time spent inside it to a phase of a Telemetry. """
+
+    def __init__(self, phases: dict[str, float], name: str) -> None:
+        self.phases = phases
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        self.start = perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self.phases[self.name] = self.phases.get(self.name, 0.0) + perf_counter() - self.start
+
+
+class Telemetry:
+    """
+    The Telemetry class times the phases of every generation of the genetic algorithm and collects the counters
+    of the populations. After each generation one record is passed to the sink, which can be any callable
+    taking a dictionary, e.g. a MemorySink, a JsonLinesSink or print.
+    """
+
+    enabled = True
+
+    def __init__(self, sink: Callable[[dict], None]) -> None:
+        """
+        :param sink: receiver of the records
+        """
+        self.sink = sink
+        self.phases = {}
+        self.start = perf_counter()
+
+    def phase(self, name: str) -> PhaseTimer:
+        """
+        Return a context manager that adds the time spent inside it to the phase name of the current generation.
+
+        :param name: name of the phase
+        :return: context manager
+        """
+        return PhaseTimer(self.phases, name)
+
+    def attach(self, populations: list) -> None:
+        """
+        Enable the counters of the populations.
+
+        :param populations: populations to collect the counters of
+        """
+        for population in populations:
+            if population.counters is None:
+                population.counters = Counter()
+
+    def record(self, generation: int, best_score: float, populations: list, **fields) -> None:
+        """
+        Pass the record of a generation to the sink and reset the timers and counters.
+
+        :param generation: number of the generation
+        :param best_score: best score of the generation
+        :param populations: populations to collect the counters of
+        :param fields: additional values of the record
+        """
+        now = perf_counter()
+        counters = Counter()
+        for population in populations:
+            counters.update(population.counters or {})
+            population.counters = Counter()
+        duration = now - self.start
+        self.sink({'generation': generation,
+                   'best_score': best_score,
+                   'duration': duration,
+                   'evaluations_per_second': counters['evaluations'] / duration if duration > 0 else 0.0,
+                   'phases': self.phases,
+                   'counters': dict(counters),
+                   **fields})
+        self.phases = {}
+        self.start = perf_counter()
+
+
+class NullTelemetry(Telemetry):
+    """ Telemetry that records nothing, used when telemetry is disabled. """
+
+    enabled = False
+
+    def __init__(self) -> None:
+        super().__init__(sink=lambda record: None)
+        self.null_timer = nullcontext()
+
+    def phase(self, name: str) -> nullcontext:
+        return self.null_timer
+
+    def attach(self, populations: list) -> None:
+        pass
+
+    def record(self, generation: int, best_score: float, populations: list, **fields) -> None:
+        pass
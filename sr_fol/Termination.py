@@ -0,0 +1,70 @@
+from time import perf_counter
+
+
+class Termination:
+    """
+    The Termination class decides after every generation whether the genetic algorithm stops. The search ends
+    as soon as the best score reaches target_score, the next generation would overrun time_limit or
+    max_evaluations, or the rounded best score did not change for stagnation generations.
+    The criterion that ended the search is kept in reason.
+    """
+
+    def __init__(self,
+                 target_score: float | None = 1.0,
+                 time_limit: float | None = None,
+                 max_evaluations: int | None = None,
+                 stagnation: int | None = 10) -> None:
+        """
+        :param target_score: stop when the best score is at least this high
+        :param time_limit: wall-clock budget of the search in seconds
+        :param max_evaluations: budget of fitness evaluations of the search
+        :param stagnation: stop when the best score did not change for this many generations
+        """
+        self.target_score = target_score
+        self.time_limit = time_limit
+        self.max_evaluations = max_evaluations
+        self.stagnation = stagnation
+        self.reason = None
+        self.start_time = 0.0
+        self.generation_time = 0.0
+        self.generation_evaluations = 0
+
+    def start(self) -> None:
+        """ Reset the clock and the reason at the beginning of a search. """
+        self.reason = None
+        self.start_time = self.generation_time = perf_counter()
+        self.generation_evaluations = 0
+
+    def elapsed(self) -> float:
+        """
+        Return the seconds since the start of the search.
+
+        :return: elapsed wall-clock time
+        """
+        return perf_counter() - self.start_time
+
+    def check(self, best_per_generation: list[float], evaluations: int) -> bool:
+        """
+        Decide at the end of a generation whether the search stops and record the reason.
+        Time and evaluation budgets are checked against the cost of the last generation,
+        so the next generation is not started if it would overrun them.
+
+        :param best_per_generation: best score of every generation so far
+        :param evaluations: number of fitness evaluations so far
+        :return: True if the search stops
+        """
+        now = perf_counter()
+        generation_duration, self.generation_time = now - self.generation_time, now
+        generation_evaluations = evaluations - self.generation_evaluations
+        self.generation_evaluations = evaluations
+
+        if self.target_score is not None and best_per_generation and best_per_generation[-1] >= self.target_score:
+            self.reason = 'target_score'
+        elif self.time_limit is not None and now - self.start_time + generation_duration > self.time_limit:
+            self.reason = 'time_limit'
+        elif self.max_evaluations is not None and evaluations + generation_evaluations > self.max_evaluations:
+            self.reason = 'max_evaluations'
+        elif self.stagnation and len(best_per_generation) > self.stagnation and \
+                all(round(i, 2) == round(best_per_generation[-1], 2) for i in best_per_generation[-self.stagnation:]):
+            self.reason = 'stagnation'
+        return self.reason is not None
@@ -1 +1,3 @@
-from sr_fol.__main__ import best_expression
+from sr_fol.__main__ import best_expression, best_expressions
+from sr_fol.Termination import Termination
+from sr_fol.Solver import Solver
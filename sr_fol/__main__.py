@@ -2,103 +2,414 @@
 For a matrix of variable assignments (a_1, ..., a_n) and associated evaluations (e_1, ..., e_n) find a
 first-order-logic expression that validates the most pairs (a_1, e_1), ..., (a_n, e_n).
 """
-from typing import List, Type, Any
-from pandas import DataFrame
-from random import sample
+from typing import List, Type, Any, TYPE_CHECKING
 from argparse import ArgumentParser
 from pickle import load
-from sr_fol.Expression import Expression, Not, Or, And, Nand, Xor, Implies, Converse
-from sr_fol.Population import Population
-from sr_fol.Assignment import Assignment
+from json import dumps
+from os.path import exists
+from sr_fol.Expression import Expression, Not, Or, And, OPERATORS
+from sr_fol.Solver import Solver
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Memo import SubtreeMemo
+from sr_fol.Library import SubtreeTruths
+from sr_fol.Termination import Termination
+from sr_fol.Telemetry import Telemetry, JsonLinesSink
+from sr_fol.Profiling import Profiler
 
+if TYPE_CHECKING:
+    from pandas import DataFrame
 
-def best_expression(input_df: DataFrame,
+# stop reasons of a finished search, a checkpoint of it is not run again
+FINISHED = ('target_score', 'stagnation', 'max_evaluations')
+
+
+def best_expression(input_df: 'DataFrame | list[list]',
                     populations: int = 31,
                     population_size: int = 27,
                     maxdepth: int = 10,
                     niterations: int = 100,
                     binary_operators: tuple[Type[Expression], ...] = (Or, And),
                     unary_operators: tuple[Type[Expression], ...] = (Not,),
+                    local_search: int = 0,
+                    semantic_crossover: bool = False,
+                    nary: bool = False,
+                    maxsize: int | None = None,
+                    parsimony: str | None = None,
+                    selection: str = 'truncation',
+                    initialization: str = 'grow',
+                    threads: int = 1,
+                    adaptive: bool = False,
+                    memo: bool = False,
+                    termination: Termination | None = None,
+                    checkpoint_path: str | None = None,
+                    checkpoint_every: int = 10,
+                    archive_path: str | None = None,
+                    portfolio: tuple[str | dict, ...] | None = None,
+                    telemetry: Telemetry | None = None,
+                    seed: int | None = None,
+                    profiler: Profiler | None = None,
                     verbose: bool = False) -> Expression:
     """
     Find a first-order-logic expression that evaluates the most variable assignments to their evaluations
     given in the assignment_matrix. When multiple expressions show the best performance return the shorter.
 
-    :param input_df: uncleaned DataFrame of variable assignments and associated evaluations
+    :param input_df: uncleaned DataFrame or rows of variable assignments and associated evaluations
     :param populations: number of populations used in the genetic algorithm
     :param population_size: number of individual expressions per population
     :param maxdepth: maximum depth of the expressions in the populations
     :param niterations: number of generations of mutation and crossover
     :param binary_operators: only use these binary operators
     :param unary_operators: only use these unary operators
+    :param local_search: number of best expressions per population refined by hill climbing each generation
+    :param semantic_crossover: splice library subtrees that fit the depth budget and correct the most assignments
+    :param nary: count chains of the same associative operator as single n-ary nodes against maxdepth
+    :param maxsize: maximum number of nodes of the expressions in the populations, by default unlimited
+    :param parsimony: rank equally scored expressions by size when culling, 'lexicographic' or 'pareto'
+    :param selection: selection of the survivors when culling, 'truncation', 'tournament' or 'lexicase'
+    :param initialization: shape of the random expressions the populations start with, 'grow', 'full' or 'ramped'
+    :param threads: number of threads scoring the expressions in chunks of the assignments, worthwhile for inputs
+                    with many assignments as NumPy evaluates the chunks without holding the interpreter lock
+    :param adaptive: allocate the steps of every generation to the populations by their progress rate and restart
+                     stagnated populations from the best expressions of all populations
+    :param memo: evaluate every distinct subtree of the expressions scored in a generation once for all populations
+    :param termination: criteria to stop before niterations, by default when a perfect score is reached or the
+                        best score stagnates for 10 generations; the reason for stopping is set on this object
+    :param checkpoint_path: file to save checkpoints of the search to; if it holds a checkpoint of a search
+                            on the same input with the same options, that search is resumed, and if that search
+                            reached its target score, stagnated or used up its evaluations, its best expression
+                            is returned without running it again
+    :param checkpoint_every: number of generations between checkpoints
+    :param archive_path: file of an ExpressionArchive; the archived expressions closest to the input on its
+                         assignments make up to half of every population and the Pareto front of score and
+                         size of the last generation is archived at the end
+    :param portfolio: race these strategies in worker processes instead, see Portfolio.race, the first reaching
+                      the target score of the termination wins; cannot be combined with checkpoints, the archive,
+                      telemetry or the profiler
+    :param telemetry: receiver of timers and counters per generation
+    :param seed: seed of the random number generator to reproduce a search, by default a random seed
+    :param profiler: capture CPU profiles and allocation snapshots of a window of generations and write them
+                     to files with a summary of the hottest functions and allocation sites
     :param verbose: output more info to sdtout
     :return: best performing expression
+    :raises ValueError: if portfolio is combined with checkpoint_path, archive_path, telemetry or profiler
+    :raises RuntimeError: if no strategy of the portfolio found an expression
+    """
+    if portfolio is not None:
+        from sr_fol.Portfolio import race
+        combined = [name for name, value in (('checkpoint_path', checkpoint_path), ('archive_path', archive_path),
+                                             ('telemetry', telemetry), ('profiler', profiler)) if value is not None]
+        if combined:
+            raise ValueError(f'portfolio cannot be combined with {", ".join(combined)}')
+        termination = termination if termination is not None else Termination()
+        results = race(input_df, portfolio,
+                       options={'populations': populations,
+                                'population_size': population_size,
+                                'maxdepth': maxdepth,
+                                'niterations': niterations,
+                                'binary_operators': binary_operators,
+                                'unary_operators': unary_operators,
+                                'local_search': local_search,
+                                'semantic_crossover': semantic_crossover,
+                                'nary': nary,
+                                'maxsize': maxsize,
+                                'parsimony': parsimony,
+                                'selection': selection,
+                                'initialization': initialization,
+                                'threads': threads,
+                                'adaptive': adaptive,
+                                'memo': memo,
+                                'seed': seed,
+                                'target_score': termination.target_score,
+                                'max_evaluations': termination.max_evaluations,
+                                'stagnation': termination.stagnation},
+                       time_limit=termination.time_limit)
+        if verbose:
+            for result in results:
+                print(result)
+        if results[0]['status'] != 'ok':
+            raise RuntimeError(results[0].get('error', results[0]['status']))
+        termination.reason = results[0]['stop_reason']
+        return results[0]['expression']
+    solver = None
+    if checkpoint_path is not None and exists(checkpoint_path):
+        resumed = Solver.resume(checkpoint_path, telemetry=telemetry, profiler=profiler, verbose=verbose)
+        packed = PackedAssignment.from_rows(input_df)
+        options = {'populations': populations,
+                   'population_size': population_size,
+                   'maxdepth': maxdepth,
+                   'binary_operators': [node_class.__name__ for node_class in binary_operators],
+                   'unary_operators': [node_class.__name__ for node_class in unary_operators],
+                   'local_search': local_search,
+                   'semantic_crossover': semantic_crossover,
+                   'nary': nary,
+                   'maxsize': maxsize,
+                   'parsimony': parsimony,
+                   'selection': selection,
+                   'initialization': initialization,
+                   'threads': threads,
+                   'adaptive': adaptive,
+                   'memo': memo}
+        if (resumed.packed.variables, resumed.packed.e, resumed.packed.a_n) != (packed.variables, packed.e, packed.a_n):
+            if verbose:
+                print('Checkpoint of another input, starting a new search')
+        elif resumed.options() != options:
+            if verbose:
+                print('Checkpoint of other options, starting a new search')
+        else:
+            if verbose:
+                print(f'Resumed at generation {resumed.generation}')
+            solver = resumed
+        if solver is None:
+            resumed.close()  # release the thread scorer of the rejected checkpoint
+    archive = None
+    if archive_path is not None:
+        from sr_fol.Archive import ExpressionArchive
+        archive = ExpressionArchive(archive_path)
+    try:
+        if solver is None:
+            packed = PackedAssignment.from_rows(input_df)
+            if verbose:
+                print('Input cleaned')
+            solver = Solver(packed,
+                            populations=populations,
+                            population_size=population_size,
+                            maxdepth=maxdepth,
+                            binary_operators=binary_operators,
+                            unary_operators=unary_operators,
+                            local_search=local_search,
+                            semantic_crossover=semantic_crossover,
+                            nary=nary,
+                            maxsize=maxsize,
+                            parsimony=parsimony,
+                            selection=selection,
+                            initialization=initialization,
+                            threads=threads,
+                            adaptive=adaptive,
+                            memo=memo,
+                            seeds=archive.nearest(packed, population_size // 2) if archive is not None else None,
+                            telemetry=telemetry,
+                            seed=seed,
+                            profiler=profiler,
+                            verbose=verbose)
+            expression = solver.run(niterations, termination,
+                                    checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+        elif solver.stop_reason in FINISHED:
+            # the search of the checkpoint reached its target or gave up, running it again would not change it
+            if verbose:
+                print(f'Search of the checkpoint finished by {solver.stop_reason}')
+            if termination is not None:
+                termination.reason = solver.stop_reason
+            expression = solver.best()
+        else:
+            expression = solver.run(niterations, termination, resume=True,
+                                    checkpoint_path=checkpoint_path, checkpoint_every=checkpoint_every)
+        if archive is not None:
+            # the Pareto front of the last generation, the best expression of every size found
+            archive.add([expr for expr, _ in solver.front] if solver.front is not None else [expression], solver.v_n)
+    finally:
+        if solver is not None:
+            solver.close()
+        if archive is not None:
+            archive.close()
+    return expression
+
+
+def best_expressions(input_df: 'DataFrame | list[list]',
+                     targets: int,
+                     populations: int = 31,
+                     population_size: int = 27,
+                     maxdepth: int = 10,
+                     niterations: int = 100,
+                     binary_operators: tuple[Type[Expression], ...] = (Or, And),
+                     unary_operators: tuple[Type[Expression], ...] = (Not,),
+                     local_search: int = 0,
+                     semantic_crossover: bool = False,
+                     nary: bool = False,
+                     maxsize: int | None = None,
+                     parsimony: str | None = None,
+                     selection: str = 'truncation',
+                     initialization: str = 'grow',
+                     threads: int = 1,
+                     adaptive: bool = False,
+                     memo: bool = False,
+                     termination: Termination | None = None,
+                     telemetry: Telemetry | None = None,
+                     seed: int | None = None,
+                     verbose: bool = False) -> list[Expression]:
+    """
+    Find an expression for each of several evaluation rows over the same variable assignments. The input is
+    cleaned and packed once and all targets share the packed variables, the memo of subtree evaluations and the
+    truth vectors of the subtrees indexed for semantic crossover. The targets are solved one after the other and
+    the Pareto front of score and size of the last generation of the solved targets is added to the populations
+    of the following targets, so related targets can build on each other's subexpressions.
+
+    :param input_df: uncleaned DataFrame or rows of the variables followed by targets evaluation rows
+    :param targets: number of evaluation rows
+    :param populations: number of populations used in the genetic algorithm
+    :param population_size: number of individual expressions per population
+    :param maxdepth: maximum depth of the expressions in the populations
+    :param niterations: number of generations of mutation and crossover per target
+    :param binary_operators: only use these binary operators
+    :param unary_operators: only use these unary operators
+    :param local_search: number of best expressions per population refined by hill climbing each generation
+    :param semantic_crossover: splice library subtrees that fit the depth budget and correct the most assignments
+    :param nary: count chains of the same associative operator as single n-ary nodes against maxdepth
+    :param maxsize: maximum number of nodes of the expressions in the populations, by default unlimited
+    :param parsimony: rank equally scored expressions by size when culling, 'lexicographic' or 'pareto'
+    :param selection: selection of the survivors when culling, 'truncation', 'tournament' or 'lexicase'
+    :param initialization: shape of the random expressions the populations start with, 'grow', 'full' or 'ramped'
+    :param threads: number of threads scoring the expressions in chunks of the assignments, worthwhile for inputs
+                    with many assignments as NumPy evaluates the chunks without holding the interpreter lock
+    :param adaptive: allocate the steps of every generation to the populations by their progress rate and restart
+                     stagnated populations from the best expressions of all populations
+    :param memo: evaluate every distinct subtree of the expressions scored in a generation once for all populations
+    :param termination: criteria to stop the search of a target before niterations, by default when a perfect
+                        score is reached or the best score stagnates for 10 generations
+    :param telemetry: receiver of timers and counters per generation
+    :param seed: seed of the random number generator to reproduce a search, by default a random seed
+    :param verbose: output more info to sdtout
+    :return: best performing expression per target
     """
-    assignment = Assignment(df=input_df)
-    assignment.clean()
+    packed_targets = PackedAssignment.from_targets(input_df, targets)
     if verbose:
         print('Input cleaned')
-    assignment_matrix = assignment.matrix
-    v_n = len(assignment_matrix.index) - 1
-    pops = [Population(population_size, v_n, maxdepth, binary_operators, unary_operators) for _ in range(populations)]
-    best_per_generation = []
-    for gen in range(niterations):
+    results = []
+    shared_expressions = []
+    # the truth vectors of subtrees only depend on the variables, which all targets share
+    shared_memo = SubtreeMemo() if memo else False
+    truths = SubtreeTruths() if semantic_crossover else None
+    for i, packed in enumerate(packed_targets):
+        if verbose:
+            print(f'Target e_{i + 1}')
+        solver = Solver(packed,
+                        populations=populations,
+                        population_size=population_size,
+                        maxdepth=maxdepth,
+                        binary_operators=binary_operators,
+                        unary_operators=unary_operators,
+                        local_search=local_search,
+                        semantic_crossover=semantic_crossover,
+                        nary=nary,
+                        maxsize=maxsize,
+                        parsimony=parsimony,
+                        selection=selection,
+                        initialization=initialization,
+                        threads=threads,
+                        adaptive=adaptive,
+                        memo=shared_memo,
+                        truths=truths,
+                        telemetry=telemetry,
+                        seed=seed + i if seed is not None else None,
+                        verbose=verbose)
+        try:
+            solver.add_expressions(shared_expressions)
+            expression = solver.run(niterations, termination)
+            results.append(expression)
+            shared_expressions += [expr for expr, _ in solver.front] if solver.front is not None else [expression]
+        finally:
+            solver.close()
+    return results
 
-        # stop if the there was no improvement in the last 10 generations
-        if gen > 10 and all(i == best_per_generation[-1] for i in best_per_generation[-10:]):
-            break
 
-        if verbose:
-            print(f'{gen+1}. Generation')
-        best_per_population = []
-
-        # remove the worst expressions in the population
-        for pop in pops:
-            pop.cull(assignment_matrix)
-
-        # crossover half the populations back up to population_size
-        for crossover in range(populations//2):
-            host, guest = sample(pops, k=2)
-            host.crossover(guest_population=guest)
-
-        # mutate the remaining populations back up to population_size
-        for pop in pops:
-            pop.mutation()
-            scores = pop.scores(assignment_matrix)
-            best_per_population.append(round(scores[-1][1], 2))
-        if verbose:
-            print('Best Score of Generation: ', max(best_per_population))
-        best_per_generation.append(max(best_per_population))
-
-    # retrieve the best expression from the current populations
-    best_expr_score_size = (Expression(), 0.0, 0)
-    for pop in pops:
-        for score in pop.scores(assignment_matrix):
-            if round(score[1], 2) > best_expr_score_size[1]:
-                best_expr_score_size = (score[0], round(score[1], 2), score[0].size())
-            elif round(score[1], 2) == best_expr_score_size[1] and score[0].size() < best_expr_score_size[2]:
-                best_expr_score_size = (score[0], round(score[1], 2), score[0].size())
-    if verbose:
-        print('Best Expression: ', best_expr_score_size[0])
-    return best_expr_score_size[0]
+def operator_classes(names: str, arity: int) -> tuple[Type[Expression], ...]:
+    """
+    Look up operator classes by name or alias, e.g. 'OR AND' or 'all_not'. 'all' selects every registered
+    operator once.
+
+    :param names: names of the operators separated by spaces, underscores or commas, in any case
+    :param arity: arity of the operators
+    :return: operator classes in the order of the registry
+    :raises ValueError: if a name is not a registered operator of this arity
+    """
+    classes = {name.lower(): node_class for name, node_class in OPERATORS.items() if node_class.arity() == arity}
+    requested = set(names.lower().replace('_', ' ').replace(',', ' ').split())
+    unknown = requested - set(classes) - {'all'}
+    if unknown:
+        raise ValueError(f'Unknown operators {", ".join(sorted(unknown))}, choose from {", ".join(classes)}')
+    return tuple(dict.fromkeys(node_class for name, node_class in classes.items()
+                               if name in requested or 'all' in requested))
 
 
 if __name__ == '__main__':
     """ Run from command line. """
+    from sr_fol.Portfolio import STRATEGIES
     parser = ArgumentParser()
     parser.add_argument('--input_df_path', type=str, help='path to a pickled DataFrame')
+    parser.add_argument('--batch', type=str,
+                        help='directory of pickled DataFrames, glob pattern or JSON lines manifest of jobs to solve')
+    parser.add_argument('--serve', type=int, help='port to serve solver requests on as HTTP/JSON service')
+    parser.add_argument('--workers', type=int, help='number of worker processes in batch mode or threads of the service')
+    parser.add_argument('--timeout', type=float, help='seconds per job in batch or service mode, unless the job sets its own')
+    parser.add_argument('--queue_size', type=int, help='maximum number of waiting jobs of the service')
+    parser.add_argument('--job_ttl', type=float, help='seconds a finished job of the service can still be queried')
+    parser.add_argument('--cache_path', type=str, help='file of the persistent result cache of the service')
+    parser.add_argument('--predict', type=str, help='expression to evaluate for every row of --predict_input_path')
+    parser.add_argument('--predict_input_path', type=str, help='.npy file with one column per variable')
+    parser.add_argument('--predict_output_path', type=str,
+                        help='.npy file to write the evaluations to as 1 for True, 0 for False and -1 for None')
+    parser.add_argument('--chunk_size', type=int, help='number of rows evaluated at once by --predict')
     parser.add_argument('--populations', type=int, help='number of populations used in the genetic algorithm')
     parser.add_argument('--population_size', type=int, help='number of individual expressions per population')
     parser.add_argument('--maxdepth', type=int, help='maximum depth of the expressions in the populations')
     parser.add_argument('--niterations', type=int, help='number of generations of mutation and crossover')
     parser.add_argument('--binary_operators', type=str, help='only use these binary operators')
     parser.add_argument('--unary_operators', type=str, help='only use these unary operators')
+    parser.add_argument('--targets', type=int, help='number of evaluation rows, one expression is found per row')
+    parser.add_argument('--local_search', type=int,
+                        help='number of best expressions per population refined by hill climbing each generation')
+    parser.add_argument('--semantic_crossover', action='store_true',
+                        help='splice library subtrees that fit the depth budget and correct the most assignments')
+    parser.add_argument('--nary', action='store_true',
+                        help='count chains of the same associative operator as single n-ary nodes against maxdepth')
+    parser.add_argument('--maxsize', type=int, help='maximum number of nodes of the expressions in the populations')
+    parser.add_argument('--parsimony', type=str, choices=['lexicographic', 'pareto'],
+                        help='rank equally scored expressions by size when culling')
+    parser.add_argument('--selection', type=str, choices=['truncation', 'tournament', 'lexicase'],
+                        help='selection of the survivors when culling')
+    parser.add_argument('--initialization', type=str, choices=['grow', 'full', 'ramped'],
+                        help='shape of the random expressions the populations start with')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='allocate the steps of every generation to the populations by their progress rate')
+    parser.add_argument('--memo', action='store_true',
+                        help='evaluate every distinct subtree of the expressions scored in a generation once')
+    parser.add_argument('--threads', type=int,
+                        help='number of threads scoring the expressions in chunks of the assignments')
+    parser.add_argument('--target_score', type=float, help='stop when the best score is at least this high')
+    parser.add_argument('--time_limit', type=float, help='wall-clock budget of the search in seconds')
+    parser.add_argument('--max_evaluations', type=int, help='budget of fitness evaluations of the search')
+    parser.add_argument('--stagnation', type=int,
+                        help='stop when the best score did not change for this many generations')
+    parser.add_argument('--checkpoint_path', type=str,
+                        help='file to save checkpoints to, an existing checkpoint of the same input and options is resumed')
+    parser.add_argument('--checkpoint_every', type=int, help='number of generations between checkpoints')
+    parser.add_argument('--archive_path', type=str,
+                        help='file of an archive of expressions to start from and to add the best expressions to')
+    parser.add_argument('--portfolio', type=str, nargs='+', choices=STRATEGIES,
+                        help='race these strategies in worker processes, the first perfect expression wins')
+    parser.add_argument('--telemetry_path', type=str, help='file to append timers and counters per generation to')
+    parser.add_argument('--seed', type=int, help='seed of the random number generator to reproduce a search')
+    parser.add_argument('--profile_path', type=str,
+                        help='path without extension to write a CPU profile, an allocation snapshot and a summary to')
+    parser.add_argument('--profile_start', type=int, help='first profiled generation')
+    parser.add_argument('--profile_stop', type=int, help='last profiled generation')
     parser.add_argument('-v', '--verbose', help='output more info to sdtout', action='store_true')
     args = parser.parse_args()
 
-    if args.input_df_path:
-        with open(args.input_df_path, 'rb') as input_df_file:
-            input_df = load(input_df_file)
+    if args.predict:
+        from numpy import load as load_npy
+        from sr_fol.Predict import predict
+        from sr_fol.Serialization import parse
+        predictions = predict(parse(args.predict),
+                              load_npy(args.predict_input_path, mmap_mode='r'),
+                              out=args.predict_output_path,
+                              chunk_size=args.chunk_size if args.chunk_size else 1 << 20,
+                              workers=args.workers if args.workers else 1)
+        if not args.predict_output_path:
+            print(predictions.tolist())
+    elif args.input_df_path or args.batch or args.serve:
+        if args.input_df_path:
+            with open(args.input_df_path, 'rb') as input_df_file:
+                input_df = load(input_df_file)
 
         populations = args.populations if args.populations else 31
         population_size = args.population_size if args.population_size else 27
@@ -106,37 +417,119 @@ if __name__ == '__main__':
         niterations = args.niterations if args.niterations else 100
         binary_operators = args.binary_operators if args.binary_operators else 'OR AND'
         unary_operators = args.unary_operators if args.unary_operators else 'NOT'
+        local_search = args.local_search if args.local_search else 0
+        selection = args.selection if args.selection else 'truncation'
+        initialization = args.initialization if args.initialization else 'grow'
+        threads = args.threads if args.threads else 1
+        termination = Termination(target_score=args.target_score if args.target_score is not None else 1.0,
+                                  time_limit=args.time_limit,
+                                  max_evaluations=args.max_evaluations,
+                                  stagnation=args.stagnation if args.stagnation is not None else 10)
+        telemetry = Telemetry(JsonLinesSink(args.telemetry_path)) if args.telemetry_path else None
+        profiler = Profiler(args.profile_path,
+                            start=args.profile_start if args.profile_start else 1,
+                            stop=args.profile_stop) if args.profile_path else None
+
+        try:
+            binary_expressions = operator_classes(binary_operators, 2)
+            unary_expressions = operator_classes(unary_operators, 1)
+        except ValueError as error:
+            parser.error(str(error))
 
-        binary_operators = binary_operators.lower()
-        binary_expressions = []
-        if 'converse' in binary_operators or 'all' in binary_operators:
-            binary_expressions.append(Converse)
-        if 'implies' in binary_operators or 'all' in binary_operators:
-            binary_expressions.append(Implies)
-        if 'xor' in binary_operators or 'all' in binary_operators:
-            binary_expressions.append(Xor)
-            binary_operators = binary_operators.replace('xor', '')
-        if 'nand' in binary_operators or 'all' in binary_operators:
-            binary_expressions.append(Nand)
-            binary_operators = binary_operators.replace('nand', '')
-        if 'and' in binary_operators or 'all' in binary_operators:
-            binary_expressions.append(And)
-        if 'or' in binary_operators or 'all' in binary_operators:
-            binary_expressions.append(Or)
-
-        unary_operators = unary_operators.lower()
-        unary_expressions = []
-        if 'not' in unary_operators or 'all' in unary_operators:
-            unary_expressions.append(Not)
-
-        result_expression = best_expression(input_df,
-                                            populations=populations,
-                                            population_size=population_size,
-                                            maxdepth=maxdepth,
-                                            niterations=niterations,
-                                            binary_operators=tuple(binary_expressions),
-                                            unary_operators=tuple(unary_expressions),
-                                            verbose=args.verbose)
-        print(result_expression)
+        if args.batch or args.serve:
+            defaults = {'populations': populations,
+                        'population_size': population_size,
+                        'maxdepth': maxdepth,
+                        'niterations': niterations,
+                        'binary_operators': tuple(binary_expressions),
+                        'unary_operators': tuple(unary_expressions),
+                        'local_search': local_search,
+                        'semantic_crossover': args.semantic_crossover,
+                        'nary': args.nary,
+                        'maxsize': args.maxsize,
+                        'parsimony': args.parsimony,
+                        'selection': selection,
+                        'initialization': initialization,
+                        'threads': threads,
+                        'adaptive': args.adaptive,
+                        'memo': args.memo,
+                        'seed': args.seed,
+                        'target_score': termination.target_score,
+                        'time_limit': termination.time_limit,
+                        'max_evaluations': termination.max_evaluations,
+                        'stagnation': termination.stagnation}
+        if args.batch:
+            from sr_fol.Batch import run_batch
+            for result in run_batch(args.batch, defaults, workers=args.workers, timeout=args.timeout):
+                print(dumps(result), flush=True)
+        elif args.serve:
+            from sr_fol.Service import SolverService, ResultCache, serve
+            service = SolverService(workers=args.workers if args.workers else 2,
+                                    queue_size=args.queue_size if args.queue_size else 16,
+                                    cache=ResultCache(args.cache_path) if args.cache_path else None,
+                                    defaults=defaults,
+                                    timeout=args.timeout,
+                                    job_ttl=args.job_ttl if args.job_ttl else 3600.0)
+            server = serve(service, port=args.serve)
+            print(f'Serving on http://127.0.0.1:{args.serve}/jobs')
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                server.server_close()
+                service.close()
+        elif args.targets and args.targets > 1:
+            for result_expression in best_expressions(input_df,
+                                                      args.targets,
+                                                      populations=populations,
+                                                      population_size=population_size,
+                                                      maxdepth=maxdepth,
+                                                      niterations=niterations,
+                                                      binary_operators=tuple(binary_expressions),
+                                                      unary_operators=tuple(unary_expressions),
+                                                      local_search=local_search,
+                                                      semantic_crossover=args.semantic_crossover,
+                                                      nary=args.nary,
+                                                      maxsize=args.maxsize,
+                                                      parsimony=args.parsimony,
+                                                      selection=selection,
+                                                      initialization=initialization,
+                                                      threads=threads,
+                                                      adaptive=args.adaptive,
+                                                      memo=args.memo,
+                                                      termination=termination,
+                                                      telemetry=telemetry,
+                                                      seed=args.seed,
+                                                      verbose=args.verbose):
+                print(result_expression)
+        else:
+            result_expression = best_expression(input_df,
+                                                populations=populations,
+                                                population_size=population_size,
+                                                maxdepth=maxdepth,
+                                                niterations=niterations,
+                                                binary_operators=tuple(binary_expressions),
+                                                unary_operators=tuple(unary_expressions),
+                                                local_search=local_search,
+                                                semantic_crossover=args.semantic_crossover,
+                                                nary=args.nary,
+                                                maxsize=args.maxsize,
+                                                parsimony=args.parsimony,
+                                                selection=selection,
+                                                initialization=initialization,
+                                                threads=threads,
+                                                adaptive=args.adaptive,
+                                                memo=args.memo,
+                                                termination=termination,
+                                                checkpoint_path=args.checkpoint_path,
+                                                checkpoint_every=args.checkpoint_every if args.checkpoint_every else 10,
+                                                archive_path=args.archive_path,
+                                                portfolio=tuple(args.portfolio) if args.portfolio else None,
+                                                telemetry=telemetry,
+                                                seed=args.seed,
+                                                profiler=profiler,
+                                                verbose=args.verbose)
+            print(result_expression)
+        if profiler is not None and profiler.summary:
+            print(profiler.summary)
     else:
         print('Please specify input data.')
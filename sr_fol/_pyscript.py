@@ -1,8 +1,6 @@
 from pyscript import document
-from sr_fol.__main__ import best_expression
-from sr_fol.Assignment import Assignment, RandomAssignment
+from sr_fol.Solver import Solver
 from sr_fol.Expression import Not, Or, And, Nand, Xor, Implies, Converse
-from pandas import DataFrame
 
 
 def prepare_table_cell(row: int, col: int, allow_none: bool = True) -> str:
@@ -37,8 +35,11 @@ def prepare_table() -> str:
     return table
 
 
-def find_expression(_) -> None:
-    """ Read options and the input table and start the search for an adequate expression. """
+async def find_expression(_) -> None:
+    """
+    Read options and the input table and start the search for an adequate expression.
+    The search hands control back to the browser after every generation to show its progress.
+    """
     rows = int(document.querySelector("#number-of-variables").value) + 1
     columns = int(document.querySelector("#number-of-assignments").value)
     options_unary = []
@@ -71,15 +72,16 @@ def find_expression(_) -> None:
                 data_row.append(None)
         data.append(data_row)
 
-    assignment = Assignment(DataFrame(data))
-    assignment.clean()
-    document.querySelector("#output").innerText = best_expression(assignment.matrix,
-                                                                  populations=10,
-                                                                  population_size=10,
-                                                                  maxdepth=5,
-                                                                  binary_operators=tuple(options_binary),
-                                                                  unary_operators=tuple(options_unary),
-                                                                  verbose=True)
+    solver = Solver(data,
+                    populations=10,
+                    population_size=10,
+                    maxdepth=5,
+                    binary_operators=tuple(options_binary),
+                    unary_operators=tuple(options_unary),
+                    verbose=True)
+    async for expression, stats in solver.agenerations():
+        document.querySelector("#output").innerText = f'{stats['generation']}. Generation: {expression}'
+    document.querySelector("#output").innerText = str(solver.best())
 
 
 def change_number(_) -> None:
@@ -0,0 +1,56 @@
+import unittest
+from os.path import join
+from random import Random
+from tempfile import TemporaryDirectory
+from sr_fol.Expression import Var, Not, Or, And, Xor, RandomExpression
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Archive import ExpressionArchive, truth_table
+
+
+class TestArchive(unittest.TestCase):
+    def test_truth_table(self):
+        table = truth_table(3)
+        self.assertEqual(table.a_n, 8)
+        for p in range(8):
+            self.assertEqual(table.key(p), tuple(bool(p >> bit & 1) for bit in range(3)))
+
+    def test_ExpressionArchive(self):
+        with TemporaryDirectory() as directory:
+            archive = ExpressionArchive(join(directory, 'archive.sqlite'))
+            and_not = And(Var(1), Not(Var(2)))
+            self.assertEqual(archive.add([Not(Not(and_not)), Or(Var(1), Var(3)), Xor(Var(1), Var(2))], 3), 3)
+            # same truth table, only the smaller expression is kept
+            self.assertEqual(archive.add([and_not, And(Var(1), Not(Var(2)))], 3), 1)
+            self.assertEqual(len(archive), 3)
+            archive.close()
+
+            archive = ExpressionArchive(join(directory, 'archive.sqlite'), bands=4, width=2)
+            self.assertEqual((archive.bands, archive.width), (16, 8))
+            packed = PackedAssignment.from_rows(FormulaAssignment(and_not, 3).matrix.values.tolist())
+            self.assertEqual(archive.nearest(packed, 1), [and_not])
+
+            # only some assignments observed, one of them contradicting and_not
+            rows = FormulaAssignment(and_not, 3).matrix.values.tolist()
+            rows = [row[:6] for row in rows]
+            rows[-1][0] = not rows[-1][0]
+            nearest = archive.nearest(PackedAssignment.from_rows(rows))
+            self.assertIn(and_not, nearest)
+            self.assertEqual(ExpressionArchive().nearest(packed), [])
+            archive.close()
+
+    def test_ExpressionArchive_sparse(self):
+        rng = Random(0)
+        archive = ExpressionArchive()
+        expression = And(Var(1), Or(Var(2), Var(3)))
+        archive.add([expression] + [RandomExpression(8, maxdepth=6, rng=rng) for _ in range(500)], 8)
+        # 29 of 256 assignments observed, most bands observe none or one of their assignments
+        true = expression.truth(truth_table(8))[0]
+        positions = rng.sample(range(256), 29)
+        rows = [[bool(p >> bit & 1) for p in positions] for bit in range(8)] + [[bool(true >> p & 1) for p in positions]]
+        self.assertEqual(archive.nearest(PackedAssignment.from_rows(rows), 1), [expression])
+        archive.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
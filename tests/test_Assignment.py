@@ -33,8 +33,21 @@ class TestAssignment(unittest.TestCase):
         # 5. columns with a None-value in the e row are removed
         self.assertTrue('a_2' not in a.matrix.columns)
 
+    def test_Assignment_clean_targets(self):
+        a = Assignment(DataFrame([[True, True, False, True], [True, False, True, True],
+                                  [True, False, None, None], [None, True, None, False]]), targets=2)
+        a.clean()
+        self.assertListEqual(list(a.matrix.index), ['v_1', 'v_2', 'e_1', 'e_2'])
+
+        # duplicates are found on the variables only, assignments are kept if any target is evaluated
+        self.assertListEqual(list(a.matrix.columns), ['a_1', 'a_2'])
+        self.assertListEqual(list(a.target(1).matrix.columns), ['a_1', 'a_2'])
+        self.assertListEqual(list(a.target(2).matrix.columns), ['a_2'])
+        self.assertListEqual(list(a.target(2).matrix.index), ['v_1', 'v_2', 'e'])
+
     def test_Assignment_RandomAssignment(self):
         self.assertIs(RandomAssignment().__class__, Assignment)
+        self.assertTrue(RandomAssignment(3, 10, seed=1).matrix.equals(RandomAssignment(3, 10, seed=1).matrix))
 
     def test_Assignment_FormulaAssignment(self):
         expr_1 = Or(And(Var(1), Var(2)), Not(Var(2)))
@@ -0,0 +1,67 @@
+import unittest
+from json import dumps
+from os.path import join
+from pickle import dump
+from tempfile import TemporaryDirectory
+from sr_fol.Expression import Var, Not, Or, And, Xor
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Batch import read_jobs, solve_job, run_batch
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        for name, expr in (('and', And(Var(1), Not(Var(2)))), ('or', Or(Var(1), Var(2))), ('xor', Xor(Var(1), Var(2)))):
+            with open(join(self.directory.name, name + '.pkl'), 'wb') as input_df_file:
+                dump(FormulaAssignment(expr).matrix, input_df_file)
+        self.defaults = {'populations': 4, 'population_size': 5, 'maxdepth': 4, 'niterations': 20, 'seed': 0}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_jobs(self):
+        self.assertEqual([job['path'] for job in read_jobs(self.directory.name)],
+                         [join(self.directory.name, name + '.pkl') for name in ('and', 'or', 'xor')])
+        self.assertEqual(len(read_jobs(join(self.directory.name, 'x*.pkl'))), 1)
+
+        manifest = join(self.directory.name, 'jobs.jsonl')
+        with open(manifest, 'w') as manifest_file:
+            manifest_file.write(dumps({'path': 'xor.pkl', 'id': 'xor', 'timeout': 5,
+                                       'options': {'binary_operators': ['Xor']}}) + '\n')
+        jobs = read_jobs(manifest)
+        self.assertEqual(jobs[0]['id'], 'xor')
+        self.assertEqual(jobs[0]['path'], join(self.directory.name, 'xor.pkl'))
+        self.assertEqual(jobs[0]['timeout'], 5)
+
+    def test_solve_job(self):
+        job = {'path': join(self.directory.name, 'xor.pkl'), 'id': 'xor', 'timeout': 5,
+               'options': {'binary_operators': ['Xor']}}
+        result = solve_job(job, self.defaults)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['score'], 1.0)
+        self.assertEqual(result['stop_reason'], 'target_score')
+
+    def test_run_batch(self):
+        results = list(run_batch(self.directory.name, self.defaults, workers=2, timeout=10))
+        self.assertEqual(sorted(result['id'] for result in results),
+                         [join(self.directory.name, name + '.pkl') for name in ('and', 'or', 'xor')])
+        self.assertTrue(all(result['status'] == 'ok' for result in results))
+
+        results = list(run_batch(join(self.directory.name, 'missing*.pkl'), self.defaults, workers=1))
+        self.assertEqual(results, [])
+
+    def test_run_batch_error(self):
+        manifest = join(self.directory.name, 'jobs.jsonl')
+        with open(manifest, 'w') as manifest_file:
+            manifest_file.write(dumps({'path': 'missing.pkl'}) + '\n')
+        results = list(run_batch(manifest, self.defaults, workers=1))
+        self.assertEqual(results[0]['status'], 'error')
+
+    def test_solve_job_unknown_option(self):
+        job = {'path': join(self.directory.name, 'xor.pkl'), 'id': 'xor', 'timeout': 5, 'options': {'maxdeph': 5}}
+        with self.assertRaisesRegex(ValueError, 'maxdeph'):
+            solve_job(job, self.defaults)
+
+
+if __name__ == '__main__':
+    unittest.main()
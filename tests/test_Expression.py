@@ -1,5 +1,9 @@
 import unittest
-from sr_fol.Expression import Expression, Var, Not, Or, And, Nand, Xor, Implies, Converse, RandomExpression
+from random import Random
+from sr_fol.Expression import Expression, Var, Not, Or, And, Nand, Xor, Implies, Converse, Nor, Xnor, RandomExpression, \
+    RandomDraws, random_expressions, SHAPES
+from sr_fol.Expression import BinaryOperator, OPERATORS
+from sr_fol.Semantics import PackedAssignment
 from sr_fol.Assignment import FormulaAssignment
 
 
@@ -35,6 +39,13 @@ class TestExpression(unittest.TestCase):
         self.assertEqual(self.and_1.depth(), 2)
         self.assertEqual(self.expr.depth(), 3)
 
+    def test_Expression_depth_nary(self):
+        chain = And(And(Var(1), And(Var(2), Var(3))), Or(Var(4), Or(Var(5), Var(6))))
+        self.assertEqual(chain.depth(), 4)
+        self.assertEqual(chain.depth(nary=True), 3)
+        self.assertEqual(Not(Implies(Implies(Var(1), Var(2)), Var(3))).depth(nary=True), 4)
+        self.assertEqual(chain.operands(), [Var(1), Var(2), Var(3), Or(Var(4), Or(Var(5), Var(6)))])
+
     def test_Expression_nodes(self):
         self.assertEqual(self.var_1.nodes([]), [self.var_1])
         self.assertEqual(self.var_1.nodes([Var]), [self.var_1])
@@ -42,6 +53,10 @@ class TestExpression(unittest.TestCase):
         self.assertEqual(len(self.expr.nodes([Var])), 3)
         self.assertEqual(len(self.expr.nodes([Not, Or, And])), 3)
 
+    def test_Expression_levels(self):
+        self.assertEqual(self.expr.levels([Or, Not]), [(self.expr.arg_1, 1), (self.expr.arg_2, 1)])
+        self.assertEqual([level for _, level in self.expr.levels([])], [0, 1, 2, 2, 1, 2])
+
     def test_Expression_set_child(self):
         self.not_1.set_child(self.expr)
         self.assertEqual(self.not_1.arg_1, self.expr)
@@ -210,10 +225,129 @@ class TestConverse(unittest.TestCase):
         self.assertEqual(self.converse_1.copy(), self.converse_1)
 
 
+class TestNor(unittest.TestCase):
+    def setUp(self):
+        self.nor_1 = Nor(Var(1), Var(2))
+        self.matrix_nor_1 = FormulaAssignment(self.nor_1).matrix
+
+    def test_Nor_str(self):
+        self.assertEqual(str(self.nor_1), '(v_1) nor (v_2)')
+
+    def test_Nor_evaluate(self):
+        self.assertEqual(self.matrix_nor_1.loc['e'].tolist(), [False, False, False, True])
+        self.assertEqual(self.nor_1.evaluate({'v_1': None, 'v_2': True}), False)
+        self.assertEqual(self.nor_1.evaluate({'v_1': None, 'v_2': False}), None)
+
+    def test_Nor_copy(self):
+        self.assertEqual(self.nor_1.copy(), self.nor_1)
+        self.assertIsNot(self.nor_1.copy(), self.nor_1)
+
+
+class TestXnor(unittest.TestCase):
+    def test_Xnor_evaluate(self):
+        xnor_1 = Xnor(Var(1), Var(2))
+        self.assertEqual(str(xnor_1), '(v_1) <-> (v_2)')
+        self.assertEqual(FormulaAssignment(xnor_1).matrix.loc['e'].tolist(), [True, False, False, True])
+        self.assertEqual(xnor_1.evaluate({'v_1': None, 'v_2': True}), None)
+
+
+class TestBinaryOperator(unittest.TestCase):
+    def test_BinaryOperator_kleene(self):
+        packed = PackedAssignment.from_matrix([[True, True, True, False, False, False, None, None, None],
+                                               [True, False, None, True, False, None, True, False, None],
+                                               [True] * 9])
+        for node_class in OPERATORS.values():
+            if node_class.arity() == 2:
+                expression = node_class(Var(1), Var(2))
+                true, false = expression.truth(packed)
+                for i in range(9):
+                    value = expression.evaluate({'v_1': packed.key(i)[0], 'v_2': packed.key(i)[1]})
+                    self.assertEqual((bool(true >> i & 1), bool(false >> i & 1)), (value is True, value is False))
+
+    def test_BinaryOperator_register(self):
+        class Nimplies(BinaryOperator):
+            symbol, table = '-/>', (False, True, False, False)
+
+        self.addCleanup(OPERATORS.pop, 'Nimplies')
+        self.assertIs(OPERATORS['Nimplies'], Nimplies)
+        self.assertEqual(Nimplies.kleene((0b0011, 0b1100), (0b0101, 0b1010)), (0b0010, 0b1101))
+        self.assertEqual(Nimplies(Var(1), Var(2)).evaluate({'v_1': True, 'v_2': None}), None)
+        self.assertFalse(Nimplies.associative)
+        self.assertTrue(Xnor.associative)
+        self.assertIs(OPERATORS['Equiv'], Xnor)
+
+    def test_BinaryOperator_every_table(self):
+        combinations = [(value_1, value_2) for value_1 in (True, False, None) for value_2 in (True, False, None)]
+        arguments = [(sum(1 << k for k, values in enumerate(combinations) if values[j] is True),
+                      sum(1 << k for k, values in enumerate(combinations) if values[j] is False)) for j in (0, 1)]
+        for i in range(1, 15):
+            table = tuple(bool(i >> j & 1) for j in range(4))
+            node_class = type(f'Table{i}', (BinaryOperator,), {'table': table})
+            self.addCleanup(OPERATORS.pop, node_class.__name__)
+            true, false = node_class.kleene(*arguments)
+            for k, values in enumerate(combinations):
+                value = node_class.kleene_table[values]
+                self.assertEqual((bool(true >> k & 1), bool(false >> k & 1)), (value is True, value is False))
+
+    def test_BinaryOperator_chain_truth(self):
+        packed = PackedAssignment.from_matrix([[True, True, True, False, False, None, None, None],
+                                               [True, False, None, True, None, True, False, None],
+                                               [True, None, False, False, True, None, True, False],
+                                               [True] * 8])
+        chain = And(And(Var(1), Or(Var(2), Or(Var(3), Not(Var(1))))), Or(Var(3), Var(2)))
+        true, false = chain.truth(packed)
+        for i in range(8):
+            value = chain.evaluate(dict(zip(('v_1', 'v_2', 'v_3'), packed.key(i))))
+            self.assertEqual((bool(true >> i & 1), bool(false >> i & 1)), (value is True, value is False))
+        with self.assertRaises(ValueError):
+            class Constant(BinaryOperator):
+                table = (True, True, True, True)
+
+
 class TestRandomExpression(unittest.TestCase):
     def test_RandomExpression_init(self):
         self.assertIn(RandomExpression(v_n=2).__class__.__name__, ['Var', 'Not', 'Or', 'And'])
 
+    def test_RandomExpression_limits(self):
+        rng = Random(0)
+        for maxdepth, maxsize in ((1, None), (4, None), (6, 7), (6, 2)):
+            for _ in range(50):
+                expr = RandomExpression(3, (Or, And), (Not,), maxdepth, rng, maxsize)
+                self.assertLessEqual(expr.depth(), maxdepth)
+                self.assertLessEqual(expr.size(), maxsize or expr.size())
+
+    def test_RandomExpression_rng(self):
+        self.assertEqual([RandomExpression(5, maxdepth=4, rng=Random(3)) for _ in range(10)],
+                         [RandomExpression(5, maxdepth=4, rng=Random(3)) for _ in range(10)])
+
+    def test_RandomDraws(self):
+        draws = RandomDraws(Random(0), block=3)
+        values = [draws.below(5) for _ in range(1000)]
+        self.assertEqual(set(values), {0, 1, 2, 3, 4})
+        draws = RandomDraws(Random(0), block=3)
+        self.assertEqual([draws.below(5) for _ in range(1000)], values)
+
+    def test_random_expressions(self):
+        for shape in SHAPES:
+            expressions = random_expressions(100, 3, (Or, And), (Not,), 5, Random(0), shape=shape)
+            self.assertEqual(len(expressions), 100)
+            self.assertEqual(len({str(expr) for expr in expressions}), 100)
+            self.assertTrue(all(expr.depth() <= 5 for expr in expressions))
+            self.assertEqual(expressions, random_expressions(100, 3, (Or, And), (Not,), 5, Random(0), shape=shape))
+        full = random_expressions(20, 3, (Or, And), (Not,), 4, Random(0), shape='full')
+        self.assertTrue(all(expr.depth() == 4 for expr in full))
+        ramped = random_expressions(40, 3, (Or, And), (), 5, Random(0), shape='ramped')
+        complete = {expr.depth() for expr in ramped if expr.size() == 2 ** expr.depth() - 1 > 1}
+        self.assertEqual(complete, {2, 3, 4, 5})
+        limited = random_expressions(50, 3, (Or, And), (Not,), 6, Random(0), maxsize=7, shape='full')
+        self.assertTrue(all(expr.size() <= 7 for expr in limited))
+
+        # only v_1, v_2 and their negations fit
+        expressions = random_expressions(10, 2, (), (Not,), 2, Random(0), exclude=[Var(1)], tries=1000)
+        self.assertEqual(sorted(map(str, expressions)), ['not (v_1)', 'not (v_2)', 'v_2'])
+        with self.assertRaises(ValueError):
+            random_expressions(10, 2, shape='half')
+
 
 if __name__ == '__main__':
     unittest.main()
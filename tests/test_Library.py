@@ -0,0 +1,48 @@
+import unittest
+from sr_fol.Expression import Var, Not, Or, And
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Library import SubtreeLibrary, SubtreeTruths
+
+
+class TestSubtreeLibrary(unittest.TestCase):
+    def setUp(self):
+        self.packed = PackedAssignment.from_matrix(FormulaAssignment(And(Var(1), Var(2))).matrix)
+
+    def test_SubtreeLibrary_update(self):
+        library = SubtreeLibrary()
+        library.update([Or(Var(1), Not(Not(Var(1)))), And(Var(1), Var(2))], self.packed)
+
+        # v_1, not (v_1), (v_1) or (not (not (v_1))), v_2 and (v_1) and (v_2) are distinct
+        self.assertEqual(len(library), 4)
+        self.assertEqual(library.entries[self.packed.variables[1]][0], Var(1))
+        self.assertEqual(library.entries[Not(Var(1)).truth(self.packed)][1:], (2, 2))
+
+    def test_SubtreeLibrary_donors(self):
+        library = SubtreeLibrary()
+        library.update([Or(Var(1), Not(Var(2))), And(Var(1), Var(2))], self.packed)
+        self.assertEqual(len(library.donors(1)), 2)
+        self.assertTrue(all(donor[2] <= 2 for donor in library.donors(2)))
+        self.assertEqual(len(library.donors(10)), len(library))
+
+    def test_SubtreeLibrary_shared_truths(self):
+        truths = SubtreeTruths()
+        expressions = [Or(Var(1), Not(Var(2))), And(Var(1), Not(Var(2)))]
+        first, second = SubtreeLibrary(truths), SubtreeLibrary(truths)
+        first.update(expressions, self.packed)
+        self.assertEqual((truths.hits, truths.misses), (3, 5))  # v_1, v_2 and not (v_2) repeat in the second
+        second.update(expressions, self.packed)
+        self.assertEqual(truths.hits, 11)
+        self.assertEqual(second.entries.keys(), first.entries.keys())
+        self.assertTrue(all(node.truth(self.packed) == value for value, (node, _, _) in second.entries.items()))
+
+        # only the truth vectors of the current and the previous generation are kept
+        truths.age()
+        truths.age()
+        self.assertEqual(len(truths), 0)
+        second.update(expressions, self.packed)
+        self.assertEqual(truths.misses, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
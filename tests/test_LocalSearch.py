@@ -0,0 +1,43 @@
+import unittest
+from sr_fol.Expression import Var, Not, Or, And, Xor
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.LocalSearch import NodeSemantics, hill_climb
+
+
+class TestLocalSearch(unittest.TestCase):
+    def setUp(self):
+        self.packed = PackedAssignment.from_matrix(FormulaAssignment(And(Var(1), Not(Var(2)))).matrix)
+
+    def test_NodeSemantics_propagate(self):
+        expr = Or(Var(1), Not(Var(2)))
+        semantics = NodeSemantics(expr, self.packed)
+        self.assertEqual(semantics.values[0], expr.truth(self.packed))
+        self.assertEqual(semantics.heights[0], 3)
+        self.assertEqual(semantics.propagate(0, (1, 2)), (1, 2))
+        self.assertEqual(semantics.propagate(1, self.packed.variables[2]),
+                         Or(Var(2), Not(Var(2))).truth(self.packed))
+
+    def test_hill_climb_operator_swap(self):
+        expr = Or(Var(1), Not(Var(2)))
+        refined = hill_climb(expr, self.packed, (Or, And), (Not,), maxdepth=10)
+        self.assertEqual(refined, And(Var(1), Not(Var(2))))
+        self.assertEqual(expr, Or(Var(1), Not(Var(2))))
+
+    def test_hill_climb_variable_swap(self):
+        refined = hill_climb(And(Var(1), Not(Var(1))), self.packed, (Or, And), (Not,), maxdepth=10)
+        self.assertEqual(refined, And(Var(1), Not(Var(2))))
+
+    def test_hill_climb_insert_and_remove_not(self):
+        refined = hill_climb(And(Var(1), Var(2)), self.packed, (Or, And), (Not,), maxdepth=10)
+        self.assertEqual(refined, And(Var(1), Not(Var(2))))
+        refined = hill_climb(And(Var(1), Not(Not(Var(2)))), self.packed, (Or, And), (Not,), maxdepth=10)
+        self.assertEqual(refined, And(Var(1), Not(Var(2))))
+
+    def test_hill_climb_respects_maxdepth(self):
+        refined = hill_climb(And(Var(1), Var(2)), self.packed, (And, Xor), (Not,), maxdepth=2)
+        self.assertLessEqual(refined.depth(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
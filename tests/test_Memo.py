@@ -0,0 +1,60 @@
+import unittest
+from random import Random
+from sr_fol.Expression import Var, Not, Or, And, Xor, random_expressions
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Memo import SubtreeMemo
+from sr_fol.Population import Population
+
+
+class TestSubtreeMemo(unittest.TestCase):
+    def setUp(self):
+        self.packed = PackedAssignment.from_rows(FormulaAssignment(Xor(Var(1), Var(2)), v_n=3).matrix)
+
+    def test_SubtreeMemo_truth(self):
+        memo = SubtreeMemo()
+        expressions = random_expressions(200, 3, (Or, And, Xor), (Not,), 6, Random(0))
+        memo.plan(expressions, self.packed)
+        for expression in expressions:
+            self.assertEqual(memo.truth(expression, self.packed), expression.truth(self.packed))
+        stats = memo.stats()
+        self.assertEqual(stats['hits'] + stats['misses'], sum(expression.size() for expression in expressions))
+        self.assertEqual(stats['misses'], len(memo))  # every distinct subtree is evaluated once
+        self.assertGreater(stats['duplication'], 0.5)
+        self.assertEqual(memo.truths, {})  # the truth vectors are released after their last planned use
+
+    def test_SubtreeMemo_shared(self):
+        memo = SubtreeMemo()
+        shared = And(Var(1), Not(Var(2)))
+        expressions = [Or(shared.copy(), Var(3)), Not(shared.copy()), shared.copy()]
+        memo.plan(expressions, self.packed)
+        for expression in expressions:
+            memo.truth(expression, self.packed)
+        self.assertEqual(len(memo), 7)  # v_1, v_2, not v_2, the conjunction, v_3, the disjunction and its negation
+        self.assertEqual(memo.stats()['misses'], 7)
+        self.assertEqual(memo.stats()['hits'], 8)  # the conjunction of four nodes is reused twice
+
+        # without plan nothing is kept, assignments added to packed or another packed clear the memo
+        memo.truth(Or(Var(1), Var(2)), self.packed)
+        self.assertEqual(memo.stats()['misses'], 10)
+        other = PackedAssignment.from_rows([[True, False], [False, True], [True, True]])
+        self.assertEqual(memo.truth(Or(Var(1), Var(2)), other), Or(Var(1), Var(2)).truth(other))
+        self.assertEqual(len(memo), 3)
+
+    def test_SubtreeMemo_population(self):
+        memo = SubtreeMemo()
+        pops = [Population(20, 3, 5, (Or, And), (Not,), Random(seed), selection='lexicase', memo=memo)
+                for seed in range(2)]
+        plain = [Population(20, 3, 5, (Or, And), (Not,), Random(seed), selection='lexicase') for seed in range(2)]
+        # planned like a Solver plans a generation, the subtrees shared by both populations are evaluated once
+        memo.plan([expression for pop in pops for expression in pop.expressions], self.packed)
+        for pop, plain_pop in zip(pops, plain):
+            self.assertEqual(pop.scores(self.packed), plain_pop.scores(self.packed))
+            pop.cull(self.packed)
+            plain_pop.cull(self.packed)
+            self.assertEqual(pop.expressions, plain_pop.expressions)
+        self.assertGreater(memo.stats()['hits'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
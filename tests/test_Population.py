@@ -1,7 +1,9 @@
 import unittest
+from random import Random
 from sr_fol.Expression import Var, Not, Or, And
 from sr_fol.Population import Population
 from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
 
 
 class TestPopulation(unittest.TestCase):
@@ -76,6 +78,111 @@ class TestPopulation(unittest.TestCase):
         p_1.crossover(p_2)
         self.assertEqual(len(p_1.expressions), 10)
 
+    def test_population_index(self):
+        p = Population(population_size=2,
+                       v_n=2,
+                       maxdepth=10,
+                       binary_operators=(Or, And),
+                       unary_operators=(Not,))
+        p.expressions = [Or(Var(1), Var(2)), Not(Var(1))]
+        p.index(self.f_a.matrix)
+        self.assertEqual(len(p.library), 4)
+
+    def test_population_semantic_crossover(self):
+        p_1 = Population(population_size=10,
+                         v_n=2,
+                         maxdepth=4,
+                         binary_operators=(Or, And),
+                         unary_operators=(Not,))
+        p_2 = Population(population_size=10,
+                         v_n=2,
+                         maxdepth=4,
+                         binary_operators=(Or, And),
+                         unary_operators=(Not,))
+        p_1.expressions = [Or(Var(1), Not(Var(1))), Var(2)]
+        p_1.semantic_crossover(p_2, self.f_a.matrix)
+        self.assertEqual(len(p_1.expressions), 10)
+        self.assertTrue(all(expr.depth() <= 4 for expr in p_1.expressions))
+
+
+    def test_population_limits(self):
+        p_1 = Population(30, 2, 5, (Or, And), (Not,), Random(1), maxsize=9)
+        p_2 = Population(30, 2, 5, (Or, And), (Not,), Random(2), maxsize=9)
+        self.assertTrue(all(expr.depth() <= 5 and expr.size() <= 9 for expr in p_1.expressions))
+        for _ in range(5):
+            p_1.cull(self.f_a.matrix)
+            p_1.crossover(p_2)
+            p_1.cull(self.f_a.matrix)
+            p_1.mutation()
+            self.assertTrue(all(expr.depth() <= 5 and expr.size() <= 9 for expr in p_1.expressions))
+
+    def test_population_crossover_var(self):
+        p_1 = Population(0, 2, 4, (Or, And), (Not,), Random(0))
+        p_2 = Population(0, 2, 4, (Or, And), (Not,), Random(0))
+        p_1.expressions, p_2.expressions = [Var(1)], [Var(2)]
+        p_1.population_size = 2
+        p_1.crossover(p_2)
+        self.assertEqual(len(p_1.expressions), 2)
+        self.assertIn(p_1.expressions[1].__class__, (Or, And, Not))
+
+    def test_population_parsimony(self):
+        big, small, bad = Or(And(Var(1), Var(2)), And(Var(1), Var(2))), And(Var(1), Var(2)), Var(1)
+        for parsimony, survivors in ((None, [big]), ('lexicographic', [small]), ('pareto', [small])):
+            p = Population(0, 2, 4, (Or, And), (Not,), parsimony=parsimony)
+            p.expressions = [big, small, bad] if parsimony else [small, big, bad]
+            p.cull(self.f_a.matrix, percent=0.6)
+            self.assertEqual(p.expressions, survivors if parsimony else [big])
+        p = Population(0, 2, 4, (Or, And), (Not,), parsimony='pareto')
+        p.expressions = [big, small, bad, Not(Var(2))]
+        self.assertEqual(p.cull(self.f_a.matrix, percent=0.25), [(bad, 0.75), (small, 1.0)])
+        self.assertEqual(p.expressions, [big, small, bad])
+        with self.assertRaises(ValueError):
+            Population(0, 2, 4, (Or, And), (Not,), parsimony='smallest')
+
+    def test_population_selection(self):
+        for selection in ('truncation', 'tournament', 'lexicase'):
+            p = Population(200, 2, 5, (Or, And), (Not,), Random(0), selection=selection)
+            expressions = list(p.expressions)
+            front = p.cull(self.f_a.matrix)
+            self.assertEqual(len(p.expressions), 100)
+            # the population keeps its order and the front is among the survivors
+            self.assertEqual(p.expressions, [expr for expr in expressions if any(expr is e for e in p.expressions)])
+            self.assertTrue(all(any(expr is e for e in p.expressions) for expr, _ in front))
+            self.assertEqual(front[-1][1], 1.0)
+        with self.assertRaises(ValueError):
+            Population(0, 2, 4, (Or, And), (Not,), selection='roulette')
+
+    def test_population_lexicase_cache(self):
+        rows = [[True, True, False], [True, False, True], [True, False, False]]
+        packed = PackedAssignment.from_rows(rows)
+        p = Population(20, 2, 4, (Or, And), (Not,), Random(0), selection='lexicase')
+        n = len(p.expressions)
+        p.cull(packed)
+        # the correctness bits of the scores are reused by the selection
+        self.assertEqual(p.evaluations, n)
+        # the survivors are only evaluated on the appended assignment
+        survivors = len(p.expressions)
+        packed.extend([[False], [False], [True]])
+        p.cull(packed)
+        self.assertEqual(p.evaluations, n + survivors)
+        for expr in p.expressions:
+            self.assertEqual(p.correct_bits(expr, packed), packed.correct(expr.truth(packed)))
+
+    def test_population_initialization(self):
+        p = Population(30, 2, 4, (Or, And), (Not,), Random(0), initialization='full')
+        self.assertEqual(len(p.expressions), 30)
+        self.assertTrue(all(expr.depth() == 4 for expr in p.expressions))
+        with self.assertRaises(ValueError):
+            Population(30, 2, 4, (Or, And), (Not,), initialization='half')
+
+    def test_population_seeds(self):
+        seeds = [And(Var(1), Var(2)), And(Var(1), Var(2)), Or(Or(Var(1), Var(2)), Or(Var(1), Var(2)))]
+        p = Population(5, 2, 2, (Or, And), (Not,), Random(0), seeds=seeds)
+        self.assertEqual(len(p.expressions), 5)
+        self.assertEqual(p.expressions[0], seeds[0])
+        self.assertIsNot(p.expressions[0], seeds[0])
+        self.assertNotIn(seeds[2], p)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from time import perf_counter
+from sr_fol.Expression import Var, Not, Or, And, Xor
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Termination import Termination
+from sr_fol.Portfolio import enumeration, cover, race
+from sr_fol import best_expression
+
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        self.xor = PackedAssignment.from_rows(FormulaAssignment(Xor(Var(1), Var(2)), v_n=3).matrix)
+        self.rows = [[True, True, False, False, None],
+                     [True, False, True, False, True],
+                     [True, False, True, True, True]]
+
+    def test_enumeration(self):
+        expression, reason = enumeration(self.xor)
+        self.assertEqual(expression.score(self.xor), 1.0)
+        self.assertEqual(expression.size(), 8)  # no smaller expression of Or, And and Not
+        self.assertEqual(reason, 'target_score')
+        expression, reason = enumeration(self.xor, binary_operators=(Xor,))
+        self.assertEqual(str(expression), '(v_1) xor (v_2)')
+        expression, reason = enumeration(self.xor, maxsize=4)
+        self.assertLess(expression.score(self.xor), 1.0)
+        self.assertLessEqual(expression.size(), 4)
+        self.assertEqual(reason, 'maxsize')
+        # Xor of the same variables never leaves the four truth vectors of v_1, v_2, v_1 xor v_2 and v_1 xor v_1
+        packed = PackedAssignment.from_rows([[True, False], [False, True], [True, True]])
+        self.assertEqual(enumeration(packed, binary_operators=(Xor,), unary_operators=(), target_score=None)[1],
+                         'exhausted')
+        self.assertEqual(enumeration(self.xor, stopped=lambda: True, limit=10)[1], 'limit')
+
+    def test_cover(self):
+        for expr in (Xor(Var(1), Var(2)), Or(And(Var(1), Not(Var(2))), And(Var(3), Var(4)))):
+            packed = PackedAssignment.from_rows(FormulaAssignment(expr, v_n=4).matrix)
+            expression, reason = cover(packed)
+            self.assertEqual(expression.score(packed), 1.0)
+            self.assertEqual(reason, 'complete')
+        packed = PackedAssignment.from_rows(FormulaAssignment(Or(And(Var(1), Not(Var(2))), And(Var(3), Var(4))),
+                                                              v_n=4).matrix)
+        self.assertEqual(cover(packed)[0].size(), 8)
+        packed = PackedAssignment.from_rows(self.rows)
+        self.assertEqual(cover(packed)[0].score(packed), 1.0)
+        self.assertEqual(cover(packed, binary_operators=(Xor,)), (None, 'unsupported'))
+
+    def test_race(self):
+        options = {'populations': 4, 'population_size': 5, 'maxdepth': 4, 'seed': 0,
+                   'niterations': 10 ** 6, 'stagnation': None}
+        start = perf_counter()
+        results = race(self.xor, options=options, time_limit=60)
+        self.assertLess(perf_counter() - start, 30)  # the first perfect expression cancels the genetic algorithm
+        self.assertEqual([result['status'] for result in results], ['ok'] * 3)
+        self.assertEqual(results[0]['score'], 1.0)
+        self.assertIn('cancelled', [result['stop_reason'] for result in results])
+        self.assertEqual([result['score'] for result in results],
+                         sorted((result['score'] for result in results), reverse=True))
+
+        # without a perfect expression the best by score is returned at the deadline
+        options['target_score'] = None
+        start = perf_counter()
+        results = race(self.xor, ('genetic', {'strategy': 'genetic', 'selection': 'lexicase'}, 'unknown'),
+                       options=options, time_limit=1)
+        self.assertLess(perf_counter() - start, 20)
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok', 'error'])
+        self.assertEqual(results[0]['stop_reason'], 'time_limit')
+
+    def test_best_expression_portfolio(self):
+        termination = Termination(time_limit=30)
+        expression = best_expression(self.rows, portfolio=('enumeration', 'cover'), termination=termination)
+        self.assertEqual(expression.score(self.rows), 1.0)
+        self.assertEqual(termination.reason, 'target_score')
+
+        # a cover without Or, And and Not has no expression to return
+        with self.assertRaises(RuntimeError):
+            best_expression(self.rows, binary_operators=(Xor,), portfolio=('cover',))
+        with self.assertRaises(ValueError):
+            best_expression(self.rows, portfolio=('cover',), checkpoint_path='checkpoint.pkl')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from os.path import join
+from tempfile import TemporaryDirectory
+import numpy
+from pandas import DataFrame
+from sr_fol.Expression import Var, Not, Or, And, Nand, Xor, Implies, Converse
+from sr_fol.Predict import predict, columns
+
+
+class TestPredict(unittest.TestCase):
+    def setUp(self):
+        self.expression = Or(And(Var(1), Not(Var(2))), Xor(Var(3), Implies(Var(1), Converse(Var(2), Nand(Var(3), Var(1))))))
+        values = [True, False, None]
+        self.rows = [[a, b, c] for a in values for b in values for c in values]
+
+    def expected(self):
+        codes = {True: 1, False: 0, None: -1}
+        return [codes[self.expression.evaluate({'v_1': a, 'v_2': b, 'v_3': c})] for a, b, c in self.rows]
+
+    def test_predict_matches_evaluate(self):
+        data = numpy.array(self.rows, dtype=object)
+        self.assertEqual(predict(self.expression, data).tolist(), self.expected())
+        self.assertEqual(predict(self.expression, data, chunk_size=4, workers=3).tolist(), self.expected())
+
+    def test_predict_columns(self):
+        df = DataFrame(self.rows, columns=['v_1', 'v_2', 'v_3'])
+        self.assertEqual(predict(self.expression, df).tolist(), self.expected())
+        floats = {i + 1: numpy.array([numpy.nan if row[i] is None else row[i] for row in self.rows], dtype=float)
+                  for i in range(3)}
+        self.assertEqual(predict(self.expression, floats, chunk_size=5).tolist(), self.expected())
+        with self.assertRaises(ValueError):
+            columns({'v_1': [True]}, [1, 2])
+        with self.assertRaises(ValueError):
+            columns({'v_1': [True], 'v_2': [True, False]}, [1, 2])
+
+    def test_predict_file(self):
+        data = numpy.array([[True, False], [False, False], [True, True]] * 5)
+        with TemporaryDirectory() as directory:
+            numpy.save(join(directory, 'input.npy'), data)
+            mapped = numpy.load(join(directory, 'input.npy'), mmap_mode='r')
+            predict(And(Var(1), Not(Var(2))), mapped, out=join(directory, 'output.npy'), chunk_size=2, workers=2)
+            self.assertEqual(numpy.load(join(directory, 'output.npy')).tolist(), [1, 0, 0] * 5)
+        out = numpy.zeros(15, dtype=numpy.int8)
+        self.assertIs(predict(Var(2), data, out=out), out)
+        with self.assertRaises(ValueError):
+            predict(Var(2), data, out=numpy.zeros(3, dtype=numpy.int8))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import tracemalloc
+from os.path import join, exists
+from tempfile import TemporaryDirectory
+from sr_fol.Expression import Var, Not, And
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Solver import Solver
+from sr_fol.Termination import Termination
+from sr_fol.Profiling import Profiler, NullProfiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.matrix = FormulaAssignment(And(Var(1), Not(Var(2)))).matrix
+
+    def test_Profiler_window(self):
+        with TemporaryDirectory() as directory:
+            path = join(directory, 'profile')
+            profiler = Profiler(path, start=2, stop=3)
+            s = Solver(self.matrix, populations=4, population_size=5, maxdepth=4, profiler=profiler)
+            s.step()
+            self.assertFalse(profiler.active)
+            s.step()
+            self.assertTrue(profiler.active)
+            s.step()
+            self.assertFalse(profiler.active)
+            self.assertFalse(tracemalloc.is_tracing())
+            for extension in ('.prof', '.tracemalloc', '.txt'):
+                self.assertTrue(exists(path + extension))
+            self.assertIn('Population.py', profiler.summary)
+            self.assertIn('Largest allocation sites', profiler.summary)
+
+            # the window is captured only once
+            s.step()
+            self.assertFalse(profiler.active)
+
+    def test_Profiler_run(self):
+        with TemporaryDirectory() as directory:
+            path = join(directory, 'profile')
+            profiler = Profiler(path, memory=False)
+            s = Solver(self.matrix, populations=4, population_size=5, maxdepth=4, profiler=profiler)
+            s.run(niterations=2, termination=Termination(target_score=None))
+            self.assertTrue(exists(path + '.prof'))
+            self.assertFalse(exists(path + '.tracemalloc'))
+            self.assertIn('Hottest functions', profiler.summary)
+
+    def test_NullProfiler(self):
+        profiler = NullProfiler()
+        profiler.start_generation(1)
+        self.assertFalse(profiler.active)
+        self.assertIsNone(profiler.finish())
+
+
+if __name__ == '__main__':
+    unittest.main()
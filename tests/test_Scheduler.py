@@ -0,0 +1,43 @@
+import unittest
+from sr_fol.Scheduler import IslandScheduler
+
+
+class TestIslandScheduler(unittest.TestCase):
+    def test_IslandScheduler_allocate(self):
+        scheduler = IslandScheduler(3, window=2, patience=100)
+        self.assertEqual(scheduler.allocate(), [1, 1, 1])
+        scores = [0.5, 0.5, 0.5]
+        for generation in range(12):
+            # island 0 improves steadily, 1 and 2 stagnate
+            scores[0] += 0.01 * scheduler.steps[0]
+            self.assertEqual(scheduler.update(scores), [])
+            steps = scheduler.allocate()
+            self.assertLessEqual(sum(steps), 3 + 1)
+        # weights 1, 0.25 and 0.25 share 3 steps
+        self.assertEqual(scheduler.steps[0], 2)
+        self.assertEqual(scheduler.rate(1), 0.0)
+        # the stagnating islands still run every few generations
+        self.assertGreater(scheduler.runs[1], 1)
+        self.assertLess(scheduler.runs[1], scheduler.runs[0])
+
+    def test_IslandScheduler_equal(self):
+        scheduler = IslandScheduler(4)
+        for _ in range(10):
+            self.assertEqual(scheduler.allocate(), [1, 1, 1, 1])
+            scheduler.update([0.5, 0.5, 0.5, 0.5])
+
+    def test_IslandScheduler_restart(self):
+        scheduler = IslandScheduler(2, patience=3)
+        restarts = []
+        for _ in range(4):
+            scheduler.allocate()
+            restarts = scheduler.update([0.75, 0.5])
+        self.assertEqual(restarts, [1])  # the island with the best score is kept
+        scheduler.restart(1)
+        self.assertIsNone(scheduler.rate(1))
+        self.assertEqual(scheduler.report()['restarts'], 1)
+        self.assertEqual(len(scheduler.report()['allocation']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from random import Random
+from sr_fol.Expression import Not, Or, And, Xor, Implies, RandomExpression
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Population import Population
+from sr_fol.Scoring import ThreadScorer, words
+
+
+class TestScoring(unittest.TestCase):
+    def setUp(self):
+        rng = Random(0)
+        values = [True, False, None]
+        self.rows = [[rng.choice(values) for _ in range(300)] for _ in range(4)]
+        self.packed = PackedAssignment.from_matrix(self.rows)
+        self.expressions = [RandomExpression(3, (Or, And, Xor, Implies), (Not,), 5, rng) for _ in range(20)]
+
+    def test_words(self):
+        self.assertEqual(words(0b1101, 6).tolist(), [0b1101])
+        self.assertEqual(words(0b1101, 2).tolist(), [0b01])
+        self.assertEqual(words(1 << 64 | 1, 65).tolist(), [1, 1])
+
+    def test_ThreadScorer(self):
+        expected = [self.packed.correct(expression.truth(self.packed)).bit_count() for expression in self.expressions]
+        for chunk_size, threads in ((None, 4), (64, 3), (7, 2), (1000, 8)):
+            scorer = ThreadScorer(threads, chunk_size=chunk_size, min_chunk=16)
+            self.assertEqual(scorer.correct(self.expressions, self.packed), expected)
+            scorer.close()
+        self.assertEqual(ThreadScorer(4, min_chunk=16).tune(300), 128)
+        self.assertEqual(ThreadScorer(4, min_chunk=200).tune(300), 256)
+        self.assertEqual(ThreadScorer(4, min_chunk=16).tune(1 << 20), 1 << 18)
+
+        # the chunks are converted again after the assignments were extended
+        scorer = ThreadScorer(2, min_chunk=16)
+        scorer.correct(self.expressions, self.packed)
+        packed = PackedAssignment.from_rows(self.rows)
+        scorer.correct(self.expressions, packed)
+        packed.extend([[True], [True], [False], [True]])
+        self.assertEqual(sum(chunk.a_n for chunk in scorer.chunks(packed)), packed.a_n)
+        self.assertEqual(scorer.correct(self.expressions, packed),
+                         [packed.correct(expression.truth(packed)).bit_count() for expression in self.expressions])
+        scorer.close()
+
+    def test_population_scorer(self):
+        p_1 = Population(0, 3, 5, (Or, And), (Not,))
+        p_2 = Population(0, 3, 5, (Or, And), (Not,), scorer=ThreadScorer(2, min_chunk=16))
+        p_1.expressions, p_2.expressions = list(self.expressions), list(self.expressions)
+        self.assertEqual(p_2.scores(self.packed), p_1.scores(self.packed))
+        self.assertEqual(p_2.evaluations, 20)
+        p_2.scores(self.packed)
+        self.assertEqual(p_2.evaluations, 20)
+        self.assertEqual(p_2.cull(self.packed), p_1.cull(self.packed))
+        self.assertEqual(p_2.expressions, p_1.expressions)
+        p_2.scorer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import unittest
+from random import Random
+from sr_fol.Selection import truncation, tournament, lexicase
+
+
+class TestSelection(unittest.TestCase):
+    def test_truncation(self):
+        keys = [(0.5, 0), (1.0, 1), (0.25, 2), (1.0, 3), (0.75, 4)]
+        self.assertEqual(sorted(truncation(keys, 3)), [1, 3, 4])
+        self.assertEqual(truncation(keys, 0), [])
+
+    def test_tournament(self):
+        keys = list(range(20))
+        selected = tournament(keys, 10, Random(0))
+        self.assertEqual(len(set(selected)), 10)
+        self.assertIn(19, selected)  # the best wins every tournament it enters until selected
+        self.assertEqual(sorted(tournament(keys, 20, Random(0))), keys)
+        self.assertEqual(tournament(keys, 10, Random(0)), selected)
+        self.assertEqual(tournament(keys, 3, Random(0), size=20)[0], 19)
+
+    def test_lexicase(self):
+        # 0 and 1 are specialists of disjoint assignments, 2 is correct on most assignments, 3 on none
+        correct = [0b0011, 0b1100, 0b0111, 0b0000]
+        for seed in range(10):
+            selected = lexicase(correct, 0b1111, 2, Random(seed))
+            self.assertEqual(len(set(selected)), 2)
+            self.assertNotIn(3, selected)
+        self.assertIn(1, {lexicase(correct, 0b1111, 1, Random(seed))[0] for seed in range(20)})
+        # assignments without evaluation are not visited
+        self.assertEqual(lexicase([0b0001, 0b1110], 0b0001, 1, Random(0)), [0])
+        self.assertEqual(sorted(lexicase(correct, 0b1111, 4, Random(0))), [0, 1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
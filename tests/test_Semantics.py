@@ -0,0 +1,89 @@
+import unittest
+from pandas import DataFrame
+from sr_fol.Expression import Var, Not, Or, And, Nand, Xor, Implies, Converse
+from sr_fol.Assignment import Assignment, FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
+
+
+class TestPackedAssignment(unittest.TestCase):
+    def test_PackedAssignment_pack(self):
+        self.assertEqual(PackedAssignment.pack([True, False, None, True]), (0b1001, 0b0010))
+
+    def test_PackedAssignment_from_matrix(self):
+        matrix = DataFrame([[True, None], [False, True], [True, False]],
+                           index=['v_1', 'v_2', 'e'],
+                           columns=['a_1', 'a_2'])
+        packed = PackedAssignment.from_matrix(matrix)
+        self.assertEqual(packed.variables, {1: (0b01, 0b00), 2: (0b10, 0b01)})
+        self.assertEqual(packed.e, (0b01, 0b10))
+        self.assertEqual(packed.a_n, 2)
+
+        rows = PackedAssignment.from_matrix([[True, None], [False, True], [True, False]])
+        self.assertEqual((rows.variables, rows.e, rows.a_n), (packed.variables, packed.e, packed.a_n))
+
+    def test_PackedAssignment_rows(self):
+        df = DataFrame([[True, None], [False, True]])
+        self.assertEqual(PackedAssignment.rows(df), [[True, None], [False, True]])
+        self.assertEqual(PackedAssignment.rows(df.values), [[True, None], [False, True]])
+        self.assertEqual(PackedAssignment.rows(((True, None), (False, True))), [[True, None], [False, True]])
+
+    def test_PackedAssignment_from_rows(self):
+        df = DataFrame([[None, 0, 1, True], [1, '2', 0, False], ['right', None, 10, 20]])
+        a = Assignment(df)
+        a.clean()
+        packed = PackedAssignment.from_rows(df.values.tolist())
+        expected = PackedAssignment.from_matrix(a.matrix)
+        self.assertEqual(packed.variables, expected.variables)
+        self.assertEqual(packed.e, expected.e)
+        self.assertEqual(packed.a_n, expected.a_n)
+
+    def test_PackedAssignment_extend(self):
+        packed = PackedAssignment.from_rows([[True, False], [True, True], [True, False]])
+        self.assertEqual(packed.extend([[True, False, None], [True, False, True], [False, True, None]]), 1)
+        self.assertEqual(packed.a_n, 3)
+        self.assertEqual(packed.variables[1], (0b001, 0b110))
+        self.assertEqual(packed.e, (0b101, 0b010))
+        self.assertEqual(packed.tail(2).variables[2], (0, 1))
+        with self.assertRaises(ValueError):
+            packed.extend([[True], [False]])
+
+    def test_PackedAssignment_from_targets(self):
+        rows = [[True, True, False, True], [True, False, True, True], [True, False, None, None], [None, True, True, False]]
+        e_1, e_2 = PackedAssignment.from_targets(rows, 2)
+        self.assertIs(e_1.variables, e_2.variables)
+        self.assertEqual(e_1.a_n, 3)
+        self.assertEqual(e_1.variables[1], (0b011, 0b100))
+        self.assertEqual((e_1.e, e_1.evaluated), ((0b001, 0b010), 2))
+        self.assertEqual((e_2.e, e_2.evaluated), ((0b110, 0b000), 2))
+        self.assertEqual(Var(1).score(e_1), 0.5)
+        self.assertEqual(Or(Var(1), Var(2)).score(e_2), 1.0)
+
+    def test_PackedAssignment_truth_matches_evaluate(self):
+        matrix = DataFrame([[True, True, True, False, False, False, None, None, None],
+                            [True, False, None, True, False, None, True, False, None],
+                            [True] * 9],
+                           index=['v_1', 'v_2', 'e'],
+                           columns=['a_' + str(i + 1) for i in range(9)])
+        packed = PackedAssignment.from_matrix(matrix)
+        for node_class in (Or, And, Nand, Xor, Implies, Converse):
+            expr = Not(node_class(Var(1), Var(2)))
+            true_bits, false_bits = expr.truth(packed)
+            for i, a_i in enumerate(matrix.columns):
+                expected = expr.evaluate(matrix[a_i])
+                self.assertEqual(bool(true_bits >> i & 1), expected is True)
+                self.assertEqual(bool(false_bits >> i & 1), expected is False)
+
+    def test_PackedAssignment_score(self):
+        matrix = FormulaAssignment(And(Var(1), Var(2))).matrix
+        packed = PackedAssignment.from_matrix(matrix)
+        self.assertEqual(Or(Var(1), Var(2)).score(packed), 0.5)
+        self.assertEqual(Or(Var(1), Var(2)).score(packed), Or(Var(1), Var(2)).score(matrix))
+
+    def test_PackedAssignment_score_without_evaluations(self):
+        _, empty = PackedAssignment.from_targets([[True, False], [True, True], [None, None]], 2)
+        self.assertEqual(empty.evaluated, 0)
+        self.assertEqual(Var(1).score(empty), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+from sr_fol.Expression import Var, Not, Or, And, Nand, Xor, Implies, Converse, Nor, Xnor, RandomExpression
+from sr_fol.Expression import BinaryOperator, OPERATORS
+from sr_fol.Population import Population
+from sr_fol.Serialization import to_bytes, from_bytes, to_text, from_text, parse, dump_population, load_population
+from sr_fol.Serialization import code_nodes, token_nodes
+
+
+class TestSerialization(unittest.TestCase):
+    def setUp(self):
+        self.expr = Converse(Implies(Var(1), Not(Var(300))), Xor(Nand(Var(2), Var(3)), Or(And(Var(1), Var(2)), Var(4))))
+
+    def test_Serialization_bytes(self):
+        self.assertEqual(to_bytes(And(Var(1), Not(Var(2)))), bytes([3, 8, 1, 9]))
+        self.assertEqual(from_bytes(to_bytes(self.expr)), self.expr)
+        self.assertEqual(to_bytes(Nor(Var(240), Xnor(Var(241), Var(1)))), bytes([255, 247, 254, 0, 241, 1, 8]))
+        self.assertEqual(from_bytes(to_bytes(Nor(Var(240), Xnor(Var(241), Var(1))))), Nor(Var(240), Xnor(Var(241), Var(1))))
+
+    def test_Serialization_text(self):
+        self.assertEqual(to_text(And(Var(1), Not(Var(2)))), 'A 1 N 2')
+        self.assertEqual(from_text(to_text(self.expr)), self.expr)
+        self.assertEqual(to_text(Nor(Var(1), Xnor(Var(2), Var(3)))), 'R 1 E 2 3')
+
+    def test_Serialization_operator_without_code(self):
+        class Nimplies(BinaryOperator):
+            symbol, table = '-/>', (False, True, False, False)
+
+        class Nconverse(BinaryOperator):
+            symbol, table = '</-', (False, False, True, False)
+
+        self.addCleanup(OPERATORS.pop, 'Nimplies')
+        self.addCleanup(OPERATORS.pop, 'Nconverse')
+        self.assertNotIn(None, code_nodes())
+        self.assertNotIn(None, token_nodes())
+        with self.assertRaisesRegex(ValueError, 'Nimplies'):
+            to_bytes(And(Var(1), Nimplies(Var(1), Var(2))))
+        with self.assertRaisesRegex(ValueError, 'Nconverse'):
+            to_text(Nconverse(Var(1), Var(2)))
+
+    def test_Serialization_parse(self):
+        self.assertEqual(parse('(v_1) and (not (v_2))'), And(Var(1), Not(Var(2))))
+        self.assertEqual(parse(str(self.expr)), self.expr)
+        for _ in range(20):
+            expr = RandomExpression(5, (Or, And, Nand, Xor, Implies, Converse, Nor, Xnor), (Not,), maxdepth=6)
+            self.assertEqual(parse(str(expr)), expr)
+        with self.assertRaises(ValueError):
+            parse('(v_1) nxor (v_2)')
+        with self.assertRaises(ValueError):
+            parse('v_1)')
+
+    def test_Serialization_population(self):
+        p = Population(population_size=10, v_n=2, maxdepth=5, binary_operators=(Or, Nand), unary_operators=(Not,),
+                       nary=True)
+        restored = load_population(dump_population(p))
+        self.assertTrue(restored.nary)
+        self.assertEqual(restored.expressions, p.expressions)
+        self.assertEqual(restored.population_size, 10)
+        self.assertEqual(restored.binary_operators, (Or, Nand))
+        self.assertEqual(restored.unary_operators, (Not,))
+
+
+if __name__ == '__main__':
+    unittest.main()
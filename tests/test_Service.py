@@ -0,0 +1,121 @@
+import unittest
+from json import dumps, loads
+from os.path import join
+from queue import Full
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import sleep
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from sr_fol.Expression import Var, Not, And
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Service import ResultCache, SolverService, serve
+
+
+class TestService(unittest.TestCase):
+    def setUp(self):
+        self.rows = FormulaAssignment(And(Var(1), Not(Var(2)))).matrix.values.tolist()
+        self.options = {'populations': 4, 'population_size': 5, 'maxdepth': 4, 'niterations': 20, 'seed': 0}
+
+    def test_ResultCache(self):
+        with TemporaryDirectory() as directory:
+            cache = ResultCache(join(directory, 'cache.sqlite'))
+            packed = PackedAssignment.from_rows(self.rows)
+            key = ResultCache.key(packed, self.options, None)
+            self.assertIsNone(cache.get(key))
+            cache.put(key, {'expression': '(v_1) and (not (v_2))'})
+            cache.close()
+
+            # equivalent input with a duplicate assignment has the same key
+            duplicated = [row + row[:1] for row in self.rows]
+            self.assertEqual(ResultCache.key(PackedAssignment.from_rows(duplicated), self.options, None), key)
+            self.assertNotEqual(ResultCache.key(packed, self.options, 5), key)
+            cache = ResultCache(join(directory, 'cache.sqlite'))
+            self.assertEqual(cache.get(key), {'expression': '(v_1) and (not (v_2))'})
+            cache.close()
+
+    def test_SolverService(self):
+        service = SolverService(workers=1, queue_size=4)
+        job = service.submit(self.rows, self.options)
+        job = service.status(job['id'], wait=30)
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['result']['score'], 1.0)
+        self.assertFalse(job['cached'])
+
+        cached = service.submit(self.rows, self.options)
+        self.assertEqual(cached['status'], 'done')
+        self.assertTrue(cached['cached'])
+        self.assertEqual(cached['result'], job['result'])
+        self.assertIsNone(service.status('unknown'))
+        service.close()
+
+    def test_SolverService_cancel_and_full_queue(self):
+        service = SolverService(workers=1, queue_size=1)
+        options = {**self.options, 'niterations': 10**6, 'target_score': None, 'stagnation': None}
+        running = service.submit(self.rows, options)
+        while service.status(running['id'])['status'] == 'queued':
+            sleep(0.01)
+        queued = service.submit(self.rows, {**options, 'seed': 1})
+        with self.assertRaises(Full):
+            service.submit(self.rows, {**options, 'seed': 2})
+        self.assertEqual(service.cancel(queued['id'])['status'], 'cancelled')
+        self.assertEqual(service.cancel(running['id'])['status'], 'cancelled')
+        running = service.status(running['id'], wait=30)
+        self.assertEqual(running['result']['stop_reason'], 'cancelled')
+        self.assertEqual(running['status'], 'cancelled')
+        service.close()
+
+    def test_SolverService_job_ttl(self):
+        service = SolverService(workers=1, job_ttl=0.0)
+        job = service.submit(self.rows, self.options)
+        self.assertEqual(service.status(job['id'], wait=30)['status'], 'done')
+        sleep(0.01)
+        cached = service.submit(self.rows, self.options)
+        self.assertIsNone(service.status(job['id']))
+        self.assertEqual(list(service.jobs), [cached['id']])
+        service.close()
+
+    def test_serve(self):
+        service = SolverService(workers=1)
+        server = serve(service, port=0)
+        Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]}/jobs'
+        try:
+            request = Request(url, data=dumps({'rows': self.rows, 'options': self.options}).encode(), method='POST')
+            with urlopen(request) as response:
+                self.assertEqual(response.status, 202)
+                job = loads(response.read())
+            with urlopen(f'{url}/{job["id"]}?wait=30') as response:
+                self.assertEqual(loads(response.read())['status'], 'done')
+            with urlopen(Request(f'{url}/{job["id"]}', method='DELETE')) as response:
+                self.assertEqual(loads(response.read())['status'], 'done')
+            with self.assertRaises(HTTPError) as context:
+                urlopen(f'{url}/unknown')
+            self.assertEqual(context.exception.code, 404)
+            with self.assertRaises(HTTPError) as context:
+                urlopen(f'{url}/{job["id"]}?wait=soon')
+            self.assertEqual(context.exception.code, 400)
+            with self.assertRaises(HTTPError) as context:
+                urlopen(f'{url}/{job["id"]}?wait=inf')
+            self.assertEqual(context.exception.code, 400)
+            with urlopen(f'{url}/{job["id"]}?wait=1e30') as response:  # waits longer than an hour are shortened
+                self.assertEqual(loads(response.read())['status'], 'done')
+            with self.assertRaises(HTTPError) as context:
+                urlopen(Request(url, data=b'{"options": {}}', method='POST'))
+            self.assertEqual(context.exception.code, 400)
+            with self.assertRaises(HTTPError) as context:  # misspelled option
+                urlopen(Request(url, data=dumps({'rows': self.rows, 'options': {'maxdeph': 5}}).encode(),
+                                method='POST'))
+            self.assertEqual(context.exception.code, 400)
+            with self.assertRaises(HTTPError) as context:  # rows of different lengths
+                urlopen(Request(url, data=b'{"rows": [[true, false], [true]]}', method='POST'))
+            self.assertEqual(context.exception.code, 400)
+        finally:
+            server.shutdown()
+            server.server_close()
+            service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+import unittest
+from os.path import join
+from tempfile import TemporaryDirectory
+from asyncio import run, create_task, sleep, CancelledError
+from sr_fol.Expression import Var, Not, And
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Solver import Solver
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Termination import Termination
+from sr_fol.Telemetry import Telemetry, MemorySink
+
+
+class TestSolver(unittest.TestCase):
+    def setUp(self):
+        matrix = FormulaAssignment(And(Var(1), Not(Var(2)))).matrix
+        self.first_half = matrix[['a_1', 'a_2']]
+        self.second_half = matrix[['a_2', 'a_3', 'a_4']]
+
+    def test_Solver_init(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4)
+        self.assertEqual(len(s.pops), 4)
+        self.assertEqual(s.v_n, 2)
+        self.assertEqual(s.packed.a_n, 2)
+
+    def test_Solver_rows(self):
+        s = Solver(self.first_half.values.tolist(), populations=2, population_size=5, maxdepth=4)
+        self.assertEqual(s.packed.variables, Solver(self.first_half, populations=1, population_size=5).packed.variables)
+        self.assertEqual(s.add_assignments(self.second_half.values.tolist()), 2)
+        self.assertEqual(s.packed.a_n, 4)
+
+    def test_Solver_add_expressions(self):
+        packed = PackedAssignment.from_rows(self.first_half.values.tolist())
+        s = Solver(packed, populations=2, population_size=5, maxdepth=4)
+        self.assertIs(s.packed, packed)
+        expr = And(Var(1), Not(Var(2)))
+        s.add_expressions([expr])
+        self.assertTrue(all(expr in pop for pop in s.pops))
+        self.assertTrue(all(pop.expressions[-1] is not expr for pop in s.pops))
+
+    def test_Solver_nary(self):
+        chain = And(And(And(Var(1), Var(2)), Not(Var(1))), Var(2))
+        s = Solver(self.first_half, populations=2, population_size=5, maxdepth=3, nary=True)
+        s.add_expressions([chain])
+        self.assertTrue(all(chain in pop and pop.nary for pop in s.pops))
+        s = Solver(self.first_half, populations=2, population_size=5, maxdepth=3)
+        s.add_expressions([chain])
+        self.assertFalse(any(chain in pop for pop in s.pops))
+
+    def test_Solver_front(self):
+        s = Solver(self.first_half, populations=3, population_size=6, maxdepth=4, maxsize=5, parsimony='pareto')
+        self.assertIsNone(s.front)
+        s.step()
+        sizes = [expr.size() for expr, _ in s.front]
+        self.assertEqual(sizes, sorted(set(sizes)))
+        self.assertTrue(all(expr.size() <= 5 for pop in s.pops for expr in pop.expressions))
+        self.assertIn(s.best(), [expr for expr, _ in s.front])
+        s.add_assignments(self.second_half)
+        self.assertIsNone(s.front)
+        s.best()
+        self.assertIsNotNone(s.front)
+
+    def test_Solver_step(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4)
+        best_score = s.step()
+        self.assertEqual(s.generation, 1)
+        self.assertGreaterEqual(best_score, 0.5)
+        self.assertTrue(all(len(pop.expressions) == 5 for pop in s.pops))
+
+    def test_Solver_add_assignments(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4)
+        s.run(niterations=2)
+        expr = s.pops[0].expressions[0]
+        self.assertEqual(s.add_assignments(self.second_half), 2)
+        self.assertEqual(s.packed.a_n, 4)
+
+        # cached fitness is extended by the new assignments only
+        evaluations = s.pops[0].evaluations
+        self.assertEqual(s.pops[0].fitness(expr, s.packed), expr.score(FormulaAssignment(And(Var(1), Not(Var(2)))).matrix))
+        self.assertEqual(s.pops[0].evaluations, evaluations + 1)
+
+    def test_Solver_run(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4)
+        termination = Termination(target_score=None, stagnation=None)
+        s.run(niterations=5, termination=termination)
+        s.add_assignments(self.second_half)
+        result_expr = s.run(niterations=3, termination=termination)
+        self.assertEqual(s.generation, 8)
+        self.assertEqual(termination.reason, 'niterations')
+        self.assertEqual(result_expr, s.best())
+
+    def test_Solver_checkpoint(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4, semantic_crossover=True)
+        s.run(niterations=2, termination=Termination(target_score=None))
+        with TemporaryDirectory() as directory:
+            s.checkpoint(join(directory, 'checkpoint.pkl'))
+            next_random = s.rng.random()
+            restored = Solver.resume(join(directory, 'checkpoint.pkl'))
+        self.assertEqual(restored.rng.random(), next_random)
+        self.assertEqual(restored.generation, 2)
+        self.assertEqual(restored.best_per_generation, s.best_per_generation)
+        self.assertTrue(restored.semantic_crossover)
+        self.assertEqual([pop.expressions for pop in restored.pops], [pop.expressions for pop in s.pops])
+        self.assertEqual(restored.packed.e, s.packed.e)
+        restored.run(niterations=4, termination=Termination(target_score=None), resume=True)
+        self.assertEqual(restored.generation, 4)
+
+    def test_Solver_seed(self):
+        termination = Termination(target_score=None, stagnation=None)
+        runs = []
+        for _ in range(2):
+            s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4, seed=7)
+            s.run(niterations=3, termination=termination)
+            runs.append([pop.expressions for pop in s.pops])
+        self.assertEqual(runs[0], runs[1])
+
+        # every population draws from its own stream
+        self.assertEqual(len({pop.rng.getstate() for pop in s.pops}), 4)
+
+    def test_Solver_threads(self):
+        termination = Termination(target_score=None, stagnation=None)
+        runs = []
+        for threads in (1, 2):
+            s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4, threads=threads, seed=7)
+            if s.scorer is not None:
+                s.scorer.min_chunk = 1
+            s.run(niterations=3, termination=termination)
+            runs.append([pop.expressions for pop in s.pops])
+        self.assertEqual(runs[0], runs[1])
+        self.assertTrue(all(pop.scorer is s.scorer for pop in s.pops))
+        with TemporaryDirectory() as directory:
+            s.checkpoint(join(directory, 'checkpoint.pkl'))
+            restored = Solver.resume(join(directory, 'checkpoint.pkl'))
+        self.assertEqual(restored.scorer.threads, 2)
+        self.assertTrue(all(pop.scorer is restored.scorer for pop in restored.pops))
+        self.assertIsNotNone(s.scorer.executor)
+        s.close()
+        self.assertIsNone(s.scorer.executor)
+        restored.close()
+
+    def test_Solver_adaptive(self):
+        sink = MemorySink()
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4, adaptive=True, seed=0,
+                   telemetry=Telemetry(sink))
+        s.scheduler.patience = 2
+        s.run(niterations=6, termination=Termination(target_score=None, stagnation=None))
+        self.assertEqual(s.generation, 6)
+        self.assertEqual(len(sink.records[-1]['allocation']), 4)
+        self.assertEqual(sum(sink.records[0]['allocation']), 4)
+        self.assertGreater(s.scheduler.restarts + sum(s.scheduler.runs), 0)
+        self.assertTrue(all(len(pop.expressions) == 5 for pop in s.pops))
+        with TemporaryDirectory() as directory:
+            s.checkpoint(join(directory, 'checkpoint.pkl'))
+            restored = Solver.resume(join(directory, 'checkpoint.pkl'))
+        self.assertEqual(restored.scheduler.runs, s.scheduler.runs)
+        restored.run(niterations=8, termination=Termination(target_score=None, stagnation=None), resume=True)
+        self.assertEqual(restored.generation, 8)
+
+    def test_Solver_memo(self):
+        sink = MemorySink()
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4, memo=True, seed=0,
+                   telemetry=Telemetry(sink))
+        s.run(niterations=5, termination=Termination(target_score=None, stagnation=None))
+        plain = Solver(self.first_half, populations=4, population_size=5, maxdepth=4, seed=0)
+        plain.run(niterations=5, termination=Termination(target_score=None, stagnation=None))
+        self.assertEqual([str(expr) for pop in s.pops for expr in pop.expressions],
+                         [str(expr) for pop in plain.pops for expr in pop.expressions])
+        stats = sink.records[-1]['memo']
+        self.assertEqual(stats['hits'], sum(record['counters'].get('memo_hits', 0) for record in sink.records))
+        self.assertEqual(stats['misses'], sum(record['counters']['nodes_evaluated'] for record in sink.records))
+        self.assertGreater(stats['duplication'], 0.0)
+        with TemporaryDirectory() as directory:
+            s.checkpoint(join(directory, 'checkpoint.pkl'))
+            restored = Solver.resume(join(directory, 'checkpoint.pkl'))
+        self.assertIsNotNone(restored.memo)
+        self.assertTrue(all(pop.memo is restored.memo for pop in restored.pops))
+
+    def test_Solver_generations(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4)
+        termination = Termination(target_score=None, stagnation=None)
+        stats = [stats for _, stats in s.generations(niterations=3, termination=termination)]
+        self.assertEqual([stat['generation'] for stat in stats], [1, 2, 3])
+        self.assertEqual([stat['best_score'] for stat in stats], s.best_per_generation)
+        self.assertEqual(stats[-1]['evaluations'], s.evaluations())
+        self.assertEqual(termination.reason, 'niterations')
+
+    def test_Solver_cancel(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4)
+        termination = Termination(target_score=None, stagnation=None)
+        for expr, stats in s.generations(niterations=10, termination=termination):
+            s.cancel()
+        self.assertEqual(s.generation, 1)
+        self.assertEqual(termination.reason, 'cancelled')
+
+        # closing the generator stops the evolution as well
+        generations = s.generations(niterations=10, termination=termination)
+        next(generations)
+        generations.close()
+        self.assertEqual(s.generation, 2)
+        self.assertEqual(termination.reason, 'cancelled')
+
+    def test_Solver_agenerations(self):
+        s = Solver(self.first_half, populations=4, population_size=5, maxdepth=4)
+        termination = Termination(target_score=None, stagnation=None)
+
+        async def collect():
+            return [stats['generation'] async for _, stats in s.agenerations(niterations=3, termination=termination)]
+
+        self.assertEqual(run(collect()), [1, 2, 3])
+        self.assertEqual(run(s.arun(niterations=2, termination=termination)), s.best())
+        self.assertEqual(s.generation, 5)
+
+        async def cancel_task():
+            task = create_task(s.arun(niterations=100, termination=termination))
+            while s.generation < 7:
+                await sleep(0)
+            task.cancel()
+            with self.assertRaises(CancelledError):
+                await task
+
+        run(cancel_task())
+        self.assertLess(s.generation, 10)
+        self.assertEqual(termination.reason, 'cancelled')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from json import loads
+from os.path import join
+from tempfile import TemporaryDirectory
+from sr_fol.Expression import Var, Not, Or, And
+from sr_fol.Assignment import FormulaAssignment
+from sr_fol.Population import Population
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Solver import Solver
+from sr_fol.Telemetry import Telemetry, NullTelemetry, MemorySink, JsonLinesSink
+
+
+class TestTelemetry(unittest.TestCase):
+    def setUp(self):
+        self.matrix = FormulaAssignment(And(Var(1), Not(Var(2)))).matrix
+
+    def test_Telemetry_record(self):
+        sink = MemorySink()
+        telemetry = Telemetry(sink)
+        p = Population(population_size=4, v_n=2, maxdepth=4, binary_operators=(Or, And), unary_operators=(Not,))
+        telemetry.attach([p])
+        packed = PackedAssignment.from_matrix(self.matrix)
+        with telemetry.phase('scores'):
+            p.scores(packed)
+        p.scores(packed)
+        telemetry.record(1, 0.5, [p])
+        record = sink.records[0]
+        self.assertEqual(record['generation'], 1)
+        self.assertIn('scores', record['phases'])
+        self.assertEqual(record['counters']['evaluations'], 4)
+        self.assertEqual(record['counters']['cache_hits'], 4)
+        self.assertEqual(p.counters, {})
+
+    def test_NullTelemetry(self):
+        telemetry = NullTelemetry()
+        p = Population(population_size=4, v_n=2, maxdepth=4, binary_operators=(Or, And), unary_operators=(Not,))
+        telemetry.attach([p])
+        with telemetry.phase('scores'):
+            p.scores(self.matrix)
+        self.assertIsNone(p.counters)
+
+    def test_Telemetry_solver(self):
+        with TemporaryDirectory() as directory:
+            sink = JsonLinesSink(join(directory, 'telemetry.jsonl'))
+            s = Solver(self.matrix, populations=4, population_size=5, maxdepth=4, telemetry=Telemetry(sink))
+            s.step()
+            s.step()
+            sink.close()
+            with open(join(directory, 'telemetry.jsonl')) as telemetry_file:
+                records = [loads(line) for line in telemetry_file]
+        self.assertEqual([record['generation'] for record in records], [1, 2])
+        self.assertTrue({'cull', 'crossover', 'mutation', 'scores'} <= set(records[0]['phases']))
+        self.assertGreater(records[0]['counters']['evaluations'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
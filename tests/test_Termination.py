@@ -0,0 +1,44 @@
+import unittest
+from sr_fol.Termination import Termination
+
+
+class TestTermination(unittest.TestCase):
+    def test_Termination_target_score(self):
+        t = Termination()
+        t.start()
+        self.assertFalse(t.check([0.5], 10))
+        self.assertIsNone(t.reason)
+        self.assertTrue(t.check([0.5, 1.0], 20))
+        self.assertEqual(t.reason, 'target_score')
+
+    def test_Termination_time_limit(self):
+        t = Termination(time_limit=0.0)
+        t.start()
+        self.assertTrue(t.check([0.5], 10))
+        self.assertEqual(t.reason, 'time_limit')
+
+    def test_Termination_max_evaluations(self):
+        t = Termination(max_evaluations=25)
+        t.start()
+        self.assertFalse(t.check([0.5], 10))
+        self.assertTrue(t.check([0.5, 0.6], 20))
+        self.assertEqual(t.reason, 'max_evaluations')
+
+    def test_Termination_stagnation(self):
+        t = Termination(stagnation=3)
+        t.start()
+        self.assertFalse(t.check([0.5, 0.6, 0.7, 0.7], 10))
+        self.assertTrue(t.check([0.5, 0.6, 0.7, 0.7, 0.701], 20))
+        self.assertEqual(t.reason, 'stagnation')
+
+    def test_Termination_start(self):
+        t = Termination(stagnation=None)
+        t.start()
+        t.check([1.0], 10)
+        t.start()
+        self.assertIsNone(t.reason)
+        self.assertFalse(t.check([0.5, 0.5, 0.5], 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
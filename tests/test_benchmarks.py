@@ -0,0 +1,63 @@
+import unittest
+from sr_fol.Expression import Var
+from benchmarks.problems import PROBLEMS, parity, multiplexer, majority, comparator, random_formula
+from benchmarks.suite import run_problem, summary
+from benchmarks.micro import full_expression, run, compare
+
+
+class TestProblems(unittest.TestCase):
+    def test_parity(self):
+        matrix = parity(3)
+        self.assertEqual(list(matrix.index), ['v_1', 'v_2', 'v_3', 'e'])
+        self.assertEqual(len(matrix.columns), 8)
+        self.assertEqual(matrix['a_1'].tolist(), [True, True, True, False])
+        self.assertEqual(matrix['a_2'].tolist(), [True, True, False, True])
+        self.assertEqual(parity(3, even=False).loc['e'].tolist(), (~matrix.loc['e']).tolist())
+
+    def test_multiplexer(self):
+        matrix = multiplexer(2)
+        self.assertEqual(len(matrix.index), 7)
+        for column in matrix.columns:
+            values = matrix[column].tolist()
+            address = 2 * values[0] + values[1]
+            self.assertEqual(values[-1], values[2 + address])
+        self.assertEqual(len(multiplexer(3).index), 12)
+
+    def test_majority_comparator(self):
+        self.assertEqual(majority(3).loc['e'].tolist(), [True, True, True, False, True, False, False, False])
+        matrix = comparator(1)
+        self.assertEqual(matrix.loc['e'].tolist(), [False, True, False, False])
+
+    def test_random_formula(self):
+        self.assertTrue(random_formula(4, 3, 0.1, seed=5).equals(random_formula(4, 3, 0.1, seed=5)))
+        self.assertTrue(random_formula(4, 3, 0.5, seed=5).isna().values.any())
+
+    def test_run_problem(self):
+        result = run_problem('parity-3', PROBLEMS['parity-3'](0), 0,
+                             populations=2, population_size=5, maxdepth=4, niterations=2)
+        self.assertEqual(result['generations'], 2)
+        self.assertGreater(result['evaluations'], 0)
+        self.assertGreater(result['peak_memory'], 0)
+        self.assertEqual(summary([result])['runs'], 1)
+
+
+class TestMicro(unittest.TestCase):
+    def test_full_expression(self):
+        expr = full_expression(4, 3)
+        self.assertEqual(expr.depth(), 5)
+        self.assertEqual(len(expr.nodes([Var])), 8)
+
+    def test_run(self):
+        timings = run([2], [2, 3], [4], functions=['Expression.depth', 'Expression.score'], repeat=1)
+        self.assertEqual(sorted(timings), ['Expression.depth[depth=2]',
+                                           'Expression.score[depth=2,v_n=2,a_n=4]',
+                                           'Expression.score[depth=2,v_n=3,a_n=4]'])
+        self.assertTrue(all(seconds > 0 for seconds in timings.values()))
+
+    def test_compare(self):
+        baseline = {'a': 1.0, 'b': 1.0}
+        self.assertEqual(compare({'a': 1.2, 'b': 1.3, 'c': 9.0}, baseline, tolerance=0.25), ['b'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,15 @@
 import unittest
-from sr_fol.__main__ import best_expression
-from sr_fol.Expression import Var, Not, Or, And, Nand, Xor, Implies, Converse
+import subprocess
+import sys
+from os.path import join, exists
+from tempfile import TemporaryDirectory
+from sr_fol.__main__ import best_expression, best_expressions, operator_classes
+from sr_fol.Expression import Var, Not, Or, And, Nand, Xor, Implies, Converse, Xnor
 from sr_fol.Assignment import FormulaAssignment, RandomAssignment, Assignment
+from sr_fol.Termination import Termination
+from sr_fol.Semantics import PackedAssignment
+from sr_fol.Archive import ExpressionArchive
+from sr_fol.Solver import Solver
 
 
 class TestSrFol(unittest.TestCase):
@@ -15,6 +23,122 @@ class TestSrFol(unittest.TestCase):
             result_scores.append(result_expr.score(assign_matrix))
         self.assertGreater(sum(result_scores)/float(len(result_scores)), 0.95)
 
+    def test_best_expression_termination(self):
+        assign_matrix = FormulaAssignment(Var(1), 2).matrix
+        termination = Termination()
+        result_expr = best_expression(assign_matrix, termination=termination)
+        self.assertEqual(result_expr.score(assign_matrix), 1.0)
+        self.assertEqual(termination.reason, 'target_score')
+
+        termination = Termination(target_score=None, time_limit=0.0)
+        best_expression(assign_matrix, termination=termination)
+        self.assertEqual(termination.reason, 'time_limit')
+
+        termination = Termination(target_score=None, stagnation=None)
+        best_expression(assign_matrix, niterations=2, termination=termination)
+        self.assertEqual(termination.reason, 'niterations')
+
+    def test_best_expression_checkpoint(self):
+        assign_matrix = FormulaAssignment(Var(1), 2).matrix
+        with TemporaryDirectory() as directory:
+            checkpoint_path = join(directory, 'checkpoint.pkl')
+            best_expression(assign_matrix, niterations=2, checkpoint_path=checkpoint_path, checkpoint_every=1)
+            self.assertTrue(exists(checkpoint_path))
+            result_expr = best_expression(assign_matrix, niterations=4, checkpoint_path=checkpoint_path)
+        self.assertEqual(result_expr.score(assign_matrix), 1.0)
+
+    def test_best_expression_checkpoint_options(self):
+        assign_matrix = FormulaAssignment(And(Var(1), Not(Var(2))), 3).matrix
+        options = {'populations': 4, 'population_size': 5, 'seed': 0}
+        with TemporaryDirectory() as directory:
+            checkpoint_path = join(directory, 'checkpoint.pkl')
+            best_expression(assign_matrix, maxdepth=4, niterations=2, checkpoint_path=checkpoint_path,
+                            termination=Termination(target_score=None, stagnation=None), **options)
+            # other options start a new search instead of continuing the one of the checkpoint
+            best_expression(assign_matrix, maxdepth=5, niterations=3, checkpoint_path=checkpoint_path,
+                            termination=Termination(target_score=None, stagnation=None), **options)
+            restored = Solver.resume(checkpoint_path)
+            self.assertEqual((restored.maxdepth, restored.generation), (5, 3))
+            # a search that reached its target score is not run again
+            termination = Termination()
+            expr = best_expression(assign_matrix, maxdepth=5, niterations=100, checkpoint_path=checkpoint_path,
+                                   termination=termination, **options)
+            generation = Solver.resume(checkpoint_path).generation
+            self.assertEqual(termination.reason, 'target_score')
+            termination = Termination()
+            self.assertEqual(best_expression(assign_matrix, maxdepth=5, niterations=100, termination=termination,
+                                             checkpoint_path=checkpoint_path, **options), expr)
+            self.assertEqual(Solver.resume(checkpoint_path).generation, generation)
+            self.assertEqual(termination.reason, 'target_score')
+
+    def test_best_expression_archive(self):
+        rows = FormulaAssignment(Or(Var(1), Not(Var(2)))).matrix.values.tolist()
+        with TemporaryDirectory() as directory:
+            archive_path = join(directory, 'archive.sqlite')
+            expr = best_expression(rows, populations=4, population_size=10, maxdepth=4, niterations=20, seed=0,
+                                   archive_path=archive_path)
+            archive = ExpressionArchive(archive_path)
+            self.assertIn(expr, archive.nearest(PackedAssignment.from_rows(rows)))
+            archive.close()
+            termination = Termination()
+            best_expression(rows, populations=4, population_size=10, maxdepth=4, niterations=20,
+                            termination=termination, archive_path=archive_path)
+        self.assertEqual(termination.reason, 'target_score')
+
+    def test_best_expression_archive_other_operators(self):
+        rows = [[True, True, False, False], [True, False, True, False], [False, True, True, False]]
+        with TemporaryDirectory() as directory:
+            archive_path = join(directory, 'archive.sqlite')
+            options = {'populations': 4, 'population_size': 10, 'maxdepth': 4, 'niterations': 10, 'seed': 0,
+                       'archive_path': archive_path}
+            best_expression(rows, binary_operators=(Xor,), unary_operators=(), **options)
+            # the archived expressions with Xor do not seed a search with And and Not
+            expr = best_expression(rows, binary_operators=(And,), unary_operators=(Not,), **options)
+        self.assertEqual(expr.nodes([Xor]), [])
+
+    def test_best_expression_rows(self):
+        rows = FormulaAssignment(Or(Var(1), Not(Var(2)))).matrix.values.tolist()
+        expr = best_expression(rows, populations=4, population_size=10, maxdepth=4, niterations=20, seed=0)
+        self.assertEqual(expr.score(FormulaAssignment(Or(Var(1), Not(Var(2)))).matrix), 1.0)
+
+    def test_import_without_pandas(self):
+        code = 'import sys, sr_fol; print(any(m.split(".")[0] in ("pandas", "numpy") for m in sys.modules))'
+        self.assertEqual(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout, 'False\n')
+
+    def test_import_without_services(self):
+        code = ('import sys, sr_fol; '
+                'print(any(m.split(".")[0] in ("sqlite3", "http", "multiprocessing") for m in sys.modules))')
+        self.assertEqual(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True).stdout, 'False\n')
+
+    def test_operator_classes(self):
+        self.assertEqual(operator_classes('OR equiv', 2), (Or, Xnor))
+        binary = operator_classes('all', 2)
+        self.assertEqual(len(binary), len(set(binary)))
+        with self.assertRaises(ValueError):
+            operator_classes('or_nimplies', 2)
+
+    def test_best_expressions(self):
+        matrix = FormulaAssignment(And(Var(1), Var(2)), 2).matrix
+        matrix.loc['e_2'] = FormulaAssignment(Or(Var(1), Var(2)), 2).matrix.loc['e']
+        results = best_expressions(matrix, 2, populations=10, population_size=10, maxdepth=4, seed=0)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].score(FormulaAssignment(And(Var(1), Var(2)), 2).matrix), 1.0)
+        self.assertEqual(results[1].score(FormulaAssignment(Or(Var(1), Var(2)), 2).matrix), 1.0)
+
+    def test_best_expressions_target_without_evaluations(self):
+        rows = [[True, False, True, False], [True, True, False, False], [True, False, False, False], [None] * 4]
+        results = best_expressions(rows, 2, populations=2, population_size=10, maxdepth=3, niterations=5, seed=0)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0].score(PackedAssignment.from_targets(rows, 2)[0]), 1.0)
+
+    def test_best_expressions_shared_caches(self):
+        rows = [[True, False, True, False], [True, True, False, False], [True, False, False, False],
+                [True, True, True, False]]
+        results = best_expressions(rows, 2, populations=2, population_size=10, maxdepth=3, niterations=5,
+                                   semantic_crossover=True, memo=True, seed=0)
+        for result, packed in zip(results, PackedAssignment.from_targets(rows, 2)):
+            self.assertEqual(result.score(packed), 1.0)
+
     def test_best_expression_random(self):
         result_scores = []
         for _ in range(10):